@@ -3,22 +3,41 @@
 API dependencies.
 
 This module defines common dependencies for API routes,
-such as database sessions and pagination.
+such as database sessions, pagination, payment status dates, conditional
+GET handling and request-scoped lookup memoization.
 """
-from typing import Any
-from fastapi import Depends, Query
+from datetime import date
+from typing import Any, Optional
+from fastapi import Depends, HTTPException, Query, Request, Response
 
-from app.database.database import get_db_connection
+from app.database.database import get_db_connection, get_data_version
+from app.services.client_service import as_of_period
+from app.utils.cache import response_cache, etag_matches
+from app.utils.unit_of_work import unit_of_work
 
 async def get_db():
     """
-    Provide a database connection for route handlers.
+    Provide a pooled read-only database connection for route handlers.
+    
+    The connection is returned to the pool once the request finishes.
     
     Returns: Database connection object
     """
     async with get_db_connection() as conn:
         yield conn
 
+async def request_unit_of_work():
+    """
+    Memoize client and contract lookups for the duration of a request.
+    
+    The payment write path looks up the same client from several service
+    functions; within one request each lookup hits the database once.
+    
+    Returns: Active UnitOfWork
+    """
+    with unit_of_work() as uow:
+        yield uow
+
 def pagination_params(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Number of items per page")
@@ -39,4 +58,43 @@ def pagination_params(
         "page": page,
         "page_size": page_size,
         "skip": skip
-    }
\ No newline at end of file
+    }
+
+def as_of_param(
+    as_of: Optional[date] = Query(None, description="Evaluate payment status as of this date (YYYY-MM-DD); defaults to today")
+) -> Optional[date]:
+    """
+    Provide the date payment status is evaluated against.
+    
+    Returns: The requested date, or None for today
+    """
+    return as_of
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    as_of: Optional[date] = Depends(as_of_param)
+) -> None:
+    """
+    Tag GET responses with the current data version and answer 304 when unchanged.
+    
+    The ETag combines the database data version with the response cache
+    generation, so it changes after every commit and after every cache
+    invalidation that follows one. Payment statuses also depend on the month
+    they are evaluated in, so the tag includes the status period too and
+    changes when the month rolls over (or with the ``as_of`` query date).
+    It is computed before the handler reads any data, so a tag never
+    describes data older than itself.
+    
+    Raises: HTTPException(304) when If-None-Match matches the current ETag
+    """
+    if request.method not in ("GET", "HEAD"):
+        return
+    
+    etag = f'W/"{await get_data_version()}-{response_cache.generation}-{as_of_period(as_of)}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=headers)
+    
+    response.headers.update(headers)
@@ -6,72 +6,126 @@ Provides routes for:
 - Listing all clients
 - Getting client details
 - Getting client payment history
+- Listing overdue clients
 """
 from fastapi import APIRouter, Depends, HTTPException, Path, Query
-from typing import Any
+from datetime import date
+from typing import Any, Optional
 
-from app.api.dependencies import get_db, pagination_params
+from app.api.dependencies import get_db, pagination_params, as_of_param, conditional_get
+from app.api.responses import FastJSONResponse, fast_json
 from app.database.models import (
     get_all_clients,
     get_client_details,
-    get_client_payment_history
+    get_client_payment_history,
+    get_client_payment_history_keyset
 )
-from app.services.client_service import get_frontend_client_data
+from app.services.client_service import as_of_period, get_frontend_client_data, get_overdue_clients
+from app.utils.cache import cached
 
 router = APIRouter(
     prefix="/api/clients",
     tags=["clients"],
+    dependencies=[Depends(conditional_get)],
 )
 
-@router.get("")
-async def get_clients():
+@router.get("", response_class=FastJSONResponse)
+@fast_json
+@cached("/api/clients", tags=["clients"], key=lambda as_of: as_of_period(as_of))
+async def get_clients(as_of: Optional[date] = Depends(as_of_param)):
     """
     GET /api/clients
     
+    Statuses are evaluated as of the ``as_of`` query date (default today)
+    and cached per month.
+    
     Returns: JSON response with array of client objects
     """
-    clients = await get_all_clients()
+    clients = await get_all_clients(as_of)
     return {"clients": clients}
 
-@router.get("/data")
-async def get_frontend_data():
+@router.get("/data", response_class=FastJSONResponse)
+@fast_json
+async def get_frontend_data(as_of: Optional[date] = Depends(as_of_param)):
     """
     GET /api/clients/data
     
-    Returns: Complete frontend data structure
+    Returns: Complete frontend data structure, with statuses as of the
+        ``as_of`` query date (default today)
+    """
+    return await get_frontend_client_data(as_of)
+
+@router.get("/overdue", response_class=FastJSONResponse)
+@fast_json
+async def get_overdue(as_of: Optional[date] = Depends(as_of_param)):
+    """
+    GET /api/clients/overdue
+    
+    Pass ``as_of`` for a historic report of what was overdue on that date.
+    Reports are memoized per data version and month by the client service.
+    
+    Returns: Clients with unpaid periods and each one's missing range, most
+        periods behind first
     """
-    return await get_frontend_client_data()
+    return await get_overdue_clients(as_of)
 
-@router.get("/{client_id}")
+@router.get("/{client_id}", response_class=FastJSONResponse)
+@fast_json
+@cached(
+    "/api/clients/{client_id}",
+    tags=lambda client_id, as_of: [f"client:{client_id}"],
+    key=lambda client_id, as_of: (client_id, as_of_period(as_of))
+)
 async def get_client(
-    client_id: int = Path(..., description="The client ID")
+    client_id: int = Path(..., description="The client ID"),
+    as_of: Optional[date] = Depends(as_of_param)
 ):
     """
     GET /api/clients/{client_id}
     
+    Status and missing payments are evaluated as of the ``as_of`` query date
+    (default today) and cached per month.
+    
     Returns: JSON response with detailed client object
     """
-    client = await get_client_details(client_id)
+    client = await get_client_details(client_id, as_of)
     
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     
     return client
 
-@router.get("/{client_id}/payments")
+@router.get("/{client_id}/payments", response_class=FastJSONResponse)
+@fast_json
 async def get_client_payments(
     client_id: int = Path(..., description="The client ID"),
-    pagination: dict[str, int] = Depends(pagination_params)
+    pagination: dict[str, int] = Depends(pagination_params),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page; pass an empty value to start cursor pagination"),
+    include_total: bool = Query(False, description="Include the total item count in cursor mode")
 ):
     """
     GET /api/clients/{client_id}/payments
     
+    Uses page/page_size offset pagination by default. When a cursor is given,
+    pages are served by keyset seek and link to the next page via nextCursor.
+    
     Returns: JSON response with array of payment objects and pagination metadata
     """
+    if cursor is not None:
+        try:
+            return await get_client_payment_history_keyset(
+                client_id,
+                cursor=cursor,
+                page_size=pagination["page_size"],
+                include_total=include_total
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
     payment_history = await get_client_payment_history(
         client_id, 
         page=pagination["page"], 
         page_size=pagination["page_size"]
     )
     
-    return payment_history
\ No newline at end of file
+    return payment_history
@@ -5,21 +5,31 @@ Document API endpoints.
 Provides routes for:
 - Uploading payment documents
 - Retrieving payment documents
+- First-page document previews
 - Deleting payment documents
 """
-from fastapi import APIRouter, Depends, HTTPException, Path, UploadFile, File
-from fastapi.responses import StreamingResponse
+import os
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Header, Response, UploadFile, File
 from typing import Any, Optional
-import io
+from pathlib import Path as FilePath
+
+from fastapi.responses import FileResponse
+
+from app.api.responses import DocumentResponse
 
 from app.services.document_service import (
     store_document,
     associate_document_with_payment,
-    get_document_path,
+    get_document_file,
+    get_documents_availability,
     delete_document,
     get_payment_documents
 )
+from app.services.document_store import run_io
+from app.services.preview_service import get_document_preview, schedule_preview
 from app.database.models import get_payment
+from app.utils.cache import etag_matches
+from app.utils.uploads import UploadTooLargeError
 
 router = APIRouter(tags=["documents"])
 
@@ -50,11 +60,17 @@ async def upload_document_for_payment(
         raise HTTPException(status_code=400, detail="Payment has no associated client")
     
     # Store document
-    document_id = await store_document(document, client_id, description)
+    try:
+        document_id = await store_document(document, client_id, description)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     
     if not document_id:
         raise HTTPException(status_code=500, detail="Failed to store document")
     
+    # Render the preview off the request path
+    schedule_preview(document_id)
+    
     # Associate with payment
     success = await associate_document_with_payment(document_id, payment_id)
     
@@ -69,34 +85,52 @@ async def upload_document_for_payment(
         "success": True
     }
 
+@router.get("/api/documents/availability")
+async def get_document_availability(
+    ids: list[int] = Query(..., max_length=100, description="Document IDs to check, e.g. a history page's attachmentIds")
+):
+    """
+    Check several documents in one call.
+    
+    Lets the payment history enable its View Document buttons for a whole
+    page at once instead of resolving each attachment separately.
+    
+    Args:
+        ids: Document IDs
+        
+    Returns: Availability, file name, size and last-modified time keyed by document ID
+    """
+    return {"documents": await get_documents_availability(ids)}
+
 @router.get("/api/documents/{document_id}")
 async def get_document(
-    document_id: int = Path(..., description="The document ID")
+    document_id: int = Path(..., description="The document ID"),
+    inline: bool = Query(False, description="Display in the browser instead of downloading"),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Get a document file.
     
+    Streams the file from disk with Range support, so viewers can fetch
+    pages of large PDFs without downloading the whole document.
+    
     Args:
         document_id: Document ID
+        inline: Use an inline Content-Disposition (for the document viewer)
         
-    Returns: Document file as streaming response
+    Returns: Document file response (206 for range requests, 304 if unchanged)
     """
-    # Get document path
-    document_path = await get_document_path(document_id)
+    # Resolve the stored file
+    document = await get_document_file(document_id, verify=True)
     
-    if not document_path:
+    if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    # Read file content
-    try:
-        with open(document_path, "rb") as f:
-            file_content = f.read()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error reading document: {str(e)}")
+    document_path = document["path"]
     
     # Determine content type
     content_type = "application/octet-stream"
-    extension = document_path.suffix.lower()
+    extension = FilePath(document["file_name"]).suffix.lower() or document_path.suffix.lower()
     
     if extension == ".pdf":
         content_type = "application/pdf"
@@ -107,12 +141,58 @@ async def get_document(
     elif extension == ".txt":
         content_type = "text/plain"
     
-    # Return file as streaming response
-    return StreamingResponse(
-        io.BytesIO(file_content),
+    response = DocumentResponse(
+        document_path,
         media_type=content_type,
-        headers={"Content-Disposition": f"attachment; filename={document_path.name}"}
+        filename=document["file_name"],
+        stat_result=document["stat"],
+        content_disposition_type="inline" if inline else "attachment"
     )
+    
+    # The viewer re-opening an unchanged document gets an empty 304
+    if etag_matches(if_none_match, response.headers["etag"]):
+        return Response(
+            status_code=304,
+            headers={
+                "ETag": response.headers["etag"],
+                "Last-Modified": response.headers["last-modified"]
+            }
+        )
+    
+    return response
+
+@router.get("/api/documents/{document_id}/preview")
+async def get_document_preview_image(
+    document_id: int = Path(..., description="The document ID"),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Get a PNG of a document's first page.
+    
+    Previews are rendered in a background process pool when a document is
+    uploaded and cached on disk by content hash; a document without a cached
+    preview is rendered on first request.
+    
+    Args:
+        document_id: Document ID
+        
+    Returns: PNG image response (304 if unchanged)
+    """
+    preview_path = await get_document_preview(document_id)
+    
+    if not preview_path:
+        raise HTTPException(status_code=404, detail="Preview not available")
+    
+    response = FileResponse(
+        preview_path,
+        media_type="image/png",
+        stat_result=await run_io(os.stat, preview_path)
+    )
+    
+    if etag_matches(if_none_match, response.headers["etag"]):
+        return Response(status_code=304, headers={"ETag": response.headers["etag"]})
+    
+    return response
 
 @router.delete("/api/documents/{document_id}")
 async def delete_document_endpoint(
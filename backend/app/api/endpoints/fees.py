@@ -0,0 +1,66 @@
+# backend/app/api/endpoints/fees.py
+"""
+Expected fee API endpoints.
+
+Provides routes for:
+- Estimating a client's expected fee while a payment is being entered
+- Estimating expected fees for many clients at once
+
+These routes skip the ETag dependency used by the other routers: estimates
+are computed from cached contract rows, and a conditional GET check would
+cost more than the estimate itself.
+"""
+from fastapi import APIRouter, HTTPException, Path, Query, Body
+from typing import Any, Optional
+
+from app.api.responses import FastJSONResponse, fast_json
+from app.core.config import EXPECTED_FEE_BATCH_MAX
+from app.services.fee_service import get_expected_fee, get_expected_fees
+
+router = APIRouter(tags=["fees"])
+
+@router.get("/api/clients/{client_id}/expected-fee", response_class=FastJSONResponse)
+@fast_json
+async def get_client_expected_fee(
+    client_id: int = Path(..., description="The client ID"),
+    total_assets: Optional[float] = Query(None, ge=0, description="AUM for the payment"),
+    start_period: Optional[str] = Query(None, description="First period covered, e.g. \"Jan 2024\" or \"Q1 2024\""),
+    end_period: Optional[str] = Query(None, description="Last period covered (defaults to start_period)")
+):
+    """
+    GET /api/clients/{client_id}/expected-fee
+    
+    Returns: Expected fee with the contract's fee type, rate, schedule and
+        number of periods
+    """
+    try:
+        estimate = await get_expected_fee(client_id, total_assets, start_period, end_period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if estimate is None:
+        raise HTTPException(status_code=404, detail="Client has no active contract")
+    
+    return estimate
+
+@router.post("/api/clients/expected-fees", response_class=FastJSONResponse)
+@fast_json
+async def get_batch_expected_fees(
+    items: list[dict[str, Any]] = Body(..., embed=True, description="Items with client_id, total_assets, start_period and end_period")
+):
+    """
+    POST /api/clients/expected-fees
+    
+    Returns: One estimate (or error) per item, in request order
+    """
+    if len(items) > EXPECTED_FEE_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {EXPECTED_FEE_BATCH_MAX} items per request")
+    
+    for index, item in enumerate(items):
+        if not isinstance(item.get("client_id"), int):
+            raise HTTPException(status_code=400, detail=f"Item {index}: client_id must be an integer")
+        total_assets = item.get("total_assets")
+        if total_assets is not None and (not isinstance(total_assets, (int, float)) or total_assets < 0):
+            raise HTTPException(status_code=400, detail=f"Item {index}: total_assets must be a non-negative number")
+    
+    return {"results": await get_expected_fees(items)}
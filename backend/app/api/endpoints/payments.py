@@ -5,13 +5,16 @@ Payment API endpoints.
 Provides routes for:
 - Getting payment history
 - Creating new payments
+- Bulk importing payments from CSV or NDJSON
 - Updating existing payments
 - Deleting payments
 """
-from fastapi import APIRouter, Depends, HTTPException, Path, Body, UploadFile, File, Form
+import csv
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Body, UploadFile, File, Form
 from typing import Any, Optional
 
-from app.api.dependencies import get_db, pagination_params
+from app.api.dependencies import get_db, pagination_params, conditional_get, request_unit_of_work
+from app.api.responses import FastJSONResponse, fast_json
 from app.database.models import (
     get_client_payment_history,
     create_payment,
@@ -23,13 +26,20 @@ from app.services.payment_service import (
     prepare_payment_data,
     validate_payment_data
 )
+from app.core.config import DOCUMENT_MAX_UPLOAD_MB
+from app.utils.uploads import UploadTooLargeError
 from app.services.document_service import (
-    store_document,
-    associate_document_with_payment,
+    store_payment_document,
     get_payment_documents
 )
+from app.services.preview_service import schedule_preview
+from app.services.payment_import import import_payments, ImportTooLargeError
+from app.utils.imports import detect_format, CSV, NDJSON
 
-router = APIRouter(tags=["payments"])
+router = APIRouter(
+    tags=["payments"],
+    dependencies=[Depends(conditional_get), Depends(request_unit_of_work)],
+)
 
 @router.post("/api/clients/{client_id}/payments")
 async def create_new_payment(
@@ -111,21 +121,24 @@ async def create_payment_with_document(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     
-    # Create payment in database
-    payment_id = await create_payment(prepared_data)
-    
-    if not payment_id:
-        raise HTTPException(status_code=500, detail="Failed to create payment")
+    # Reject oversized documents before anything is written
+    if document and document.size is not None and document.size > DOCUMENT_MAX_UPLOAD_MB * 1024 * 1024:
+        raise HTTPException(status_code=413, detail=str(UploadTooLargeError(DOCUMENT_MAX_UPLOAD_MB * 1024 * 1024)))
     
-    # Handle document if provided
     document_id = None
     if document:
-        # Store document
-        document_id = await store_document(document, client_id)
-        
-        if document_id:
-            # Associate with payment
-            await associate_document_with_payment(document_id, payment_id)
+        # Stream the document first; the payment is only created, together
+        # with the document, once the whole upload is within the size limit
+        try:
+            payment_id, document_id = await store_payment_document(document, prepared_data)
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        schedule_preview(document_id)
+    else:
+        payment_id = await create_payment(prepared_data)
+    
+    if not payment_id:
+        raise HTTPException(status_code=500, detail="Failed to create payment")
     
     # Get the created payment
     created_payment = await get_payment(payment_id)
@@ -136,6 +149,38 @@ async def create_payment_with_document(
         "document_id": document_id
     }
 
+@router.post("/api/payments/import")
+async def import_payment_file(
+    file: UploadFile = File(..., description="CSV or NDJSON file with one payment per row"),
+    format: Optional[str] = Query(None, pattern=f"^({CSV}|{NDJSON})$", description="File format (detected from the file name if omitted)"),
+    dry_run: bool = Query(False, description="Validate the file without creating payments")
+):
+    """
+    Create payments for many clients from one file.
+    
+    Rows use the same fields as a single payment plus client_id; contract_id
+    and expected_fee are filled in from the client's active contract when
+    omitted. Invalid rows are skipped and all valid rows are created in a
+    single transaction.
+    
+    Args:
+        file: CSV (with a header row) or NDJSON file
+        format: "csv" or "ndjson"
+        dry_run: Only validate
+        
+    Returns: Import report with a status and error for every row
+    """
+    format = format or detect_format(file.filename, file.content_type)
+    if not format:
+        raise HTTPException(status_code=400, detail="Unrecognised file format. Upload a .csv or .ndjson file.")
+    
+    try:
+        return await import_payments(file, format, dry_run)
+    except ImportTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Could not read import file: {str(e)}")
+
 @router.put("/api/payments/{payment_id}")
 async def update_existing_payment(
     payment_id: int = Path(..., description="The payment ID"),
@@ -210,7 +255,8 @@ async def delete_existing_payment(
         "message": f"Payment {payment_id} deleted successfully"
     }
 
-@router.get("/api/payments/{payment_id}")
+@router.get("/api/payments/{payment_id}", response_class=FastJSONResponse)
+@fast_json
 async def get_payment_details(
     payment_id: int = Path(..., description="The payment ID")
 ):
@@ -7,42 +7,52 @@ Provides routes for:
 - Getting clients by provider
 """
 from fastapi import APIRouter, Depends, HTTPException, Path
-from typing import Any
+from datetime import date
+from typing import Any, Optional
 
-from app.database.models import get_providers, get_provider_clients
+from app.api.dependencies import as_of_param, conditional_get
+from app.database.models import get_providers, get_provider_clients, provider_exists
+from app.services.client_service import as_of_period
+from app.utils.cache import cached
 
 router = APIRouter(
     prefix="/api/providers",
     tags=["providers"],
+    dependencies=[Depends(conditional_get)],
 )
 
 @router.get("")
+@cached("/api/providers", tags=["providers"], key=lambda: as_of_period())
 async def get_all_providers():
     """
     GET /api/providers
     
+    Cached per month, since each provider's overdue count depends on the date.
+    
     Returns: JSON response with array of provider objects including aggregated stats
     """
     providers = await get_providers()
     return {"providers": providers}
 
 @router.get("/{provider_id}/clients")
+@cached(
+    "/api/providers/{provider_id}/clients",
+    tags=["clients", "providers"],
+    key=lambda provider_id, as_of: (provider_id, as_of_period(as_of))
+)
 async def get_provider_clients_endpoint(
-    provider_id: int = Path(..., description="The provider ID")
+    provider_id: int = Path(..., description="The provider ID"),
+    as_of: Optional[date] = Depends(as_of_param)
 ):
     """
     GET /api/providers/{provider_id}/clients
     
-    Returns: JSON response with array of client objects belonging to the provider
+    Returns: JSON response with array of client objects belonging to the
+        provider, with statuses as of the ``as_of`` query date (default today)
     """
-    clients = await get_provider_clients(provider_id)
+    clients = await get_provider_clients(provider_id, as_of)
     
-    if not clients and provider_id > 0:
-        # Check if provider exists
-        providers = await get_providers()
-        provider_exists = any(p.get("id") == provider_id for p in providers)
-        
-        if not provider_exists:
-            raise HTTPException(status_code=404, detail="Provider not found")
+    if not clients and provider_id > 0 and not await provider_exists(provider_id):
+        raise HTTPException(status_code=404, detail="Provider not found")
     
     return {"clients": clients}
\ No newline at end of file
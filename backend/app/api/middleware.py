@@ -0,0 +1,51 @@
+# backend/app/api/middleware.py
+"""
+ASGI middleware.
+
+TimingMiddleware instruments every HTTP request: it collects wall time,
+SQL statements, SQL time, fetched rows and JSON render time (see
+app.utils.metrics), reports them to the client in a Server-Timing header
+and records them in per-route histograms for /api/_metrics.
+"""
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.metrics import RequestMetrics, RequestTimings, request_metrics, timing_context
+
+def route_label(scope: Scope) -> str:
+    """
+    Get the route template a request matched.
+
+    Returns: Path template such as /api/clients/{client_id}, or "unmatched"
+        for requests no route handled (keeps 404 scans out of the metrics)
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class TimingMiddleware:
+    """Per-request timing, Server-Timing header and route histograms."""
+
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", timings.server_timing())
+            await send(message)
+
+        try:
+            with timing_context(timings):
+                await self.app(scope, receive, send_with_timing)
+        finally:
+            self.metrics.observe(scope["method"], route_label(scope), status, timings, timings.elapsed())
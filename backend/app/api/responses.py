@@ -0,0 +1,119 @@
+# backend/app/api/responses.py
+"""
+Response classes for API routes.
+
+Large read endpoints return plain dicts and lists of database rows, so
+FastAPI's jsonable_encoder pass over every value is pure overhead. The
+fast_json decorator serializes those payloads directly with orjson (or the
+standard library when orjson is not installed).
+
+Documents are served with DocumentResponse, which streams from disk.
+"""
+import os
+import json
+import time
+import inspect
+import functools
+from typing import Any
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse
+from starlette.datastructures import Headers
+from starlette.types import Receive, Scope, Send
+
+from app.utils.metrics import record_serialization
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize plain JSON-compatible content, deferring odd types to jsonable_encoder.
+
+    Returns: UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
+
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=jsonable_encoder
+    ).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSON response that skips jsonable_encoder for plain dict/list/primitive content."""
+
+    def render(self, content: Any) -> bytes:
+        start = time.perf_counter()
+        body = dumps(content)
+        record_serialization(time.perf_counter() - start)
+        return body
+
+def fast_json(fn):
+    """
+    Return an endpoint's content as a FastJSONResponse.
+
+    FastAPI only skips its own encoding pass when an endpoint returns a
+    Response, which also bypasses headers set by dependencies (such as the
+    ETag from conditional_get). The wrapper injects the request's Response
+    and carries its headers over to the rendered response.
+
+    Use it below @router.get(..., response_class=FastJSONResponse) and above
+    @cached, so cached entries stay plain data.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args, response: Response, **kwargs):
+        content = await fn(*args, **kwargs)
+        if isinstance(content, Response):
+            return content
+
+        rendered = FastJSONResponse(content, status_code=response.status_code or 200)
+        rendered.headers.update(response.headers)
+        return rendered
+
+    signature = inspect.signature(fn)
+    wrapper.__signature__ = signature.replace(parameters=[
+        *signature.parameters.values(),
+        inspect.Parameter("response", inspect.Parameter.KEYWORD_ONLY, annotation=Response)
+    ])
+    return wrapper
+
+class DocumentResponse(FileResponse):
+    """
+    File response for stored documents.
+
+    FileResponse already answers Range / If-Range requests with 206 partial
+    content, sets Content-Length, Last-Modified and ETag from the file's
+    stat, and reads in fixed-size chunks on a worker thread. When the server
+    offers the ASGI pathsend extension, whole-file responses are handed to it
+    instead so the body is sent with sendfile without passing through Python.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        extensions = scope.get("extensions") or {}
+        whole_file = (
+            self.stat_result is not None
+            and scope["method"].upper() != "HEAD"
+            and "range" not in Headers(scope=scope)
+        )
+
+        if "http.response.pathsend" not in extensions or not whole_file:
+            await super().__call__(scope, receive, send)
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        await send({
+            "type": "http.response.pathsend",
+            "path": os.path.abspath(self.path),
+        })
+        if self.background is not None:
+            await self.background()
@@ -1,77 +1,247 @@
 # backend/core/config.py
 
 import os
-import sys
+from collections.abc import Iterator, MutableMapping
 from pathlib import Path
+from typing import Any, NamedTuple, Optional
 # Use absolute import instead of relative
 from app.utils.user_utils import get_user_base_path, validate_db_path
 
-# Define app mode based on environment variable or auto-detection
-APP_MODE = os.environ.get("APP_MODE", "auto").lower()  # 'home', 'office', or 'auto'
-
-# Path to local database (for home mode)
+# Path settings (app mode, database, OneDrive and document locations) are
+# resolved lazily: importing this module does no filesystem or login probing,
+# so tests, workers and CLI tools import it cheaply and headless. They are
+# resolved from the environment on first use, cached, and the database is
+# validated once by validate_settings() on application startup, falling back
+# to the local database if the configured one cannot be opened.
 LOCAL_DB_PATH = Path(__file__).parent.parent.parent / "data" / "401k_payments.db"
 
-# Get base path (for office mode)
-BASE_PATH = get_user_base_path()
-OFFICE_DB_PATH = BASE_PATH / "HohimerPro" / "database" / "401k_payments.db"
-
-# Determine which database to use based on mode and availability
-if APP_MODE == "home":
-    DB_PATH = LOCAL_DB_PATH
-elif APP_MODE == "office":
-    DB_PATH = OFFICE_DB_PATH
-else:  # Auto-detect based on file availability
-    if OFFICE_DB_PATH.exists():
-        print("Auto-detected OFFICE mode - using OneDrive database")
-        DB_PATH = OFFICE_DB_PATH
-        APP_MODE = "office"
-    else:
-        print("Auto-detected HOME mode - using local database")
-        DB_PATH = LOCAL_DB_PATH
-        APP_MODE = "home"
-
-DB_BACKUP_PATH = (BASE_PATH / "HohimerPro" / "database" / "db_backups" 
-                  if APP_MODE == "office" else Path(__file__).parent.parent / "data" / "backup_dbs")
-
-# Validate the database path to provide early and clear feedback
-try:
-    validate_db_path(DB_PATH)
-    print(f"Successfully connected to database at: {DB_PATH}")
-    print(f"Running in {APP_MODE.upper()} mode")
-except (FileNotFoundError, Exception) as e:
-    print(f"ERROR: {str(e)}")
-    print(f"Failed to access database at: {DB_PATH}")
-    
-    # If in auto mode and first attempt failed, try the alternative
-    if APP_MODE == "auto" and DB_PATH == OFFICE_DB_PATH:
-        print("Attempting to use local database instead...")
-        DB_PATH = LOCAL_DB_PATH
-        APP_MODE = "home"
-        try:
-            validate_db_path(DB_PATH)
-            print(f"Successfully connected to database at: {DB_PATH}")
-            print(f"Running in {APP_MODE.upper()} mode")
-        except (FileNotFoundError, Exception) as e2:
-            print(f"ERROR: {str(e2)}")
-            print("Unable to connect to either office or home database")
-    elif APP_MODE == "auto" and DB_PATH == LOCAL_DB_PATH:
-        print("Attempting to use office database instead...")
-        DB_PATH = OFFICE_DB_PATH
-        APP_MODE = "office"
+class PathSettings(NamedTuple):
+    """Resolved filesystem locations and the app mode they were chosen for."""
+    app_mode: str  # 'home' or 'office'
+    base_path: Path
+    db_path: Path
+    db_backup_path: Path
+    documents_root: Path
+    document_store_path: Path
+    
+    def as_dict(self) -> dict[str, Any]:
+        """
+        Returns: Settings keyed by their upper-case PATHS names
+        """
+        return {
+            'BASE_PATH': self.base_path,
+            'DB_PATH': self.db_path,
+            'DB_BACKUP_PATH': self.db_backup_path,
+            'APP_MODE': self.app_mode,
+            'DOCUMENTS_ROOT': self.documents_root,
+            'DOCUMENT_STORE_PATH': self.document_store_path,
+        }
+
+_settings: Optional[PathSettings] = None
+
+def resolve_settings(app_mode: str) -> PathSettings:
+    """
+    Resolve the path settings for an app mode.
+    
+    app_mode is 'home', 'office' or 'auto', which picks office mode when the
+    OneDrive database exists. DB_PATH, DOCUMENTS_ROOT and DOCUMENT_STORE_PATH
+    environment variables override the mode's defaults. Only checks whether
+    the office database exists; the database itself is opened by
+    validate_settings().
+    
+    Returns: PathSettings
+    """
+    base_path = get_user_base_path()
+    office_db_path = base_path / "HohimerPro" / "database" / "401k_payments.db"
+    
+    app_mode = app_mode.lower()
+    if app_mode not in ("home", "office"):
+        app_mode = "office" if office_db_path.exists() else "home"
+    office = app_mode == "office"
+    
+    default_db_path = office_db_path if office else LOCAL_DB_PATH
+    return PathSettings(
+        app_mode=app_mode,
+        base_path=base_path,
+        db_path=Path(os.environ.get("DB_PATH", str(default_db_path))),
+        db_backup_path=(base_path / "HohimerPro" / "database" / "db_backups"
+                        if office else Path(__file__).parent.parent / "data" / "backup_dbs"),
+        # Relative paths stored in client_files.onedrive_path are resolved against
+        # DOCUMENTS_ROOT; uploads are kept once per content hash in DOCUMENT_STORE_PATH
+        documents_root=Path(os.environ.get(
+            "DOCUMENTS_ROOT",
+            str(base_path if office else Path(__file__).parent.parent.parent)
+        )),
+        document_store_path=Path(os.environ.get(
+            "DOCUMENT_STORE_PATH",
+            str(base_path / "HohimerPro" / "document_store" if office
+                else Path(__file__).parent.parent.parent / "documents" / "store")
+        )),
+    )
+
+def get_settings() -> PathSettings:
+    """
+    Get the path settings, resolving them from APP_MODE on first use.
+    
+    Returns: Cached PathSettings
+    """
+    global _settings
+    if _settings is None:
+        _settings = resolve_settings(os.environ.get("APP_MODE", "auto"))
+    return _settings
+
+def use_settings(settings: Optional[PathSettings]) -> None:
+    """
+    Replace the cached settings and PATHS.
+    
+    Pass None to resolve them from the environment again on next use.
+    """
+    global _settings
+    _settings = settings
+    PATHS.reset()
+
+def validate_settings() -> bool:
+    """
+    Check once, on startup, that the configured database can be opened.
+    
+    If it cannot and it is not the local database, the local database is
+    tried instead and, when that opens, the app switches to HOME mode.
+    Failures are logged rather than raised so the API can still start and
+    report the problem from /api/health.
+    
+    Returns: True if the configured or the fallback database opens as SQLite
+    """
+    # Imported here so importing the settings stays cheap for tools that
+    # never validate
+    import logging
+    logger = logging.getLogger("app.config")
+    
+    db_path = Path(PATHS["DB_PATH"])
+    app_mode = PATHS["APP_MODE"]
+    try:
+        validate_db_path(db_path)
+    except Exception as e:
+        logger.error(f"Failed to access database at {db_path} in {app_mode.upper()} mode: {str(e)}")
+        if db_path == LOCAL_DB_PATH:
+            return False
+        
+        logger.warning("Attempting to use local database instead...")
         try:
-            validate_db_path(DB_PATH)
-            print(f"Successfully connected to database at: {DB_PATH}")
-            print(f"Running in {APP_MODE.upper()} mode")
-        except (FileNotFoundError, Exception) as e2:
-            print(f"ERROR: {str(e2)}")
-            print("Unable to connect to either office or home database")
-
-PATHS = {
-    'BASE_PATH': BASE_PATH,
-    'DB_PATH': DB_PATH,
-    'DB_BACKUP_PATH': DB_BACKUP_PATH,
-    'APP_MODE': APP_MODE,
+            validate_db_path(LOCAL_DB_PATH)
+        except Exception as e2:
+            logger.error(f"Unable to connect to either database: {str(e2)}")
+            return False
+        use_settings(resolve_settings("home")._replace(db_path=LOCAL_DB_PATH))
+        db_path, app_mode = LOCAL_DB_PATH, "home"
+    
+    logger.info(f"Using database at {db_path} in {app_mode.upper()} mode")
+    return True
+
+class _LazyPaths(MutableMapping):
+    """The PATHS dict, filled from get_settings() on first access."""
+    
+    def __init__(self):
+        self._paths: Optional[dict[str, Any]] = None
+    
+    def reset(self) -> None:
+        """Drop the resolved paths (and any overrides) so they are read from get_settings() again."""
+        self._paths = None
+    
+    def _resolved(self) -> dict[str, Any]:
+        if self._paths is None:
+            self._paths = get_settings().as_dict()
+        return self._paths
+    
+    def __getitem__(self, key: str) -> Any:
+        return self._resolved()[key]
+    
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._resolved()[key] = value
+    
+    def __delitem__(self, key: str) -> None:
+        del self._resolved()[key]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._resolved())
+    
+    def __len__(self) -> int:
+        return len(self._resolved())
+    
+    def __repr__(self) -> str:
+        return repr(self._resolved()) if self._paths is not None else "PATHS(<unresolved>)"
+
+PATHS = _LazyPaths()
+
+def __getattr__(name: str) -> Any:
+    # BASE_PATH, DB_PATH, APP_MODE, ... stay importable as module constants
+    # but resolve on first access
+    if name.isupper() and name.lower() in PathSettings._fields:
+        return PATHS[name.upper()]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Database connection pool settings
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "4"))  # Number of reader connections
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))  # Seconds to wait for a free reader
+
+# Group commit settings for the database writer
+DB_WRITE_BATCH_SIZE = int(os.environ.get("DB_WRITE_BATCH_SIZE", "50"))  # Max write jobs per transaction
+DB_WRITE_BATCH_WINDOW_MS = float(os.environ.get("DB_WRITE_BATCH_WINDOW_MS", "0"))  # Extra wait to gather concurrent writes
+
+# In-process response cache for read endpoints
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "512"))  # Max cached responses
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", "60"))  # Seconds; bounds staleness from external edits
+
+# Document uploads: streamed to disk in chunks on a dedicated thread pool
+DOCUMENT_MAX_UPLOAD_MB = int(os.environ.get("DOCUMENT_MAX_UPLOAD_MB", "100"))  # Larger uploads are rejected with 413
+DOCUMENT_UPLOAD_CHUNK_SIZE = int(os.environ.get("DOCUMENT_UPLOAD_CHUNK_SIZE", str(1024 * 1024)))  # Bytes per read/write
+DOCUMENT_IO_WORKERS = int(os.environ.get("DOCUMENT_IO_WORKERS", "4"))  # Threads for document file I/O
+DOCUMENT_GC_GRACE_SECONDS = int(os.environ.get("DOCUMENT_GC_GRACE_SECONDS", "3600"))  # Untracked store files younger than this are kept
+
+# Resolved document paths and stats are cached to avoid slow OneDrive stats
+DOCUMENT_PATH_CACHE_SIZE = int(os.environ.get("DOCUMENT_PATH_CACHE_SIZE", "2048"))  # Max cached documents
+DOCUMENT_PATH_CACHE_TTL = float(os.environ.get("DOCUMENT_PATH_CACHE_TTL", "60"))  # Seconds before a found file is re-checked
+DOCUMENT_MISSING_CACHE_TTL = float(os.environ.get("DOCUMENT_MISSING_CACHE_TTL", "10"))  # Seconds before a missing file is re-checked
+
+# First-page document previews, rendered on a process pool and cached locally
+# (outside OneDrive, so previews are not synced)
+PREVIEW_CACHE_PATH = Path(os.environ.get(
+    "PREVIEW_CACHE_PATH",
+    str(Path(__file__).parent.parent.parent / "cache" / "previews")
+))
+PREVIEW_WORKERS = int(os.environ.get("PREVIEW_WORKERS", "2"))  # Rendering processes
+PREVIEW_WIDTH = int(os.environ.get("PREVIEW_WIDTH", "480"))  # Pixels
+
+# Bulk payment import: rows are parsed in batches off the event loop and
+# inserted in a single transaction
+PAYMENT_IMPORT_MAX_ROWS = int(os.environ.get("PAYMENT_IMPORT_MAX_ROWS", "10000"))
+PAYMENT_IMPORT_BATCH_SIZE = int(os.environ.get("PAYMENT_IMPORT_BATCH_SIZE", "500"))  # Rows parsed per worker-thread hop
+
+# Active contract fee structures for the expected-fee endpoints
+FEE_STRUCTURE_CACHE_SIZE = int(os.environ.get("FEE_STRUCTURE_CACHE_SIZE", "1024"))  # Max cached contracts
+FEE_STRUCTURE_CACHE_TTL = float(os.environ.get("FEE_STRUCTURE_CACHE_TTL", "300"))  # Seconds; bounds staleness from external contract edits
+EXPECTED_FEE_BATCH_MAX = int(os.environ.get("EXPECTED_FEE_BATCH_MAX", "500"))  # Items per batch request
+
+# Overdue reports memoized per (data version, status month)
+PAYMENT_STATUS_CACHE_SIZE = int(os.environ.get("PAYMENT_STATUS_CACHE_SIZE", "64"))  # Max cached reports
+PAYMENT_STATUS_CACHE_TTL = float(os.environ.get("PAYMENT_STATUS_CACHE_TTL", "3600"))  # Seconds; entries are keyed by data version, so this only bounds memory
+
+# SQLite PRAGMA profile applied to every connection. journal_mode is set once
+# on the writer; if the filesystem cannot do WAL the pool falls back to
+# DB_SAFE_MODE_PRAGMAS. Set DB_JOURNAL_MODE=DELETE to force rollback journaling.
+DB_PRAGMAS = {
+    "journal_mode": os.environ.get("DB_JOURNAL_MODE", "WAL").upper(),
+    "synchronous": os.environ.get("DB_SYNCHRONOUS", "NORMAL").upper(),
+    "mmap_size": int(os.environ.get("DB_MMAP_SIZE", str(256 * 1024 * 1024))),  # Bytes
+    "cache_size": int(os.environ.get("DB_CACHE_SIZE", "-65536")),  # Negative values are KiB
+    "temp_store": os.environ.get("DB_TEMP_STORE", "MEMORY").upper(),
+    "busy_timeout": int(os.environ.get("DB_BUSY_TIMEOUT_MS", "5000")),
+    "foreign_keys": os.environ.get("DB_FOREIGN_KEYS", "ON").upper(),
+}
+
+DB_SAFE_MODE_PRAGMAS = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+    "mmap_size": 0,
 }
 
 ORIGINS = [
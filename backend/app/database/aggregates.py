@@ -0,0 +1,305 @@
+"""
+Payment aggregate maintenance.
+
+quarterly_summaries, yearly_summaries and client_metrics used to be kept by
+triggers that re-aggregated a client's whole quarter and year on every insert
+and never saw soft deletes. Payment writes now maintain them inside their own
+transaction: the inserted and retired payment rows are folded into
+per-quarter and per-year deltas and added to the stored running sums, so a
+write costs O(changed rows) however long the client's history is. The
+touched clients' client_metrics rows are then recomputed from the summary
+tables and an indexed seek for the latest payment.
+
+This module also provides a full rebuild and a consistency check against the
+*_source views (see app.database.schema).
+"""
+import math
+from typing import Any, Iterable, Optional
+
+import aiosqlite
+
+from app.database.schema import (
+    AGGREGATE_REBUILD,
+    CLIENT_METRICS_COLUMNS,
+    QUARTERLY_SUMMARY_COLUMNS,
+    YEARLY_SUMMARY_COLUMNS
+)
+
+# Delta slots: total_payments, payment_count, expected_total, assets_sum, assets_count
+TOTAL, COUNT, EXPECTED, ASSETS_SUM, ASSETS_COUNT = range(5)
+
+# expected_total is a running sum of expected_fee, like total_payments (see
+# QUARTERLY_SUMMARIES_SOURCE_VIEW), not the trigger-era MAX
+QUARTERLY_UPSERT = """
+INSERT INTO quarterly_summaries (
+    client_id, year, quarter, total_payments, payment_count, expected_total,
+    assets_sum, assets_count, total_assets, avg_payment, last_updated
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+ON CONFLICT(client_id, year, quarter) DO UPDATE SET
+    total_payments = total_payments + excluded.total_payments,
+    payment_count = payment_count + excluded.payment_count,
+    expected_total = expected_total + excluded.expected_total,
+    assets_sum = assets_sum + excluded.assets_sum,
+    assets_count = assets_count + excluded.assets_count,
+    total_assets = (assets_sum + excluded.assets_sum) / NULLIF(assets_count + excluded.assets_count, 0),
+    avg_payment = (total_payments + excluded.total_payments) / NULLIF(payment_count + excluded.payment_count, 0),
+    last_updated = excluded.last_updated
+"""
+
+YEARLY_UPSERT = """
+INSERT INTO yearly_summaries (
+    client_id, year, total_payments, payment_count,
+    assets_sum, assets_count, total_assets, avg_payment, last_updated
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+ON CONFLICT(client_id, year) DO UPDATE SET
+    total_payments = total_payments + excluded.total_payments,
+    payment_count = payment_count + excluded.payment_count,
+    assets_sum = assets_sum + excluded.assets_sum,
+    assets_count = assets_count + excluded.assets_count,
+    total_assets = (assets_sum + excluded.assets_sum) / NULLIF(assets_count + excluded.assets_count, 0),
+    avg_payment = (total_payments + excluded.total_payments) / NULLIF(payment_count + excluded.payment_count, 0),
+    last_updated = excluded.last_updated
+"""
+
+# Growth depends on the previous year, so it is recomputed for each touched
+# year and the year after it
+YOY_UPDATE = """
+UPDATE yearly_summaries
+SET yoy_growth = (
+    SELECT
+        CASE
+            WHEN prev.total_payments <> 0 THEN
+                (yearly_summaries.total_payments - prev.total_payments) / prev.total_payments * 100
+            ELSE NULL
+        END
+    FROM yearly_summaries prev
+    WHERE prev.client_id = yearly_summaries.client_id AND prev.year = yearly_summaries.year - 1
+)
+WHERE client_id = ? AND year IN (?, ?)
+"""
+
+def payment_bucket(payment: dict[str, Any]) -> Optional[tuple[int, int]]:
+    """
+    Get the year and quarter a payment is summarized under.
+
+    Mirrors PAYMENT_SUMMARY_YEAR / PAYMENT_SUMMARY_QUARTER: the first applied
+    period, with months rolled up into their calendar quarter.
+
+    Returns: (year, quarter), or None if the payment has no applied period
+    """
+    year = payment.get("applied_start_quarter_year")
+    if year is None:
+        year = payment.get("applied_start_month_year")
+
+    quarter = payment.get("applied_start_quarter")
+    if quarter is None and payment.get("applied_start_month") is not None:
+        quarter = (int(payment["applied_start_month"]) + 2) // 3
+
+    if year is None or quarter is None:
+        return None
+    return int(year), int(quarter)
+
+def summary_deltas(
+    added: Iterable[dict[str, Any]] = (),
+    removed: Iterable[dict[str, Any]] = ()
+) -> tuple[dict[tuple[int, int, int], list], dict[tuple[int, int], list]]:
+    """
+    Fold inserted and retired payments into summary deltas.
+
+    Args:
+        added: Payment rows that became valid
+        removed: Payment rows that were soft-deleted or superseded
+
+    Returns: Tuple of (deltas per (client_id, year, quarter), deltas per
+        (client_id, year)), each a list indexed by TOTAL, COUNT, EXPECTED,
+        ASSETS_SUM and ASSETS_COUNT
+    """
+    quarterly: dict[tuple[int, int, int], list] = {}
+    yearly: dict[tuple[int, int], list] = {}
+
+    for payments, sign in ((added, 1), (removed, -1)):
+        for payment in payments:
+            bucket = payment_bucket(payment)
+            if bucket is None:
+                continue
+            client_id = int(payment["client_id"])
+            year, quarter = bucket
+
+            assets = payment.get("total_assets")
+            change = [
+                sign * float(payment.get("actual_fee") or 0),
+                sign,
+                sign * float(payment.get("expected_fee") or 0),
+                sign * float(assets) if assets is not None else 0.0,
+                sign if assets is not None else 0,
+            ]
+            for deltas, key in ((quarterly, (client_id, year, quarter)), (yearly, (client_id, year))):
+                totals = deltas.setdefault(key, [0.0, 0, 0.0, 0.0, 0])
+                for slot, value in enumerate(change):
+                    totals[slot] += value
+
+    return quarterly, yearly
+
+def _average(total: float, count: int) -> Optional[float]:
+    return total / count if count else None
+
+async def refresh_client_metrics(conn: aiosqlite.Connection, client_id: int) -> None:
+    """
+    Recompute the client_metrics row for one client.
+
+    Runs on the caller's connection and does not commit. Call it after the
+    summary tables are up to date, since the totals are read from them.
+
+    Args:
+        conn: Writer connection
+        client_id: Client whose metrics should be refreshed
+    """
+    await conn.execute("DELETE FROM client_metrics WHERE client_id = ?", (client_id,))
+    await conn.execute(
+        f"""
+        INSERT INTO client_metrics ({CLIENT_METRICS_COLUMNS}, last_updated)
+        SELECT {CLIENT_METRICS_COLUMNS}, datetime('now') FROM client_metrics_source
+        WHERE client_id = ?
+        """,
+        (client_id,)
+    )
+
+async def apply_payment_changes(
+    conn: aiosqlite.Connection,
+    added: Iterable[dict[str, Any]] = (),
+    removed: Iterable[dict[str, Any]] = ()
+) -> None:
+    """
+    Apply inserted and retired payments to the payment aggregates.
+
+    Runs on the caller's connection and does not commit, so the aggregates
+    change in the same transaction as the payments. Call it before
+    refresh_client_summary, which reads client_metrics.
+
+    Args:
+        conn: Writer connection
+        added: Payment rows that became valid (inserts and new versions)
+        removed: Payment rows that stopped being valid (soft deletes and
+            superseded versions)
+    """
+    added, removed = list(added), list(removed)
+    quarterly, yearly = summary_deltas(added, removed)
+
+    if quarterly:
+        await conn.executemany(QUARTERLY_UPSERT, [
+            (client_id, year, quarter, d[TOTAL], d[COUNT], d[EXPECTED], d[ASSETS_SUM], d[ASSETS_COUNT],
+             _average(d[ASSETS_SUM], d[ASSETS_COUNT]), _average(d[TOTAL], d[COUNT]))
+            for (client_id, year, quarter), d in quarterly.items()
+        ])
+        await conn.executemany(
+            "DELETE FROM quarterly_summaries WHERE client_id = ? AND year = ? AND quarter = ? AND payment_count <= 0",
+            list(quarterly)
+        )
+
+    if yearly:
+        await conn.executemany(YEARLY_UPSERT, [
+            (client_id, year, d[TOTAL], d[COUNT], d[ASSETS_SUM], d[ASSETS_COUNT],
+             _average(d[ASSETS_SUM], d[ASSETS_COUNT]), _average(d[TOTAL], d[COUNT]))
+            for (client_id, year), d in yearly.items()
+        ])
+        await conn.executemany(
+            "DELETE FROM yearly_summaries WHERE client_id = ? AND year = ? AND payment_count <= 0",
+            list(yearly)
+        )
+        await conn.executemany(YOY_UPDATE, [(client_id, year, year + 1) for client_id, year in yearly])
+
+    client_ids = {int(payment["client_id"]) for payment in added + removed}
+    for client_id in sorted(client_ids):
+        await refresh_client_metrics(conn, client_id)
+
+async def rebuild_aggregates(conn: aiosqlite.Connection) -> dict[str, int]:
+    """
+    Rebuild quarterly_summaries, yearly_summaries and client_metrics from scratch.
+
+    client_summary and provider_rollup read client_metrics, so they are
+    rebuilt in the same transaction.
+
+    Args:
+        conn: Writer connection
+
+    Returns: Dictionary mapping table name to the number of rows written
+    """
+    try:
+        await conn.execute("BEGIN")
+        for statement in AGGREGATE_REBUILD:
+            await conn.execute(statement)
+        await conn.execute("DELETE FROM client_summary")
+        await conn.execute("INSERT OR REPLACE INTO client_summary SELECT * FROM client_summary_source")
+        await conn.execute("DELETE FROM provider_rollup")
+        await conn.execute("INSERT OR REPLACE INTO provider_rollup SELECT * FROM provider_rollup_source")
+        await conn.commit()
+    except Exception:
+        await conn.rollback()
+        raise
+
+    counts = {}
+    for table in ("quarterly_summaries", "yearly_summaries", "client_metrics"):
+        cursor = await conn.execute(f"SELECT COUNT(*) AS total FROM {table}")
+        counts[table] = (await cursor.fetchone())["total"]
+    return counts
+
+def _same(expected: Any, actual: Any) -> bool:
+    # Running sums and a fresh aggregate may differ in the last float digits
+    if isinstance(expected, float) or isinstance(actual, float):
+        if expected is None or actual is None:
+            return False
+        return math.isclose(expected, actual, rel_tol=1e-9, abs_tol=1e-6)
+    return expected == actual
+
+async def _compare(
+    conn: aiosqlite.Connection,
+    table: str,
+    columns: str,
+    keys: tuple[str, ...]
+) -> dict[str, Any]:
+    cursor = await conn.execute(f"SELECT {columns} FROM {table}_source")
+    expected = {tuple(row[key] for key in keys): row for row in await cursor.fetchall()}
+
+    cursor = await conn.execute(f"SELECT {columns} FROM {table}")
+    actual = {tuple(row[key] for key in keys): row for row in await cursor.fetchall()}
+
+    mismatched = sorted(
+        key for key in set(expected) & set(actual)
+        if not all(_same(value, actual[key][column]) for column, value in expected[key].items())
+    )
+    return {
+        "checked": len(expected),
+        "missing": sorted(set(expected) - set(actual)),
+        "extra": sorted(set(actual) - set(expected)),
+        "mismatched": mismatched
+    }
+
+async def check_aggregates(conn: aiosqlite.Connection) -> dict[str, Any]:
+    """
+    Compare the payment aggregates with their *_source views.
+
+    client_metrics.total_ytd_payments depends on the current year, so after
+    New Year the metrics report mismatches until the next rebuild.
+
+    Args:
+        conn: Database connection
+
+    Returns: Dictionary with an overall consistent flag and, per table, the
+        missing, extra and mismatched keys
+    """
+    report = {
+        "quarterly_summaries": await _compare(
+            conn, "quarterly_summaries", QUARTERLY_SUMMARY_COLUMNS, ("client_id", "year", "quarter")
+        ),
+        "yearly_summaries": await _compare(
+            conn, "yearly_summaries", YEARLY_SUMMARY_COLUMNS, ("client_id", "year")
+        ),
+        "client_metrics": await _compare(
+            conn, "client_metrics", CLIENT_METRICS_COLUMNS, ("client_id",)
+        ),
+    }
+    consistent = not any(
+        table["missing"] or table["extra"] or table["mismatched"]
+        for table in report.values()
+    )
+    return {"consistent": consistent, **report}
@@ -0,0 +1,81 @@
+"""
+Materialized client summary maintenance.
+
+The client_summary table holds one precomputed frontend_client_details row
+per active client. Payment writes refresh the affected client inside their
+own transaction; this module also provides a full rebuild and a consistency
+check against the live view.
+"""
+from typing import Any
+
+import aiosqlite
+
+async def refresh_client_summary(conn: aiosqlite.Connection, client_id: int) -> None:
+    """
+    Recompute the summary row for one client.
+
+    Runs on the caller's connection and does not commit, so it joins the
+    caller's transaction.
+
+    Args:
+        conn: Writer connection
+        client_id: Client whose summary should be refreshed
+    """
+    await conn.execute("DELETE FROM client_summary WHERE id = ?", (client_id,))
+    await conn.execute(
+        "INSERT OR REPLACE INTO client_summary SELECT * FROM client_summary_source WHERE id = ?",
+        (client_id,)
+    )
+
+async def rebuild_client_summary(conn: aiosqlite.Connection) -> int:
+    """
+    Rebuild the whole client_summary table from scratch.
+
+    Args:
+        conn: Writer connection
+
+    Returns: Number of summary rows written
+    """
+    try:
+        await conn.execute("BEGIN")
+        await conn.execute("DELETE FROM client_summary")
+        await conn.execute("INSERT OR REPLACE INTO client_summary SELECT * FROM client_summary_source")
+        await conn.commit()
+    except Exception:
+        await conn.rollback()
+        raise
+
+    cursor = await conn.execute("SELECT COUNT(*) AS total FROM client_summary")
+    row = await cursor.fetchone()
+    return row["total"]
+
+async def check_client_summary(conn: aiosqlite.Connection) -> dict[str, Any]:
+    """
+    Compare client_summary with the frontend_client_details view.
+
+    Args:
+        conn: Database connection
+
+    Returns: Dictionary listing missing, extra and mismatched client IDs
+    """
+    cursor = await conn.execute("SELECT * FROM frontend_client_details")
+    expected = {row["id"]: row for row in await cursor.fetchall()}
+
+    cursor = await conn.execute("SELECT * FROM client_summary")
+    actual = {row["id"]: row for row in await cursor.fetchall()}
+
+    missing = sorted(set(expected) - set(actual))
+    extra = sorted(set(actual) - set(expected))
+    # client_summary carries extra columns (the last paid period) the view lacks
+    mismatched = sorted(
+        client_id for client_id in set(expected) & set(actual)
+        if any(actual[client_id].get(column) != value for column, value in expected[client_id].items())
+    )
+
+    return {
+        "checked": len(expected),
+        "consistent": not (missing or extra or mismatched),
+        "missing": missing,
+        "extra": extra,
+        "mismatched": mismatched
+    }
@@ -1,118 +1,760 @@
-# backend/app/database/database.py
 """
 Database connection and session management.
 
 This module handles SQLite database connection, providing:
 - Database initialization
-- Connection management
+- Connection pooling (bounded reader pool plus a dedicated writer)
 - Session management
 - Query execution utilities
 """
+import time
+import uuid
+import asyncio
+import logging
+import sqlite3
 import aiosqlite
 from contextlib import asynccontextmanager
-from typing import Any, Optional
-from app.core.config import PATHS
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+from app.core.config import (
+    PATHS,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_WRITE_BATCH_SIZE,
+    DB_WRITE_BATCH_WINDOW_MS,
+    DB_PRAGMAS,
+    DB_SAFE_MODE_PRAGMAS
+)
+from app.database.rows import make_dict_factory
+from app.database.schema import apply_migrations
+from app.utils.metrics import current_timings, record_sql, timing_context
 
-# Global connection variable (will be initialized on startup)
-_db_connection = None
+logger = logging.getLogger("app.database")
 
-def dict_factory(cursor, row):
-    """Convert row results to dictionary with column names as keys."""
-    return {col[0]: row[idx] for idx, col in enumerate(cursor.description)}
+# Global pool variable (will be initialized on startup)
+_db_pool = None
 
-async def init_db_pool():
-    """Initialize the database connection."""
-    global _db_connection
+T = TypeVar("T")
+
+# A write job runs statements on the writer connection without committing
+WriteJobFn = Callable[[aiosqlite.Connection], Awaitable[T]]
+
+# Queued after all pending jobs to stop the writer
+_STOP = object()
+
+# aiosqlite runs every statement and fetch, for connections and cursors
+# alike, through Connection._execute on the connection's thread. That method
+# is private, so requirements.txt pins the aiosqlite versions it is known in,
+# and tests/test_metrics.py fails if statements stop being counted.
+_STATEMENT_CALLS = frozenset({"execute", "executemany", "executescript"})
+_FETCH_CALLS = frozenset({"fetchone", "fetchmany", "fetchall"})
+
+class TimedConnection(aiosqlite.Connection):
+    """
+    aiosqlite connection that reports SQL time to the current request.
+
+    Statement and fetch calls made while a request's timings are current
+    (see app.utils.metrics) add their wall time, including the hop to the
+    connection thread, plus the statement count and fetched rows.
+    """
+
+    async def _execute(self, fn, *args, **kwargs):
+        name = getattr(fn, "__name__", None)
+        if current_timings() is None or (name not in _STATEMENT_CALLS and name not in _FETCH_CALLS):
+            return await super()._execute(fn, *args, **kwargs)
+
+        start = time.perf_counter()
+        result = await super()._execute(fn, *args, **kwargs)
+        elapsed = time.perf_counter() - start
+
+        if name in _STATEMENT_CALLS:
+            record_sql(elapsed, statements=1)
+        elif name == "fetchone":
+            record_sql(elapsed, rows=0 if result is None else 1)
+        else:
+            record_sql(elapsed, rows=len(result))
+        return result
+
+def connect(database: str, **kwargs: Any) -> TimedConnection:
+    """
+    Open an instrumented connection, like aiosqlite.connect.
+
+    Returns: Awaitable TimedConnection
+    """
+    return TimedConnection(lambda: sqlite3.connect(database, **kwargs), iter_chunk_size=64)
+
+class WriteJob:
+    """A unit of write work queued for the database writer."""
+
+    __slots__ = ("fn", "exclusive", "future", "queued_at", "timings")
+
+    def __init__(self, fn: WriteJobFn, exclusive: bool = False):
+        self.fn = fn
+        self.exclusive = exclusive
+        self.future = asyncio.get_running_loop().create_future()
+        self.queued_at = time.perf_counter()
+        # The submitting request, charged with the job's statements
+        self.timings = current_timings()
+
+def _fail_jobs(jobs: list[WriteJob], error: BaseException) -> None:
+    """Resolve the futures of jobs that will not run, cancelling them if the writer was cancelled."""
+    for job in jobs:
+        if job.future.done():
+            continue
+        if isinstance(error, asyncio.CancelledError):
+            job.future.cancel()
+        else:
+            job.future.set_exception(error)
+
+class DatabaseWriter:
+    """
+    Actor that owns the only write connection.
+
+    Callers submit write jobs through a queue. Jobs that are waiting together
+    are coalesced into a single transaction (group commit), each wrapped in its
+    own SAVEPOINT so a failing job is rolled back without affecting the others.
+    Every caller's future resolves only after the shared COMMIT succeeds.
+    """
+
+    def __init__(
+        self,
+        conn: aiosqlite.Connection,
+        max_batch: int = DB_WRITE_BATCH_SIZE,
+        batch_window: float = DB_WRITE_BATCH_WINDOW_MS / 1000
+    ):
+        self.conn = conn
+        self.max_batch = max(1, max_batch)
+        self.batch_window = batch_window
+
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._deferred: Any = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Throughput and wait-time metrics
+        self.jobs = 0
+        self.batched_jobs = 0
+        self.failed_jobs = 0
+        self.commits = 0
+        self.max_batch_seen = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def start(self) -> None:
+        """Start the writer task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="database-writer")
+
+    async def stop(self) -> None:
+        """Finish queued jobs, then stop the writer task."""
+        task, self._task = self._task, None
+        if task is None or task.done():
+            return
+        await self._queue.put(_STOP)
+        await task
+
+    async def submit(self, fn: WriteJobFn, exclusive: bool = False) -> Any:
+        """
+        Queue a write job and wait for it to be committed.
+
+        Args:
+            fn: Coroutine function receiving the writer connection. It must not
+                commit or roll back; the writer manages the transaction.
+            exclusive: Run alone, outside any writer-managed transaction
+
+        Returns: The job's return value once its transaction has committed
+        """
+        if self._task is None:
+            raise RuntimeError("Database writer not running")
+
+        job = WriteJob(fn, exclusive=exclusive)
+        await self._queue.put(job)
+        return await job.future
+
+    @asynccontextmanager
+    async def lease(self):
+        """
+        Borrow the writer connection exclusively for the duration of the block.
+
+        Used by maintenance tasks and migrations that manage their own
+        transactions. Queued jobs wait until the lease is released.
+        """
+        loop = asyncio.get_running_loop()
+        acquired = loop.create_future()
+        released = asyncio.Event()
+
+        async def hold(conn: aiosqlite.Connection) -> None:
+            acquired.set_result(conn)
+            await released.wait()
+
+        job_task = asyncio.ensure_future(self.submit(hold, exclusive=True))
+        try:
+            done, _ = await asyncio.wait({acquired, job_task}, return_when=asyncio.FIRST_COMPLETED)
+            if acquired not in done:
+                # The job failed before handing over the connection
+                await job_task
+            yield acquired.result()
+        finally:
+            released.set()
+            await job_task
+
+    async def _next_job(self) -> Any:
+        if self._deferred is not None:
+            job, self._deferred = self._deferred, None
+            return job
+        return await self._queue.get()
+
+    async def _run(self) -> None:
+        try:
+            await self._process()
+        except BaseException as e:
+            # Cancelled or crashed: nothing will run the jobs still waiting
+            pending = [self._deferred] if self._deferred is not None else []
+            self._deferred = None
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            _fail_jobs([job for job in pending if job is not _STOP], e)
+            raise
+
+    async def _process(self) -> None:
+        while True:
+            job = await self._next_job()
+            if job is _STOP:
+                break
+
+            if job.exclusive:
+                await self._run_exclusive(job)
+                continue
+
+            # Give concurrent callers a moment to join this transaction
+            if self.batch_window > 0:
+                await asyncio.sleep(self.batch_window)
+
+            batch = [job]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                nxt = self._queue.get_nowait()
+                if nxt is _STOP or nxt.exclusive:
+                    # Handled on the next iteration, after this batch commits
+                    self._deferred = nxt
+                    break
+                batch.append(nxt)
+
+            await self._run_batch(batch)
+
+    def _record_start(self, job: WriteJob) -> None:
+        waited = time.perf_counter() - job.queued_at
+        self.jobs += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+
+    async def _run_exclusive(self, job: WriteJob) -> None:
+        self._record_start(job)
+        try:
+            with timing_context(job.timings):
+                result = await job.fn(self.conn)
+        except BaseException as e:
+            self.failed_jobs += 1
+            _fail_jobs([job], e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        if not job.future.done():
+            job.future.set_result(result)
+
+    async def _run_batch(self, batch: list[WriteJob]) -> None:
+        outcomes: list[tuple[WriteJob, Any, Optional[BaseException]]] = []
+        self.max_batch_seen = max(self.max_batch_seen, len(batch))
+        self.batched_jobs += len(batch)
+
+        try:
+            await self.conn.execute("BEGIN IMMEDIATE")
+
+            for index, job in enumerate(batch):
+                self._record_start(job)
+                savepoint = f"write_job_{index}"
+                await self.conn.execute(f"SAVEPOINT {savepoint}")
+                try:
+                    with timing_context(job.timings):
+                        result = await job.fn(self.conn)
+                except Exception as e:
+                    await self.conn.execute(f"ROLLBACK TO {savepoint}")
+                    await self.conn.execute(f"RELEASE {savepoint}")
+                    outcomes.append((job, None, e))
+                else:
+                    await self.conn.execute(f"RELEASE {savepoint}")
+                    outcomes.append((job, result, None))
+
+            await self.conn.commit()
+            self.commits += 1
+        except BaseException as e:
+            # Also reached on cancellation (e.g. shutdown mid-batch), which
+            # must not leave the BEGIN IMMEDIATE transaction open or callers
+            # waiting forever
+            logger.error(f"Write batch of {len(batch)} jobs failed: {e!r}")
+            try:
+                await self.conn.rollback()
+            except Exception:
+                pass
+            self.failed_jobs += len(batch)
+            _fail_jobs(batch, e)
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        for job, result, error in outcomes:
+            if job.future.done():
+                continue
+            if error is not None:
+                self.failed_jobs += 1
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
+
+    def stats(self) -> dict[str, Any]:
+        """Return writer throughput and queue wait metrics."""
+        return {
+            "queued": self._queue.qsize(),
+            "jobs": self.jobs,
+            "failedJobs": self.failed_jobs,
+            "commits": self.commits,
+            "avgBatchSize": round(self.batched_jobs / self.commits, 2) if self.commits else 0.0,
+            "maxBatchSize": self.max_batch_seen,
+            "avgWaitMs": round(self._total_wait / self.jobs * 1000, 3) if self.jobs else 0.0,
+            "maxWaitMs": round(self._max_wait * 1000, 3),
+        }
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections.
+
+    Holds ``size`` read-only connections that are handed out with
+    acquire/release semantics, plus one dedicated writer connection owned by
+    a DatabaseWriter. Every aiosqlite connection owns its own background
+    thread, so concurrent readers no longer queue behind each other.
+    """
+
+    def __init__(self, db_path: str, size: int = DB_POOL_SIZE, timeout: float = DB_POOL_TIMEOUT):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+
+        self._readers: asyncio.Queue = asyncio.Queue(maxsize=size)
+        self._all_readers: list[aiosqlite.Connection] = []
+        self._writer: Optional[DatabaseWriter] = None
+        self._closed = True
+
+        # Idle connection used only to observe PRAGMA data_version, which
+        # changes whenever any other connection (ours or external) commits
+        self._version_conn: Optional[aiosqlite.Connection] = None
+        self.instance_id = uuid.uuid4().hex[:8]
+
+        # Connection PRAGMAs; journal_mode is negotiated once on open()
+        self.pragmas = dict(DB_PRAGMAS)
+        self.safe_mode = False
+        self.effective_pragmas: dict[str, Any] = {}
+
+        # Wait-time metrics
+        self._acquire_count = 0
+        self._timeout_count = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    async def _connect(self, read_only: bool) -> aiosqlite.Connection:
+        """Open and configure a single connection."""
+        # The writer manages transactions explicitly (BEGIN/SAVEPOINT/COMMIT)
+        conn = await connect(
+            self.db_path,
+            isolation_level="" if read_only else None
+        )
+        conn.row_factory = make_dict_factory()
+
+        for name, value in self.pragmas.items():
+            if name == "journal_mode":
+                continue  # Database-wide, set once by _configure_journal_mode
+            await conn.execute(f"PRAGMA {name} = {value}")
+
+        if read_only:
+            # Guard against accidental writes through the reader pool
+            await conn.execute("PRAGMA query_only = ON")
+
+        return conn
+
+    async def open(self) -> None:
+        """Open all reader connections and the writer connection."""
+        if not self._closed:
+            return
+
+        writer_conn = await self._connect(read_only=False)
+        await self._configure_journal_mode(writer_conn)
+
+        self._writer = DatabaseWriter(writer_conn)
+        self._writer.start()
+
+        for _ in range(self.size):
+            conn = await self._connect(read_only=True)
+            self._all_readers.append(conn)
+            self._readers.put_nowait(conn)
+
+        self._version_conn = await self._connect(read_only=True)
+
+        self._closed = False
+        logger.info(f"Database pool opened with {self.size} readers and 1 writer")
+
+        self.effective_pragmas = await self._read_pragmas(writer_conn)
+        settings = ", ".join(f"{name}={value}" for name, value in self.effective_pragmas.items())
+        logger.info(f"Effective SQLite settings{' (safe mode)' if self.safe_mode else ''}: {settings}")
+
+    async def _configure_journal_mode(self, conn: aiosqlite.Connection) -> None:
+        """
+        Switch the database to the configured journal mode.
+
+        Falls back to the safe-mode profile when the filesystem refuses the
+        requested mode (e.g. WAL on a network share without shared memory).
+        """
+        requested = str(self.pragmas.get("journal_mode", "DELETE")).lower()
+
+        try:
+            cursor = await conn.execute(f"PRAGMA journal_mode = {requested}")
+            row = await cursor.fetchone()
+            actual = str(row["journal_mode"]).lower() if row else ""
+        except Exception as e:
+            logger.warning(f"Unable to set journal_mode={requested}: {str(e)}")
+            actual = ""
+
+        if actual == requested:
+            return
+
+        logger.warning(
+            f"journal_mode={requested} not supported here (got '{actual or 'error'}'); "
+            f"falling back to safe mode"
+        )
+        self.safe_mode = True
+        self.pragmas.update(DB_SAFE_MODE_PRAGMAS)
+
+        try:
+            await conn.execute(f"PRAGMA journal_mode = {DB_SAFE_MODE_PRAGMAS['journal_mode']}")
+        except Exception as e:
+            # Another process holds the database; keep whatever mode it uses
+            logger.warning(f"Unable to switch to safe-mode journal: {str(e)}")
+
+        for name, value in DB_SAFE_MODE_PRAGMAS.items():
+            if name != "journal_mode":
+                await conn.execute(f"PRAGMA {name} = {value}")
+
+    async def _read_pragmas(self, conn: aiosqlite.Connection) -> dict[str, Any]:
+        """Read back the effective value of every configured PRAGMA."""
+        effective = {}
+        for name in self.pragmas:
+            cursor = await conn.execute(f"PRAGMA {name}")
+            row = await cursor.fetchone()
+            effective[name] = next(iter(row.values())) if row else None
+        return effective
+
+    async def close(self) -> None:
+        """Close every connection owned by the pool."""
+        self._closed = True
+
+        for conn in self._all_readers:
+            await conn.close()
+        self._all_readers.clear()
+
+        while not self._readers.empty():
+            self._readers.get_nowait()
+
+        if self._version_conn is not None:
+            await self._version_conn.close()
+            self._version_conn = None
+
+        if self._writer is not None:
+            await self._writer.stop()
+            await self._writer.conn.close()
+            self._writer = None
+
+    async def acquire(self) -> aiosqlite.Connection:
+        """
+        Take a reader connection from the pool, waiting up to ``timeout`` seconds.
+
+        Returns: Read-only database connection
+        """
+        if self._closed:
+            raise RuntimeError("Database pool not initialized")
+
+        start = time.perf_counter()
+        try:
+            conn = await asyncio.wait_for(self._readers.get(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self._timeout_count += 1
+            raise RuntimeError(f"Timed out after {self.timeout}s waiting for a database connection")
+
+        waited = time.perf_counter() - start
+        self._acquire_count += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+
+        return conn
+
+    async def release(self, conn: aiosqlite.Connection) -> None:
+        """Return a reader connection to the pool."""
+        if self._closed or conn not in self._all_readers:
+            return
+
+        self._readers.put_nowait(conn)
+
+    @asynccontextmanager
+    async def reader(self):
+        """Acquire a reader connection for the duration of the block."""
+        conn = await self.acquire()
+        try:
+            yield conn
+        finally:
+            await self.release(conn)
+
+    async def submit(self, fn: WriteJobFn, exclusive: bool = False) -> Any:
+        """Queue a write job on the writer; see DatabaseWriter.submit."""
+        if self._closed or self._writer is None:
+            raise RuntimeError("Database pool not initialized")
+        return await self._writer.submit(fn, exclusive=exclusive)
+
+    @asynccontextmanager
+    async def writer(self):
+        """Borrow the writer connection exclusively for the duration of the block."""
+        if self._closed or self._writer is None:
+            raise RuntimeError("Database pool not initialized")
+
+        async with self._writer.lease() as conn:
+            yield conn
+
+    async def set_trace_callback(self, handler: Optional[Callable[[str], None]]) -> None:
+        """
+        Call handler with the SQL of every statement run on any pooled connection.
+
+        Used for debugging and query-count tests; pass None to stop tracing.
+        The handler runs on the connections' threads.
+        """
+        if self._closed or self._writer is None:
+            raise RuntimeError("Database pool not initialized")
+
+        for conn in (*self._all_readers, self._writer.conn):
+            await conn.set_trace_callback(handler)
+
+    async def data_version(self) -> str:
+        """
+        Return a token that changes whenever the database content changes.
+
+        Combines this pool's instance id with the probe connection's
+        PRAGMA data_version, so committed writes from the app and from
+        external tools are both observed without touching any table.
+
+        Returns: Opaque data version string
+        """
+        if self._closed or self._version_conn is None:
+            raise RuntimeError("Database pool not initialized")
+
+        cursor = await self._version_conn.execute("PRAGMA data_version")
+        row = await cursor.fetchone()
+        return f"{self.instance_id}-{row['data_version']}"
+
+    async def health_check(self) -> dict[str, Any]:
+        """
+        Ping every idle reader and the writer, replacing broken readers.
+
+        Returns: Dictionary with health status and pool statistics
+        """
+        if self._closed:
+            return {"healthy": False, "error": "Database pool not initialized"}
+
+        healthy = True
+        replaced = 0
+
+        # Only idle readers are checked so in-flight requests are not disturbed
+        idle = []
+        while not self._readers.empty():
+            idle.append(self._readers.get_nowait())
+
+        for conn in idle:
+            try:
+                await conn.execute("SELECT 1")
+                self._readers.put_nowait(conn)
+            except Exception as e:
+                logger.warning(f"Replacing broken reader connection: {str(e)}")
+                self._all_readers.remove(conn)
+                try:
+                    fresh = await self._connect(read_only=True)
+                except Exception as e2:
+                    logger.error(f"Unable to reopen reader connection: {str(e2)}")
+                    healthy = False
+                    continue
+                self._all_readers.append(fresh)
+                self._readers.put_nowait(fresh)
+                replaced += 1
+
+        async def ping(conn: aiosqlite.Connection) -> None:
+            await conn.execute("SELECT 1")
+
+        try:
+            await self.submit(ping)
+        except Exception as e:
+            logger.error(f"Writer connection failed health check: {str(e)}")
+            healthy = False
+
+        return {"healthy": healthy, "replacedReaders": replaced, **self.stats()}
+
+    def stats(self) -> dict[str, Any]:
+        """Return pool size and wait-time metrics."""
+        return {
+            "size": self.size,
+            "available": self._readers.qsize(),
+            "inUse": len(self._all_readers) - self._readers.qsize(),
+            "acquired": self._acquire_count,
+            "timeouts": self._timeout_count,
+            "avgWaitMs": round(self._total_wait / self._acquire_count * 1000, 3) if self._acquire_count else 0.0,
+            "maxWaitMs": round(self._max_wait * 1000, 3),
+            "writer": self._writer.stats() if self._writer else None,
+            "safeMode": self.safe_mode,
+            "pragmas": self.effective_pragmas,
+        }
+
+def get_db_pool() -> ConnectionPool:
+    """Get the initialized connection pool."""
+    if _db_pool is None:
+        raise RuntimeError("Database connection not initialized")
+    return _db_pool
+
+async def init_db_pool(size: Optional[int] = None):
+    """Initialize the database connection pool."""
+    global _db_pool
+
+    if _db_pool is not None:
+        return _db_pool
+
+    pool = ConnectionPool(str(PATHS["DB_PATH"]), size=size or DB_POOL_SIZE)
+    await pool.open()
     
-    # Create a single connection instead of a pool
-    # aiosqlite doesn't have a create_pool method
-    _db_connection = await aiosqlite.connect(str(PATHS["DB_PATH"]))
-    _db_connection.row_factory = dict_factory
+    # Bring application-managed tables up to date before serving requests
+    async with pool.writer() as conn:
+        await apply_migrations(conn)
     
-    return _db_connection
+    _db_pool = pool
+
+    return _db_pool
 
 async def close_db_pool():
-    """Close the database connection."""
-    global _db_connection
-    if _db_connection:
-        await _db_connection.close()
-        _db_connection = None
+    """Close the database connection pool."""
+    global _db_pool
+    if _db_pool:
+        await _db_pool.close()
+        _db_pool = None
 
 @asynccontextmanager
 async def get_db_connection():
-    """Get a database connection from the pool."""
-    if _db_connection is None:
-        raise RuntimeError("Database connection not initialized")
+    """Get a read-only database connection from the pool."""
+    async with get_db_pool().reader() as conn:
+        yield conn
+
+@asynccontextmanager
+async def get_write_connection():
+    """
+    Borrow the writer connection exclusively.
+    
+    Only for maintenance work that manages its own transactions; regular
+    writes should go through submit_write so they can be group-committed.
+    """
+    async with get_db_pool().writer() as conn:
+        yield conn
+
+async def get_data_version() -> str:
+    """
+    Get the current database data version.
+    
+    Returns: Opaque string that changes after every committed write
+    """
+    return await get_db_pool().data_version()
+
+async def submit_write(fn: WriteJobFn) -> Any:
+    """
+    Run a write job on the database writer and wait for it to commit.
     
-    # Return the existing connection
-    yield _db_connection
+    Args:
+        fn: Coroutine function receiving the writer connection. It must not
+            commit, roll back or submit further writes.
+        
+    Returns: The job's return value once its transaction has committed
+    """
+    return await get_db_pool().submit(fn)
 
 async def execute_query(
-    query: str, 
-    params: Optional[tuple] = None
-) -> list[dict[str, Any]]:
+    query: str,
+    params: Optional[tuple] = None,
+    raw: bool = False
+) -> list[Any]:
     """
     Execute a query and return all results.
-    
+
     Args:
         query: SQL query to execute
         params: Query parameters
-        
-    Returns: Query results as a list of dictionaries
+        raw: Return plain tuples instead of dictionaries (for bulk paths)
+
+    Returns: Query results as a list of dictionaries, or tuples when raw
     """
-    async with get_db_connection() as conn:
-        cursor = await conn.execute(query, params or ())
-        
-        # For SELECT queries, fetch results
-        if query.strip().upper().startswith("SELECT"):
+    # For SELECT queries, fetch results from a reader
+    if query.strip().upper().startswith("SELECT"):
+        async with get_db_connection() as conn:
+            cursor = await conn.execute(query, params or ())
+            if raw:
+                cursor.row_factory = None
             rows = await cursor.fetchall()
             return rows
-        # For other queries, commit and return empty list
-        else:
-            await conn.commit()
-            return []
+    # For other queries, run on the writer and return empty list once committed
+    else:
+        async def job(conn):
+            await conn.execute(query, params or ())
+        
+        await submit_write(job)
+        return []
 
 async def execute_transaction(queries: list[tuple[str, tuple]]) -> bool:
     """
     Execute multiple queries as a single transaction.
-    
+
     Args:
         queries: List of (query, params) tuples
-        
+
     Returns: Boolean indicating transaction success/failure
     """
-    async with get_db_connection() as conn:
-        async with conn.execute("BEGIN") as _:
-            try:
-                for query, params in queries:
-                    await conn.execute(query, params or ())
-                await conn.commit()
-                return True
-            except Exception as e:
-                await conn.rollback()
-                print(f"Transaction failed: {str(e)}")
-                return False
+    async def job(conn):
+        for query, params in queries:
+            await conn.execute(query, params or ())
+    
+    try:
+        await submit_write(job)
+        return True
+    except Exception as e:
+        print(f"Transaction failed: {str(e)}")
+        return False
 
 async def execute_write_query(
-    query: str, 
+    query: str,
     params: Optional[tuple] = None
 ) -> int:
     """
     Execute a write query (INSERT, UPDATE, DELETE) and return affected rows.
-    
+
     Args:
         query: SQL query to execute
         params: Query parameters
-        
+
     Returns: Number of rows affected or last row ID for INSERT
     """
-    async with get_db_connection() as conn:
+    async def job(conn):
         cursor = await conn.execute(query, params or ())
-        await conn.commit()
         
         # For INSERT, return last row id
         if query.strip().upper().startswith("INSERT"):
             return cursor.lastrowid
         # For others, return rows affected
         else:
-            return cursor.rowcount
\ No newline at end of file
+            return cursor.rowcount
+    
+    return await submit_write(job)
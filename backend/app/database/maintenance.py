@@ -0,0 +1,115 @@
+"""
+Database maintenance commands.
+
+Run from the backend directory:
+    python -m app.database.maintenance rebuild-client-summary
+    python -m app.database.maintenance check-client-summary
+    python -m app.database.maintenance rebuild-aggregates
+    python -m app.database.maintenance check-aggregates
+    python -m app.database.maintenance rebuild-provider-rollup
+    python -m app.database.maintenance check-provider-rollup
+    python -m app.database.maintenance dedupe-documents [--prune]
+    python -m app.database.maintenance collect-document-blobs
+    python -m app.database.maintenance generate-previews
+"""
+import sys
+import json
+import asyncio
+import argparse
+
+from app.core.config import validate_settings
+from app.database.database import init_db_pool, close_db_pool, get_write_connection
+from app.database.aggregates import rebuild_aggregates, check_aggregates
+from app.database.client_summary import rebuild_client_summary, check_client_summary
+from app.database.provider_rollup import rebuild_provider_rollup, check_provider_rollup
+from app.services.document_store import dedupe_documents, collect_garbage
+from app.services.preview_service import backfill_previews, shutdown_preview_pool
+
+async def _rebuild_client_summary(args: argparse.Namespace) -> int:
+    async with get_write_connection() as conn:
+        count = await rebuild_client_summary(conn)
+    print(f"Rebuilt client_summary with {count} rows")
+    return 0
+
+async def _check_client_summary(args: argparse.Namespace) -> int:
+    async with get_write_connection() as conn:
+        report = await check_client_summary(conn)
+    print(json.dumps(report, indent=2))
+    return 0 if report["consistent"] else 1
+
+async def _rebuild_aggregates(args: argparse.Namespace) -> int:
+    async with get_write_connection() as conn:
+        counts = await rebuild_aggregates(conn)
+    print(", ".join(f"Rebuilt {table} with {count} rows" for table, count in counts.items()))
+    return 0
+
+async def _check_aggregates(args: argparse.Namespace) -> int:
+    async with get_write_connection() as conn:
+        report = await check_aggregates(conn)
+    print(json.dumps(report, indent=2))
+    return 0 if report["consistent"] else 1
+
+async def _rebuild_provider_rollup(args: argparse.Namespace) -> int:
+    async with get_write_connection() as conn:
+        count = await rebuild_provider_rollup(conn)
+    print(f"Rebuilt provider_rollup with {count} rows")
+    return 0
+
+async def _check_provider_rollup(args: argparse.Namespace) -> int:
+    async with get_write_connection() as conn:
+        report = await check_provider_rollup(conn)
+    print(json.dumps(report, indent=2))
+    return 0 if report["consistent"] else 1
+
+async def _dedupe_documents(args: argparse.Namespace) -> int:
+    report = await dedupe_documents(prune=args.prune)
+    print(json.dumps(report, indent=2))
+    return 0 if not report["missing"] else 1
+
+async def _collect_document_blobs(args: argparse.Namespace) -> int:
+    report = await collect_garbage()
+    print(json.dumps(report, indent=2))
+    return 0
+
+async def _generate_previews(args: argparse.Namespace) -> int:
+    try:
+        report = await backfill_previews()
+    finally:
+        shutdown_preview_pool()
+    print(json.dumps(report, indent=2))
+    return 0 if not report["failed"] else 1
+
+COMMANDS = {
+    "rebuild-client-summary": _rebuild_client_summary,
+    "check-client-summary": _check_client_summary,
+    "rebuild-aggregates": _rebuild_aggregates,
+    "check-aggregates": _check_aggregates,
+    "rebuild-provider-rollup": _rebuild_provider_rollup,
+    "check-provider-rollup": _check_provider_rollup,
+    "dedupe-documents": _dedupe_documents,
+    "collect-document-blobs": _collect_document_blobs,
+    "generate-previews": _generate_previews,
+}
+
+async def run(args: argparse.Namespace) -> int:
+    """Open the database, run a maintenance command and close it again."""
+    validate_settings()
+    await init_db_pool(size=1)
+    try:
+        return await COMMANDS[args.command](args)
+    finally:
+        await close_db_pool()
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Database maintenance commands")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="dedupe-documents: delete original files once they are in the document store"
+    )
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,48 +6,154 @@ This module defines functions for interacting with specific database tables,
 including queries, transformations, and type handling.
 """
 import json
+import base64
 import asyncio
+from collections import Counter
 from typing import Any, Optional
-from datetime import datetime
-
-from app.database.database import (
-    execute_query,
-    execute_write_query,
-    execute_transaction,
-    get_db_connection
-)
-from app.services.client_service import determine_payment_status, calculate_missing_payments
+from datetime import date, datetime, timezone
+
+from app.database.database import execute_query, get_data_version, submit_write
+from app.database.aggregates import apply_payment_changes
+from app.database.client_summary import refresh_client_summary
+from app.database.provider_rollup import refresh_provider_rollup
+from app.services.client_service import apply_payment_status, batch_payment_status, last_paid_index
+from app.services.payment_service import payment_variance
 from app.utils.enums import FeeType
+from app.utils.cache import invalidate_client
+from app.utils.unit_of_work import memoize
+
+# Client list columns (frontend_client_list shape) served from client_summary
+CLIENT_LIST_QUERY = """
+SELECT 
+    cs.id,
+    cs.name,
+    cs.providerId,
+    cs.providerName,
+    co.contact_name AS contact,
+    cs.participants,
+    cs.clientSince,
+    cs.paymentSchedule,
+    cs.lastPaymentMonth,
+    cs.lastPaymentQuarter,
+    cs.lastPaymentYear
+FROM 
+    client_summary cs
+LEFT JOIN
+    contacts co ON cs.id = co.client_id AND co.contact_type = 'Primary' AND co.valid_to IS NULL
+"""
+
+# Columns CLIENT_LIST_QUERY selects only to compute each client's status
+LIST_STATUS_COLUMNS = ("paymentSchedule", "lastPaymentMonth", "lastPaymentQuarter", "lastPaymentYear")
+
+def _with_list_status(clients: list[dict[str, Any]], as_of: Optional[date] = None) -> list[dict[str, Any]]:
+    """
+    Replace the status helper columns of CLIENT_LIST_QUERY rows with a status.
+    
+    Returns: The same rows, in frontend_client_list shape
+    """
+    statuses, _ = batch_payment_status(
+        [client["paymentSchedule"] for client in clients],
+        [last_paid_index(client) for client in clients],
+        as_of
+    )
+    for client, status in zip(clients, statuses):
+        for column in LIST_STATUS_COLUMNS:
+            del client[column]
+        client["status"] = status
+    return clients
 
-async def get_all_clients() -> list[dict[str, Any]]:
+async def get_all_clients(as_of: Optional[date] = None) -> list[dict[str, Any]]:
     """
-    Get all active clients from the frontend_client_list view.
+    Get all active clients from the materialized client_summary table.
+    
+    Args:
+        as_of: Date to evaluate payment status against (default today)
     
     Returns: List of client dictionaries in frontend-expected format
     """
+    query = CLIENT_LIST_QUERY + """
+    ORDER BY cs.name
+    """
+    return _with_list_status(await execute_query(query), as_of)
+
+async def get_client_payment_periods() -> list[dict[str, Any]]:
+    """
+    Get every active client's schedule and last paid period.
+    
+    Returns: List of client_summary rows with id, name, providerId,
+        providerName, paymentSchedule and the last paid month/quarter/year
+    """
     query = """
-    SELECT * FROM frontend_client_list
+    SELECT
+        id,
+        name,
+        providerId,
+        providerName,
+        paymentSchedule,
+        lastPaymentMonth,
+        lastPaymentQuarter,
+        lastPaymentYear
+    FROM client_summary
     ORDER BY name
     """
     return await execute_query(query)
 
-async def get_client_details(client_id: int) -> dict[str, Any]:
+async def get_client_details(client_id: int, as_of: Optional[date] = None) -> dict[str, Any]:
     """
-    Get detailed client information from the frontend_client_details view.
+    Get detailed client information from the materialized client_summary table.
+    
+    Args:
+        client_id: Client ID
+        as_of: Date to evaluate payment status against (default today)
     
     Returns: Client details dictionary with all nested objects for frontend
     """
     query = """
-    SELECT * FROM frontend_client_details
+    SELECT * FROM client_summary
     WHERE id = ?
     """
-    clients = await execute_query(query, (client_id,))
     
-    if not clients:
+    async def load():
+        clients = await execute_query(query, (client_id,))
+        return _build_client_details(clients[0]) if clients else {}
+    
+    # Looked up once per request however many services ask for it; status
+    # depends on as_of, so it is applied to a copy of the shared row
+    details = await memoize(("client", client_id), load)
+    if not details:
         return {}
+    client = dict(details)
+    apply_payment_status([client], as_of)
+    return client
+
+async def get_all_client_details(as_of: Optional[date] = None) -> dict[int, dict[str, Any]]:
+    """
+    Get detailed client information for every active client in a single query.
+    
+    Args:
+        as_of: Date to evaluate payment status against (default today)
     
-    client = clients[0]
+    Returns: Dictionary mapping client ID to client details
+    """
+    query = """
+    SELECT * FROM client_summary
+    """
+    clients = await execute_query(query)
     
+    # Status and missing periods for every client in one batch
+    apply_payment_status(clients, as_of)
+    
+    return {client["id"]: _build_client_details(client) for client in clients}
+
+def _build_client_details(client: dict[str, Any]) -> dict[str, Any]:
+    """
+    Add derived fields to a frontend_client_details row.
+    
+    Payment status and missing periods are set beforehand, in a batch, by
+    apply_payment_status.
+    
+    Returns: Client details dictionary with all nested objects for frontend
+    """
     # Parse JSON fields if they exist as strings
     for field in ['percentRateBreakdown', 'flatRateBreakdown']:
         if field in client and isinstance(client[field], str):
@@ -62,12 +168,6 @@ async def get_client_details(client_id: int) -> dict[str, Any]:
     else:
         client['rateBreakdown'] = client.get('flatRateBreakdown', {})
     
-    # Get client payment status (replaces client_payment_status view dependency)
-    client['status'] = determine_payment_status(client)
-    
-    # Calculate missing payments
-    client['missingPayments'] = calculate_missing_payments(client)
-    
     return client
 
 async def get_client_payment_history(client_id: int, page: int = 1, page_size: int = 10) -> dict[str, Any]:
@@ -80,12 +180,7 @@ async def get_client_payment_history(client_id: int, page: int = 1, page_size: i
     offset = (page - 1) * page_size
     
     # Get total count for pagination
-    count_query = """
-    SELECT COUNT(*) as total FROM frontend_payment_history
-    WHERE clientId = ?
-    """
-    count_result = await execute_query(count_query, (client_id,))
-    total = count_result[0].get('total', 0) if count_result else 0
+    total = await count_client_payments(client_id)
     
     # Get paginated payment history
     query = """
@@ -111,67 +206,240 @@ async def get_client_payment_history(client_id: int, page: int = 1, page_size: i
         }
     }
 
-async def get_providers() -> list[dict[str, Any]]:
+# Cached payment-history row counts per client as (data version, count).
+# Keyed on the data version so writes made outside this process (imports,
+# maintenance, another server) are picked up too; payment writes also clear
+# their client's entry directly
+_payment_count_cache: dict[int, tuple[str, int]] = {}
+
+def invalidate_payment_count(client_id: Optional[int] = None) -> None:
+    """Drop the cached payment count for one client, or for all clients."""
+    if client_id is None:
+        _payment_count_cache.clear()
+    else:
+        _payment_count_cache.pop(client_id, None)
+
+async def count_client_payments(client_id: int) -> int:
     """
-    Get all providers with their clients and total assets.
+    Count payment-history rows for a client, cached until the database changes.
     
-    Returns: List of provider dictionaries with aggregated metrics
+    Returns: Total number of payment-history rows
+    """
+    version = await get_data_version()
+    cached = _payment_count_cache.get(client_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    
+    count_query = """
+    SELECT COUNT(*) as total FROM payment_history_source
+    WHERE clientId = ?
+    """
+    count_result = await execute_query(count_query, (client_id,))
+    total = count_result[0].get('total', 0) if count_result else 0
+    
+    _payment_count_cache[client_id] = (version, total)
+    return total
+
+def encode_history_cursor(received_date: Optional[str], payment_id: int) -> str:
+    """Encode a (received_date, payment_id) position as an opaque cursor."""
+    raw = json.dumps([received_date, payment_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_history_cursor(cursor: str) -> tuple[Optional[str], int]:
+    """
+    Decode a cursor produced by encode_history_cursor.
+    
+    Raises: ValueError if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        received_date, payment_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    
+    if not isinstance(payment_id, int) or not (received_date is None or isinstance(received_date, str)):
+        raise ValueError("Invalid cursor")
+    
+    return received_date, payment_id
+
+async def get_client_payment_history_keyset(
+    client_id: int,
+    cursor: Optional[str] = None,
+    page_size: int = 10,
+    include_total: bool = False
+) -> dict[str, Any]:
+    """
+    Get a page of payment history positioned by cursor instead of offset.
+    
+    Seeks directly to the (received_date, payment_id) after the cursor using
+    idx_payments_date, so every page costs the same regardless of depth.
+    
+    Returns: Dictionary with payments list and cursor pagination metadata
+    
+    Raises: ValueError if the cursor is malformed
+    """
+    params: list[Any] = [client_id]
+    seek = ""
+    
+    if cursor:
+        received_date, payment_id = decode_history_cursor(cursor)
+        if received_date is None:
+            # NULL dates sort last, so only older NULL-dated rows remain
+            seek = "AND sortDate IS NULL AND id < ?"
+            params.append(payment_id)
+        else:
+            seek = """
+            AND (
+                sortDate < ?
+                OR (sortDate = ? AND id < ?)
+                OR sortDate IS NULL
+            )
+            """
+            params.extend([received_date, received_date, payment_id])
+    
+    # Fetch one extra row to learn whether another page exists
+    query = f"""
+    SELECT * FROM payment_history_source
+    WHERE clientId = ?
+    {seek}
+    ORDER BY sortDate DESC, id DESC
+    LIMIT ?
+    """
+    params.append(page_size + 1)
+    rows = await execute_query(query, tuple(params))
+    
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    
+    next_cursor = None
+    if has_next and rows:
+        next_cursor = encode_history_cursor(rows[-1]["sortDate"], rows[-1]["id"])
+    
+    for row in rows:
+        del row["sortDate"]
+    
+    pagination = {
+        "pageSize": page_size,
+        "nextCursor": next_cursor,
+        "hasNextPage": has_next,
+        "hasPreviousPage": bool(cursor)
+    }
+    
+    if include_total:
+        pagination["totalItems"] = await count_client_payments(client_id)
+    
+    return {
+        "payments": rows,
+        "pagination": pagination
+    }
+
+async def get_all_client_payment_histories(page_size: int = 10) -> dict[int, list[dict[str, Any]]]:
+    """
+    Get the first page of payment history for every client in a single query.
+    
+    Uses ROW_NUMBER() partitioned by client so only the newest ``page_size``
+    payments per client are returned.
+    
+    Returns: Dictionary mapping client ID to its most recent payments
     """
     query = """
-    SELECT 
-        p.provider_id as id,
-        p.name,
-        COUNT(DISTINCT c.client_id) as clientCount,
-        SUM(cm.last_recorded_assets) as totalAssets,
-        SUM(ct.num_people) as totalParticipants
-    FROM 
-        providers p
-    LEFT JOIN 
-        contracts ct ON p.provider_id = ct.provider_id AND ct.valid_to IS NULL
-    LEFT JOIN 
-        clients c ON ct.client_id = c.client_id AND c.valid_to IS NULL
-    LEFT JOIN 
-        client_metrics cm ON c.client_id = cm.client_id
-    WHERE 
-        p.valid_to IS NULL
-    GROUP BY 
-        p.provider_id, p.name
-    ORDER BY 
-        p.name
+    SELECT * FROM (
+        SELECT 
+            h.*,
+            ROW_NUMBER() OVER (
+                PARTITION BY h.clientId 
+                ORDER BY h.receivedDate DESC, h.id DESC
+            ) AS rowNum
+        FROM frontend_payment_history h
+    )
+    WHERE rowNum <= ?
+    ORDER BY clientId, rowNum
     """
-    return await execute_query(query)
+    rows = await execute_query(query, (page_size,))
+    
+    history: dict[int, list[dict[str, Any]]] = {}
+    for row in rows:
+        del row["rowNum"]
+        history.setdefault(row["clientId"], []).append(row)
+    
+    return history
 
-async def get_provider_clients(provider_id: int) -> list[dict[str, Any]]:
+async def get_providers() -> list[dict[str, Any]]:
     """
-    Get all clients for a specific provider.
+    Get all providers with their clients, total assets and fees.
     
-    Returns: List of client dictionaries for the specified provider
+    Reads the materialized provider_rollup table; overdue counts depend on
+    the date, so they come from the (memoized) overdue report instead.
+    
+    Returns: List of provider dictionaries with aggregated metrics
     """
+    from app.services.client_service import get_overdue_clients
+    
     query = """
-    SELECT * FROM frontend_client_list
-    WHERE providerId = ?
+    SELECT id, name, clientCount, totalAssets, totalParticipants, ytdYear, ytdFees
+    FROM provider_rollup
     ORDER BY name
     """
-    return await execute_query(query, (provider_id,))
+    providers, overdue = await asyncio.gather(execute_query(query), get_overdue_clients())
+    
+    # Year-to-date fees restart at New Year (the rollup's year is in UTC, like
+    # SQLite's 'now'). Rows from last year are rebuilt on startup or by the
+    # rebuild-provider-rollup command; until then nothing is paid this year.
+    this_year = datetime.now(timezone.utc).year
+    overdue_counts = Counter(client["providerId"] for client in overdue["clients"])
+    for provider in providers:
+        if provider.pop("ytdYear") != this_year:
+            provider["ytdFees"] = 0.0
+        provider["overdueCount"] = overdue_counts.get(provider["id"], 0)
+    return providers
 
-async def create_payment(payment_data: dict[str, Any]) -> int:
+async def provider_exists(provider_id: int) -> bool:
     """
-    Create a new payment record.
+    Check whether an active provider exists, with a primary key lookup.
     
-    Returns: ID of the newly created payment
+    Returns: True if the provider exists and is not soft-deleted
     """
-    query = """
-    INSERT INTO payments (
-        contract_id, client_id, received_date, total_assets, 
-        expected_fee, actual_fee, method, notes,
-        applied_start_month, applied_start_month_year, 
-        applied_end_month, applied_end_month_year,
-        applied_start_quarter, applied_start_quarter_year,
-        applied_end_quarter, applied_end_quarter_year,
-        valid_from
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    rows = await execute_query(
+        "SELECT 1 AS found FROM providers WHERE provider_id = ? AND valid_to IS NULL",
+        (provider_id,)
+    )
+    return bool(rows)
+
+async def get_provider_clients(provider_id: int, as_of: Optional[date] = None) -> list[dict[str, Any]]:
     """
+    Get all clients for a specific provider.
     
+    Args:
+        provider_id: Provider ID
+        as_of: Date to evaluate payment status against (default today)
+    
+    Returns: List of client dictionaries for the specified provider
+    """
+    query = CLIENT_LIST_QUERY + """
+    WHERE cs.providerId = ?
+    ORDER BY cs.name
+    """
+    return _with_list_status(await execute_query(query, (provider_id,)), as_of)
+
+PAYMENT_INSERT_QUERY = """
+INSERT INTO payments (
+    contract_id, client_id, received_date, total_assets, 
+    expected_fee, actual_fee, method, notes,
+    applied_start_month, applied_start_month_year, 
+    applied_end_month, applied_end_month_year,
+    applied_start_quarter, applied_start_quarter_year,
+    applied_end_quarter, applied_end_quarter_year,
+    variance, variance_percent,
+    valid_from
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+"""
+
+def _payment_params(payment_data: dict[str, Any]) -> tuple:
+    """
+    Build PAYMENT_INSERT_QUERY parameters for a prepared payment.
+    
+    Returns: Parameter tuple with non-applicable period fields set to NULL
+    """
     # Set non-applicable fields to NULL based on payment schedule
     if payment_data.get('payment_schedule') == 'monthly':
         # Zero out quarterly fields
@@ -186,7 +454,7 @@ async def create_payment(payment_data: dict[str, Any]) -> int:
         payment_data['applied_end_month'] = None
         payment_data['applied_end_month_year'] = None
     
-    params = (
+    return (
         payment_data.get('contract_id'),
         payment_data.get('client_id'),
         payment_data.get('received_date'),
@@ -202,10 +470,80 @@ async def create_payment(payment_data: dict[str, Any]) -> int:
         payment_data.get('applied_start_quarter'),
         payment_data.get('applied_start_quarter_year'),
         payment_data.get('applied_end_quarter'),
-        payment_data.get('applied_end_quarter_year')
+        payment_data.get('applied_end_quarter_year'),
+        *payment_variance(payment_data.get('expected_fee'), payment_data.get('actual_fee'))
     )
+
+async def insert_payment(conn, payment_data: dict[str, Any]) -> int:
+    """
+    Insert a payment and update the client's aggregates and summary.
+    
+    Runs on the caller's writer connection and does not commit, so other
+    rows (such as an attached document) can be written in the same
+    transaction. Call invalidate_payment_caches once it has committed.
     
-    return await execute_write_query(query, params)
+    Returns: ID of the newly created payment
+    """
+    client_id = payment_data.get('client_id')
+    cursor = await conn.execute(PAYMENT_INSERT_QUERY, _payment_params(payment_data))
+    await apply_payment_changes(conn, added=[payment_data])
+    await refresh_client_summary(conn, client_id)
+    await refresh_provider_rollup(conn, client_id)
+    return cursor.lastrowid
+
+def invalidate_payment_caches(client_id: int) -> None:
+    """Drop cached responses and counts that a new payment for the client changes."""
+    invalidate_payment_count(client_id)
+    invalidate_client(client_id)
+
+async def create_payment(payment_data: dict[str, Any]) -> int:
+    """
+    Create a new payment record.
+    
+    Returns: ID of the newly created payment
+    """
+    async def job(conn):
+        return await insert_payment(conn, payment_data)
+    
+    payment_id = await submit_write(job)
+    invalidate_payment_caches(payment_data.get('client_id'))
+    return payment_id
+
+async def create_payments(payments: list[dict[str, Any]]) -> list[int]:
+    """
+    Create many payment records in one transaction.
+    
+    Rows are inserted with a single executemany, the payment aggregates are
+    updated with one delta per affected quarter and year, and each affected
+    client's summary is refreshed once rather than once per payment.
+    
+    Returns: IDs of the new payments, in input order
+    """
+    if not payments:
+        return []
+    
+    params = [_payment_params(payment) for payment in payments]
+    client_ids = sorted({payment.get('client_id') for payment in payments})
+    
+    async def job(conn):
+        await conn.executemany(PAYMENT_INSERT_QUERY, params)
+        
+        # The writer holds the database, so the new rowids are consecutive
+        cursor = await conn.execute("SELECT last_insert_rowid() AS last_id")
+        last_id = (await cursor.fetchone())["last_id"]
+        
+        await apply_payment_changes(conn, added=payments)
+        for client_id in client_ids:
+            await refresh_client_summary(conn, client_id)
+            await refresh_provider_rollup(conn, client_id)
+        
+        return list(range(last_id - len(params) + 1, last_id + 1))
+    
+    payment_ids = await submit_write(job)
+    for client_id in client_ids:
+        invalidate_payment_count(client_id)
+        invalidate_client(client_id)
+    return payment_ids
 
 async def update_payment(payment_id: int, payment_data: dict[str, Any]) -> int:
     """
@@ -213,73 +551,89 @@ async def update_payment(payment_id: int, payment_data: dict[str, Any]) -> int:
     
     Returns: ID of the updated payment
     """
-    async with get_db_connection() as conn:
-        async with conn.execute("BEGIN") as _:
-            try:
-                # First, soft-delete the current payment
-                delete_query = """
-                UPDATE payments 
-                SET valid_to = CURRENT_TIMESTAMP 
-                WHERE payment_id = ? AND valid_to IS NULL
-                """
-                await conn.execute(delete_query, (payment_id,))
-                
-                # Then fetch the existing payment to preserve any fields not being updated
-                fetch_query = """
-                SELECT * FROM payments
-                WHERE payment_id = ?
-                """
-                cursor = await conn.execute(fetch_query, (payment_id,))
-                existing_payment = await cursor.fetchone()
-                
-                if not existing_payment:
-                    await conn.rollback()
-                    return 0
-                
-                # Merge existing data with updates
-                merged_data = {**existing_payment, **payment_data}
-                
-                # Create a new record with the updated data
-                create_query = """
-                INSERT INTO payments (
-                    contract_id, client_id, received_date, total_assets, 
-                    expected_fee, actual_fee, method, notes,
-                    applied_start_month, applied_start_month_year, 
-                    applied_end_month, applied_end_month_year,
-                    applied_start_quarter, applied_start_quarter_year,
-                    applied_end_quarter, applied_end_quarter_year,
-                    valid_from
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                """
-                
-                params = (
-                    merged_data.get('contract_id'),
-                    merged_data.get('client_id'),
-                    merged_data.get('received_date'),
-                    merged_data.get('total_assets'),
-                    merged_data.get('expected_fee'),
-                    merged_data.get('actual_fee'),
-                    merged_data.get('method'),
-                    merged_data.get('notes'),
-                    merged_data.get('applied_start_month'),
-                    merged_data.get('applied_start_month_year'),
-                    merged_data.get('applied_end_month'),
-                    merged_data.get('applied_end_month_year'),
-                    merged_data.get('applied_start_quarter'),
-                    merged_data.get('applied_start_quarter_year'),
-                    merged_data.get('applied_end_quarter'),
-                    merged_data.get('applied_end_quarter_year')
-                )
-                
-                cursor = await conn.execute(create_query, params)
-                new_payment_id = cursor.lastrowid
-                
-                await conn.commit()
-                return new_payment_id
-            except Exception as e:
-                await conn.rollback()
-                print(f"Payment update error: {str(e)}")
-                return 0
+    async def job(conn):
+        # First, soft-delete the current payment
+        delete_query = """
+        UPDATE payments 
+        SET valid_to = CURRENT_TIMESTAMP 
+        WHERE payment_id = ? AND valid_to IS NULL
+        """
+        cursor = await conn.execute(delete_query, (payment_id,))
+        superseded = cursor.rowcount > 0
+        
+        # Then fetch the existing payment to preserve any fields not being updated
+        fetch_query = """
+        SELECT * FROM payments
+        WHERE payment_id = ?
+        """
+        cursor = await conn.execute(fetch_query, (payment_id,))
+        existing_payment = await cursor.fetchone()
+        
+        if not existing_payment:
+            return 0, None
+        
+        # Merge existing data with updates
+        merged_data = {**existing_payment, **payment_data}
+        
+        # Create a new record with the updated data
+        create_query = """
+        INSERT INTO payments (
+            contract_id, client_id, received_date, total_assets, 
+            expected_fee, actual_fee, method, notes,
+            applied_start_month, applied_start_month_year, 
+            applied_end_month, applied_end_month_year,
+            applied_start_quarter, applied_start_quarter_year,
+            applied_end_quarter, applied_end_quarter_year,
+            variance, variance_percent,
+            valid_from
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """
+        
+        params = (
+            merged_data.get('contract_id'),
+            merged_data.get('client_id'),
+            merged_data.get('received_date'),
+            merged_data.get('total_assets'),
+            merged_data.get('expected_fee'),
+            merged_data.get('actual_fee'),
+            merged_data.get('method'),
+            merged_data.get('notes'),
+            merged_data.get('applied_start_month'),
+            merged_data.get('applied_start_month_year'),
+            merged_data.get('applied_end_month'),
+            merged_data.get('applied_end_month_year'),
+            merged_data.get('applied_start_quarter'),
+            merged_data.get('applied_start_quarter_year'),
+            merged_data.get('applied_end_quarter'),
+            merged_data.get('applied_end_quarter_year'),
+            *payment_variance(merged_data.get('expected_fee'), merged_data.get('actual_fee'))
+        )
+        
+        cursor = await conn.execute(create_query, params)
+        
+        # Swap the old version's contribution to the aggregates for the new one's
+        await apply_payment_changes(
+            conn,
+            added=[merged_data],
+            removed=[existing_payment] if superseded else []
+        )
+        
+        # Keep the client summary in step with the new record
+        await refresh_client_summary(conn, merged_data.get('client_id'))
+        await refresh_provider_rollup(conn, merged_data.get('client_id'))
+        
+        return cursor.lastrowid, merged_data.get('client_id')
+    
+    try:
+        new_payment_id, client_id = await submit_write(job)
+    except Exception as e:
+        print(f"Payment update error: {str(e)}")
+        return 0
+    
+    if new_payment_id:
+        invalidate_payment_count(client_id)
+        invalidate_client(client_id)
+    return new_payment_id
 
 async def delete_payment(payment_id: int) -> bool:
     """
@@ -293,8 +647,29 @@ async def delete_payment(payment_id: int) -> bool:
     WHERE payment_id = ? AND valid_to IS NULL
     """
     
-    result = await execute_write_query(query, (payment_id,))
-    return result > 0
+    async def job(conn):
+        cursor = await conn.execute(
+            "SELECT * FROM payments WHERE payment_id = ?",
+            (payment_id,)
+        )
+        payment = await cursor.fetchone()
+        
+        cursor = await conn.execute(query, (payment_id,))
+        if cursor.rowcount <= 0 or not payment:
+            return None
+        
+        await apply_payment_changes(conn, removed=[payment])
+        await refresh_client_summary(conn, payment["client_id"])
+        await refresh_provider_rollup(conn, payment["client_id"])
+        return payment["client_id"]
+    
+    client_id = await submit_write(job)
+    if client_id is None:
+        return False
+    
+    invalidate_payment_count(client_id)
+    invalidate_client(client_id)
+    return True
 
 # backend/app/database/models.py (additions)
 
@@ -313,8 +688,11 @@ async def get_active_contract(client_id: int) -> Optional[dict[str, Any]]:
     WHERE client_id = ? AND valid_to IS NULL
     """
     
-    results = await execute_query(query, (client_id,))
-    return results[0] if results else None
+    async def load():
+        results = await execute_query(query, (client_id,))
+        return results[0] if results else None
+    
+    return await memoize(("contract", client_id), load)
 
 async def get_payment(payment_id: int) -> Optional[dict[str, Any]]:
     """
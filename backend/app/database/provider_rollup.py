@@ -0,0 +1,104 @@
+"""
+Materialized provider rollup maintenance.
+
+The provider_rollup table holds one precomputed row per active provider
+(client count, total AUM, participants and fees applied to the current
+year). Payment writes refresh the client's provider inside their own
+transaction; contract, client and provider edits refresh it through
+triggers. After New Year the table is rebuilt on startup. This module also
+provides a full rebuild and a consistency check against the live view.
+"""
+from typing import Any
+
+import aiosqlite
+
+async def refresh_provider_rollup(conn: aiosqlite.Connection, client_id: int) -> None:
+    """
+    Recompute the rollup row of a client's current provider.
+
+    Runs on the caller's connection and does not commit, so it joins the
+    caller's transaction. Call it after the payment aggregates are updated,
+    since the totals are read from client_metrics and yearly_summaries.
+
+    Args:
+        conn: Writer connection
+        client_id: Client whose provider should be refreshed
+    """
+    providers = "SELECT provider_id FROM contracts WHERE client_id = ? AND valid_to IS NULL"
+    await conn.execute(f"DELETE FROM provider_rollup WHERE id IN ({providers})", (client_id,))
+    await conn.execute(
+        f"INSERT OR REPLACE INTO provider_rollup SELECT * FROM provider_rollup_source WHERE id IN ({providers})",
+        (client_id,)
+    )
+
+async def rebuild_provider_rollup(conn: aiosqlite.Connection) -> int:
+    """
+    Rebuild the whole provider_rollup table from scratch.
+
+    Args:
+        conn: Writer connection
+
+    Returns: Number of rollup rows written
+    """
+    try:
+        await conn.execute("BEGIN")
+        await conn.execute("DELETE FROM provider_rollup")
+        await conn.execute("INSERT OR REPLACE INTO provider_rollup SELECT * FROM provider_rollup_source")
+        await conn.commit()
+    except Exception:
+        await conn.rollback()
+        raise
+
+    cursor = await conn.execute("SELECT COUNT(*) AS total FROM provider_rollup")
+    row = await cursor.fetchone()
+    return row["total"]
+
+async def rebuild_stale_provider_rollup(conn: aiosqlite.Connection) -> bool:
+    """
+    Rebuild provider_rollup if any row's year-to-date fees are from a past year.
+
+    Run on startup, so the fees restart after New Year without the read
+    path having to write.
+
+    Args:
+        conn: Writer connection
+
+    Returns: True if the table was rebuilt
+    """
+    cursor = await conn.execute(
+        "SELECT 1 FROM provider_rollup WHERE ytdYear IS NOT CAST(strftime('%Y', 'now') AS INTEGER) LIMIT 1"
+    )
+    if await cursor.fetchone() is None:
+        return False
+    await rebuild_provider_rollup(conn)
+    return True
+
+async def check_provider_rollup(conn: aiosqlite.Connection) -> dict[str, Any]:
+    """
+    Compare provider_rollup with the provider_rollup_source view.
+
+    Args:
+        conn: Database connection
+
+    Returns: Dictionary listing missing, extra and mismatched provider IDs
+    """
+    cursor = await conn.execute("SELECT * FROM provider_rollup_source")
+    expected = {row["id"]: row for row in await cursor.fetchall()}
+
+    cursor = await conn.execute("SELECT * FROM provider_rollup")
+    actual = {row["id"]: row for row in await cursor.fetchall()}
+
+    missing = sorted(set(expected) - set(actual))
+    extra = sorted(set(actual) - set(expected))
+    mismatched = sorted(
+        provider_id for provider_id in set(expected) & set(actual)
+        if expected[provider_id] != actual[provider_id]
+    )
+
+    return {
+        "checked": len(expected),
+        "consistent": not (missing or extra or mismatched),
+        "missing": missing,
+        "extra": extra,
+        "mismatched": mismatched
+    }
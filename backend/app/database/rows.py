@@ -0,0 +1,31 @@
+"""
+Row factories for SQLite connections.
+
+Rows are returned as plain dictionaries so route handlers can mutate and
+serialize them directly; callers that only need positional access can ask
+execute_query for raw tuples instead.
+"""
+from typing import Any
+
+def make_dict_factory():
+    """
+    Create a row factory that converts rows to dictionaries.
+    
+    Column names are extracted once per result set and zipped with each row,
+    instead of walking cursor.description for every row. Each connection gets
+    its own factory, so the cache is only touched by that connection's thread.
+    
+    Returns: Row factory for a single connection
+    """
+    cached_description = None
+    columns: tuple[str, ...] = ()
+    
+    def dict_factory(cursor, row) -> dict[str, Any]:
+        nonlocal cached_description, columns
+        description = cursor.description
+        if description is not cached_description:
+            columns = tuple(col[0] for col in description)
+            cached_description = description
+        return dict(zip(columns, row))
+    
+    return dict_factory
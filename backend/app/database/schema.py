@@ -0,0 +1,777 @@
+"""
+Application-managed schema changes.
+
+The core tables and views are created outside the backend (see data/schema.sql).
+This module holds the additional objects the backend maintains itself,
+applied in order on startup and tracked with PRAGMA user_version.
+"""
+import logging
+import aiosqlite
+
+logger = logging.getLogger("app.database")
+
+# Same shape as the frontend_client_details view, but the latest payment is
+# looked up per client through idx_payments_client_id instead of aggregating
+# the whole payments table, so it can be filtered down to a single client.
+CLIENT_SUMMARY_SOURCE_VIEW = """
+CREATE VIEW IF NOT EXISTS client_summary_source AS
+SELECT
+    c.client_id AS id,
+    c.display_name AS name,
+    ct.provider_id AS providerId,
+    p.name AS providerName,
+    ct.num_people AS participants,
+    CASE
+        WHEN c.ima_signed_date IS NOT NULL THEN date(c.ima_signed_date)
+        ELSE NULL
+    END AS clientSince,
+    ct.fee_type AS feeType,
+    CASE
+        WHEN ct.fee_type = 'percentage' THEN ct.percent_rate
+        WHEN ct.fee_type = 'flat' THEN ct.flat_rate
+        ELSE NULL
+    END AS rate,
+    ct.payment_schedule AS paymentSchedule,
+    json_object(
+        'monthly', crd.monthly_percent_rate,
+        'quarterly', crd.quarterly_percent_rate,
+        'annual', crd.annual_percent_rate
+    ) AS percentRateBreakdown,
+    json_object(
+        'monthly', crd.monthly_flat_rate,
+        'quarterly', crd.quarterly_flat_rate,
+        'annual', crd.annual_flat_rate
+    ) AS flatRateBreakdown,
+    cm.last_payment_date AS lastPaymentDate,
+    cm.last_payment_amount AS lastPaymentAmount,
+    CASE
+        WHEN ct.payment_schedule = 'monthly' AND cm.last_payment_month IS NOT NULL THEN
+            CASE
+                WHEN cm.last_payment_month = 1 THEN 'Jan'
+                WHEN cm.last_payment_month = 2 THEN 'Feb'
+                WHEN cm.last_payment_month = 3 THEN 'Mar'
+                WHEN cm.last_payment_month = 4 THEN 'Apr'
+                WHEN cm.last_payment_month = 5 THEN 'May'
+                WHEN cm.last_payment_month = 6 THEN 'Jun'
+                WHEN cm.last_payment_month = 7 THEN 'Jul'
+                WHEN cm.last_payment_month = 8 THEN 'Aug'
+                WHEN cm.last_payment_month = 9 THEN 'Sep'
+                WHEN cm.last_payment_month = 10 THEN 'Oct'
+                WHEN cm.last_payment_month = 11 THEN 'Nov'
+                WHEN cm.last_payment_month = 12 THEN 'Dec'
+            END || ' ' || cm.last_payment_year
+        WHEN ct.payment_schedule = 'quarterly' AND cm.last_payment_quarter IS NOT NULL THEN
+            'Q' || cm.last_payment_quarter || ' ' || cm.last_payment_year
+        ELSE NULL
+    END AS lastPaymentPeriod,
+    latest_payment.expected_fee AS lastPaymentExpected,
+    latest_payment.actual_fee AS lastPaymentActual,
+    latest_payment.variance AS lastPaymentVariance,
+    cm.last_recorded_assets AS lastRecordedAUM,
+    CASE
+        WHEN cps.current_month IS NOT NULL THEN
+            CASE
+                WHEN cps.current_month = 1 THEN 'Jan'
+                WHEN cps.current_month = 2 THEN 'Feb'
+                WHEN cps.current_month = 3 THEN 'Mar'
+                WHEN cps.current_month = 4 THEN 'Apr'
+                WHEN cps.current_month = 5 THEN 'May'
+                WHEN cps.current_month = 6 THEN 'Jun'
+                WHEN cps.current_month = 7 THEN 'Jul'
+                WHEN cps.current_month = 8 THEN 'Aug'
+                WHEN cps.current_month = 9 THEN 'Sep'
+                WHEN cps.current_month = 10 THEN 'Oct'
+                WHEN cps.current_month = 11 THEN 'Nov'
+                WHEN cps.current_month = 12 THEN 'Dec'
+            END || ' ' || cps.current_month_year
+        WHEN cps.current_quarter IS NOT NULL THEN
+            'Q' || cps.current_quarter || ' ' || cps.current_quarter_year
+        ELSE NULL
+    END AS currentPeriod,
+    cps.payment_status AS currentStatus
+FROM
+    clients c
+JOIN
+    contracts ct ON c.client_id = ct.client_id AND ct.valid_to IS NULL
+LEFT JOIN
+    providers p ON ct.provider_id = p.provider_id
+LEFT JOIN
+    contract_rate_display crd ON ct.contract_id = crd.contract_id
+LEFT JOIN
+    client_metrics cm ON c.client_id = cm.client_id
+LEFT JOIN
+    client_payment_status cps ON c.client_id = cps.client_id
+LEFT JOIN
+    payments latest_payment ON latest_payment.payment_id = (
+        SELECT MAX(payment_id)
+        FROM payments
+        WHERE client_id = c.client_id AND valid_to IS NULL
+    )
+WHERE
+    c.valid_to IS NULL
+"""
+
+CLIENT_SUMMARY_TABLE = """
+CREATE TABLE IF NOT EXISTS client_summary (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    providerId INTEGER,
+    providerName TEXT,
+    participants INTEGER,
+    clientSince TEXT,
+    feeType TEXT,
+    rate REAL,
+    paymentSchedule TEXT,
+    percentRateBreakdown TEXT,
+    flatRateBreakdown TEXT,
+    lastPaymentDate TEXT,
+    lastPaymentAmount REAL,
+    lastPaymentPeriod TEXT,
+    lastPaymentExpected REAL,
+    lastPaymentActual REAL,
+    lastPaymentVariance REAL,
+    lastRecordedAUM REAL,
+    currentPeriod TEXT,
+    currentStatus TEXT
+)
+"""
+
+# client_summary_source plus each client's last paid period (the latest
+# applied end period of its valid payments, in the client's schedule), which
+# the status and missing-period computation needs. The payment is located per
+# client through idx_payments_client_id, like latest_payment. Written out in
+# full rather than patched from CLIENT_SUMMARY_SOURCE_VIEW, so reformatting
+# the base view cannot silently change what migration 5 creates.
+CLIENT_SUMMARY_SOURCE_VIEW_V2 = """
+CREATE VIEW IF NOT EXISTS client_summary_source AS
+SELECT
+    c.client_id AS id,
+    c.display_name AS name,
+    ct.provider_id AS providerId,
+    p.name AS providerName,
+    ct.num_people AS participants,
+    CASE
+        WHEN c.ima_signed_date IS NOT NULL THEN date(c.ima_signed_date)
+        ELSE NULL
+    END AS clientSince,
+    ct.fee_type AS feeType,
+    CASE
+        WHEN ct.fee_type = 'percentage' THEN ct.percent_rate
+        WHEN ct.fee_type = 'flat' THEN ct.flat_rate
+        ELSE NULL
+    END AS rate,
+    ct.payment_schedule AS paymentSchedule,
+    json_object(
+        'monthly', crd.monthly_percent_rate,
+        'quarterly', crd.quarterly_percent_rate,
+        'annual', crd.annual_percent_rate
+    ) AS percentRateBreakdown,
+    json_object(
+        'monthly', crd.monthly_flat_rate,
+        'quarterly', crd.quarterly_flat_rate,
+        'annual', crd.annual_flat_rate
+    ) AS flatRateBreakdown,
+    cm.last_payment_date AS lastPaymentDate,
+    cm.last_payment_amount AS lastPaymentAmount,
+    CASE
+        WHEN ct.payment_schedule = 'monthly' AND cm.last_payment_month IS NOT NULL THEN
+            CASE
+                WHEN cm.last_payment_month = 1 THEN 'Jan'
+                WHEN cm.last_payment_month = 2 THEN 'Feb'
+                WHEN cm.last_payment_month = 3 THEN 'Mar'
+                WHEN cm.last_payment_month = 4 THEN 'Apr'
+                WHEN cm.last_payment_month = 5 THEN 'May'
+                WHEN cm.last_payment_month = 6 THEN 'Jun'
+                WHEN cm.last_payment_month = 7 THEN 'Jul'
+                WHEN cm.last_payment_month = 8 THEN 'Aug'
+                WHEN cm.last_payment_month = 9 THEN 'Sep'
+                WHEN cm.last_payment_month = 10 THEN 'Oct'
+                WHEN cm.last_payment_month = 11 THEN 'Nov'
+                WHEN cm.last_payment_month = 12 THEN 'Dec'
+            END || ' ' || cm.last_payment_year
+        WHEN ct.payment_schedule = 'quarterly' AND cm.last_payment_quarter IS NOT NULL THEN
+            'Q' || cm.last_payment_quarter || ' ' || cm.last_payment_year
+        ELSE NULL
+    END AS lastPaymentPeriod,
+    latest_payment.expected_fee AS lastPaymentExpected,
+    latest_payment.actual_fee AS lastPaymentActual,
+    latest_payment.variance AS lastPaymentVariance,
+    cm.last_recorded_assets AS lastRecordedAUM,
+    CASE
+        WHEN cps.current_month IS NOT NULL THEN
+            CASE
+                WHEN cps.current_month = 1 THEN 'Jan'
+                WHEN cps.current_month = 2 THEN 'Feb'
+                WHEN cps.current_month = 3 THEN 'Mar'
+                WHEN cps.current_month = 4 THEN 'Apr'
+                WHEN cps.current_month = 5 THEN 'May'
+                WHEN cps.current_month = 6 THEN 'Jun'
+                WHEN cps.current_month = 7 THEN 'Jul'
+                WHEN cps.current_month = 8 THEN 'Aug'
+                WHEN cps.current_month = 9 THEN 'Sep'
+                WHEN cps.current_month = 10 THEN 'Oct'
+                WHEN cps.current_month = 11 THEN 'Nov'
+                WHEN cps.current_month = 12 THEN 'Dec'
+            END || ' ' || cps.current_month_year
+        WHEN cps.current_quarter IS NOT NULL THEN
+            'Q' || cps.current_quarter || ' ' || cps.current_quarter_year
+        ELSE NULL
+    END AS currentPeriod,
+    cps.payment_status AS currentStatus,
+    CASE WHEN ct.payment_schedule = 'monthly' THEN last_paid.applied_end_month END AS lastPaymentMonth,
+    CASE WHEN ct.payment_schedule = 'quarterly' THEN last_paid.applied_end_quarter END AS lastPaymentQuarter,
+    CASE
+        WHEN ct.payment_schedule = 'monthly' THEN last_paid.applied_end_month_year
+        WHEN ct.payment_schedule = 'quarterly' THEN last_paid.applied_end_quarter_year
+    END AS lastPaymentYear
+FROM
+    clients c
+JOIN
+    contracts ct ON c.client_id = ct.client_id AND ct.valid_to IS NULL
+LEFT JOIN
+    providers p ON ct.provider_id = p.provider_id
+LEFT JOIN
+    contract_rate_display crd ON ct.contract_id = crd.contract_id
+LEFT JOIN
+    client_metrics cm ON c.client_id = cm.client_id
+LEFT JOIN
+    client_payment_status cps ON c.client_id = cps.client_id
+LEFT JOIN
+    payments latest_payment ON latest_payment.payment_id = (
+        SELECT MAX(payment_id)
+        FROM payments
+        WHERE client_id = c.client_id AND valid_to IS NULL
+    )
+LEFT JOIN
+    payments last_paid ON last_paid.payment_id = (
+        SELECT payment_id
+        FROM payments
+        WHERE client_id = c.client_id AND valid_to IS NULL
+        ORDER BY
+            COALESCE(
+                applied_end_month_year * 12 + applied_end_month,
+                applied_end_quarter_year * 12 + applied_end_quarter * 3
+            ) DESC,
+            payment_id DESC
+        LIMIT 1
+    )
+WHERE
+    c.valid_to IS NULL
+"""
+
+# Contracts, clients and providers are edited outside the app, so their
+# changes refresh the summary through triggers. Payment writes refresh it
+# from the application write path (see app.database.client_summary).
+CLIENT_SUMMARY_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS client_summary_contract_insert
+    AFTER INSERT ON contracts
+    BEGIN
+        DELETE FROM client_summary WHERE id = NEW.client_id;
+        INSERT OR REPLACE INTO client_summary
+        SELECT * FROM client_summary_source WHERE id = NEW.client_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS client_summary_contract_update
+    AFTER UPDATE ON contracts
+    BEGIN
+        DELETE FROM client_summary WHERE id IN (OLD.client_id, NEW.client_id);
+        INSERT OR REPLACE INTO client_summary
+        SELECT * FROM client_summary_source WHERE id IN (OLD.client_id, NEW.client_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS client_summary_client_insert
+    AFTER INSERT ON clients
+    BEGIN
+        INSERT OR REPLACE INTO client_summary
+        SELECT * FROM client_summary_source WHERE id = NEW.client_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS client_summary_client_update
+    AFTER UPDATE ON clients
+    BEGIN
+        DELETE FROM client_summary WHERE id = NEW.client_id;
+        INSERT OR REPLACE INTO client_summary
+        SELECT * FROM client_summary_source WHERE id = NEW.client_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS client_summary_provider_update
+    AFTER UPDATE ON providers
+    BEGIN
+        DELETE FROM client_summary WHERE providerId = NEW.provider_id;
+        INSERT OR REPLACE INTO client_summary
+        SELECT * FROM client_summary_source WHERE providerId = NEW.provider_id;
+    END
+    """,
+]
+
+# frontend_payment_history without the trailing ORDER BY, exposing the raw
+# received_date so keyset pagination can seek through idx_payments_date.
+PAYMENT_HISTORY_SOURCE_VIEW = """
+CREATE VIEW IF NOT EXISTS payment_history_source AS
+SELECT
+    p.payment_id AS id,
+    p.client_id AS clientId,
+    date(p.received_date) AS receivedDate,
+    CASE
+        WHEN ct.payment_schedule = 'monthly' AND p.applied_start_month IS NOT NULL THEN
+            CASE
+                WHEN p.applied_start_month = 1 THEN 'Jan'
+                WHEN p.applied_start_month = 2 THEN 'Feb'
+                WHEN p.applied_start_month = 3 THEN 'Mar'
+                WHEN p.applied_start_month = 4 THEN 'Apr'
+                WHEN p.applied_start_month = 5 THEN 'May'
+                WHEN p.applied_start_month = 6 THEN 'Jun'
+                WHEN p.applied_start_month = 7 THEN 'Jul'
+                WHEN p.applied_start_month = 8 THEN 'Aug'
+                WHEN p.applied_start_month = 9 THEN 'Sep'
+                WHEN p.applied_start_month = 10 THEN 'Oct'
+                WHEN p.applied_start_month = 11 THEN 'Nov'
+                WHEN p.applied_start_month = 12 THEN 'Dec'
+            END || ' ' || p.applied_start_month_year
+        WHEN ct.payment_schedule = 'quarterly' AND p.applied_start_quarter IS NOT NULL THEN
+            'Q' || p.applied_start_quarter || ' ' || p.applied_start_quarter_year
+        ELSE NULL
+    END AS appliedPeriod,
+    p.total_assets AS aum,
+    p.expected_fee AS expectedFee,
+    p.actual_fee AS actualFee,
+    p.variance AS variance,
+    CASE
+        WHEN p.expected_fee IS NOT NULL AND p.expected_fee <> 0 THEN
+            (p.variance / p.expected_fee) * 100
+        ELSE NULL
+    END AS variancePercent,
+    p.method AS paymentType,
+    p.notes AS notes,
+    CASE WHEN pf.file_id IS NOT NULL THEN 1 ELSE 0 END AS hasAttachment,
+    pf.file_id AS attachmentId,
+    p.received_date AS sortDate
+FROM
+    payments p
+JOIN
+    contracts ct ON p.contract_id = ct.contract_id
+LEFT JOIN
+    payment_files pf ON p.payment_id = pf.payment_id
+WHERE
+    p.valid_to IS NULL
+"""
+
+# One stored file per distinct SHA-256; client_files rows reference it by
+# content_hash. blob_path is relative to DOCUMENT_STORE_PATH.
+DOCUMENT_BLOBS_TABLE = """
+CREATE TABLE IF NOT EXISTS document_blobs (
+    content_hash TEXT PRIMARY KEY,
+    blob_path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+# Year and quarter a payment is summarized under: its first applied period,
+# with monthly periods rolled up into their calendar quarter. Mirrored by
+# payment_bucket() in app.database.aggregates.
+PAYMENT_SUMMARY_YEAR = "COALESCE(applied_start_quarter_year, applied_start_month_year)"
+PAYMENT_SUMMARY_QUARTER = "COALESCE(applied_start_quarter, (applied_start_month + 2) / 3)"
+
+# Running sums behind the stored averages, so payment writes can add and
+# subtract deltas instead of re-aggregating history
+SUMMARY_SUM_COLUMNS = [
+    "ALTER TABLE quarterly_summaries ADD COLUMN assets_sum REAL",
+    "ALTER TABLE quarterly_summaries ADD COLUMN assets_count INTEGER",
+    "ALTER TABLE yearly_summaries ADD COLUMN assets_sum REAL",
+    "ALTER TABLE yearly_summaries ADD COLUMN assets_count INTEGER",
+]
+
+# What quarterly_summaries should hold: valid payments only. total_assets is
+# the average AUM over payments that recorded one. expected_total is the sum
+# of the quarter's expected fees (what the quarter should have brought in,
+# e.g. three months for a monthly payer); the dropped trigger stored
+# MAX(expected_fee), a single payment's expectation, which a running total
+# cannot maintain through deletes.
+QUARTERLY_SUMMARIES_SOURCE_VIEW = f"""
+CREATE VIEW IF NOT EXISTS quarterly_summaries_source AS
+SELECT
+    client_id,
+    {PAYMENT_SUMMARY_YEAR} AS year,
+    {PAYMENT_SUMMARY_QUARTER} AS quarter,
+    TOTAL(actual_fee) AS total_payments,
+    TOTAL(total_assets) / NULLIF(COUNT(total_assets), 0) AS total_assets,
+    COUNT(*) AS payment_count,
+    TOTAL(actual_fee) / COUNT(*) AS avg_payment,
+    TOTAL(expected_fee) AS expected_total,
+    TOTAL(total_assets) AS assets_sum,
+    COUNT(total_assets) AS assets_count
+FROM
+    payments
+WHERE
+    valid_to IS NULL
+    AND {PAYMENT_SUMMARY_YEAR} IS NOT NULL
+    AND {PAYMENT_SUMMARY_QUARTER} IS NOT NULL
+GROUP BY
+    client_id, {PAYMENT_SUMMARY_YEAR}, {PAYMENT_SUMMARY_QUARTER}
+"""
+
+# What yearly_summaries should hold, with growth against the previous
+# calendar year's total (NULL when that year has no payments or sums to 0)
+YEARLY_SUMMARIES_SOURCE_VIEW = f"""
+CREATE VIEW IF NOT EXISTS yearly_summaries_source AS
+WITH years AS (
+    SELECT
+        client_id,
+        {PAYMENT_SUMMARY_YEAR} AS year,
+        TOTAL(actual_fee) AS total_payments,
+        COUNT(*) AS payment_count,
+        TOTAL(total_assets) AS assets_sum,
+        COUNT(total_assets) AS assets_count
+    FROM
+        payments
+    WHERE
+        valid_to IS NULL
+        AND {PAYMENT_SUMMARY_YEAR} IS NOT NULL
+        AND {PAYMENT_SUMMARY_QUARTER} IS NOT NULL
+    GROUP BY
+        client_id, {PAYMENT_SUMMARY_YEAR}
+)
+SELECT
+    y.client_id,
+    y.year,
+    y.total_payments,
+    y.assets_sum / NULLIF(y.assets_count, 0) AS total_assets,
+    y.payment_count,
+    y.total_payments / y.payment_count AS avg_payment,
+    CASE
+        WHEN prev.total_payments <> 0 THEN
+            (y.total_payments - prev.total_payments) / prev.total_payments * 100
+        ELSE NULL
+    END AS yoy_growth,
+    y.assets_sum,
+    y.assets_count
+FROM
+    years y
+LEFT JOIN
+    years prev ON prev.client_id = y.client_id AND prev.year = y.year - 1
+"""
+
+# What client_metrics should hold for each client with a valid payment. The
+# latest payment (by received date) is found per client through
+# idx_payments_date, so the view can be filtered down to one client; the
+# totals come from the summary tables. A period is due once it has ended, so
+# the next payment is due at the start of the period after next.
+CLIENT_METRICS_SOURCE_VIEW = """
+CREATE VIEW IF NOT EXISTS client_metrics_source AS
+SELECT
+    c.client_id,
+    lp.received_date AS last_payment_date,
+    lp.actual_fee AS last_payment_amount,
+    lp.applied_end_month AS last_payment_month,
+    COALESCE(lp.applied_end_quarter, (lp.applied_end_month + 2) / 3) AS last_payment_quarter,
+    COALESCE(lp.applied_end_quarter_year, lp.applied_end_month_year) AS last_payment_year,
+    COALESCE((
+        SELECT total_payments
+        FROM yearly_summaries
+        WHERE client_id = c.client_id AND year = CAST(strftime('%Y', 'now') AS INTEGER)
+    ), 0) AS total_ytd_payments,
+    (
+        SELECT AVG(total_payments)
+        FROM quarterly_summaries
+        WHERE client_id = c.client_id
+    ) AS avg_quarterly_payment,
+    (
+        SELECT total_assets
+        FROM payments
+        WHERE client_id = c.client_id AND valid_to IS NULL AND total_assets IS NOT NULL
+        ORDER BY received_date DESC, payment_id DESC
+        LIMIT 1
+    ) AS last_recorded_assets,
+    CASE
+        WHEN lp.applied_end_month IS NOT NULL THEN
+            date(printf('%04d-%02d-01', lp.applied_end_month_year, lp.applied_end_month), '+2 months')
+        WHEN lp.applied_end_quarter IS NOT NULL THEN
+            date(printf('%04d-%02d-01', lp.applied_end_quarter_year, lp.applied_end_quarter * 3 - 2), '+6 months')
+        ELSE NULL
+    END AS next_payment_due
+FROM
+    clients c
+JOIN
+    payments lp ON lp.payment_id = (
+        SELECT payment_id
+        FROM payments
+        WHERE client_id = c.client_id AND valid_to IS NULL
+        ORDER BY received_date DESC, payment_id DESC
+        LIMIT 1
+    )
+"""
+
+QUARTERLY_SUMMARY_COLUMNS = (
+    "client_id, year, quarter, total_payments, total_assets, payment_count, "
+    "avg_payment, expected_total, assets_sum, assets_count"
+)
+YEARLY_SUMMARY_COLUMNS = (
+    "client_id, year, total_payments, total_assets, payment_count, "
+    "avg_payment, yoy_growth, assets_sum, assets_count"
+)
+CLIENT_METRICS_COLUMNS = (
+    "client_id, last_payment_date, last_payment_amount, last_payment_month, "
+    "last_payment_quarter, last_payment_year, total_ytd_payments, "
+    "avg_quarterly_payment, last_recorded_assets, next_payment_due"
+)
+
+# Full rebuild of the payment aggregates, in dependency order (client_metrics
+# reads both summary tables)
+AGGREGATE_REBUILD = [
+    "DELETE FROM quarterly_summaries",
+    f"""
+    INSERT INTO quarterly_summaries ({QUARTERLY_SUMMARY_COLUMNS}, last_updated)
+    SELECT {QUARTERLY_SUMMARY_COLUMNS}, datetime('now') FROM quarterly_summaries_source
+    """,
+    "DELETE FROM yearly_summaries",
+    f"""
+    INSERT INTO yearly_summaries ({YEARLY_SUMMARY_COLUMNS}, last_updated)
+    SELECT {YEARLY_SUMMARY_COLUMNS}, datetime('now') FROM yearly_summaries_source
+    """,
+    "DELETE FROM client_metrics",
+    f"""
+    INSERT INTO client_metrics ({CLIENT_METRICS_COLUMNS}, last_updated)
+    SELECT {CLIENT_METRICS_COLUMNS}, datetime('now') FROM client_metrics_source
+    """,
+]
+
+# Variance is written with each payment row (see payment_variance in
+# app.services.payment_service) instead of by triggers that re-updated the row. Runs
+# after the triggers are dropped, so it fixes any rows that disagree without
+# firing an UPDATE trigger per row.
+PAYMENT_VARIANCE_BACKFILL = """
+UPDATE payments
+SET
+    variance = actual_fee - expected_fee,
+    variance_percent = CASE
+        WHEN expected_fee IS NOT NULL AND expected_fee <> 0 AND actual_fee IS NOT NULL
+        THEN ((actual_fee - expected_fee) / expected_fee) * 100
+        ELSE NULL
+    END
+WHERE
+    variance IS NOT actual_fee - expected_fee
+    OR variance_percent IS NOT CASE
+        WHEN expected_fee IS NOT NULL AND expected_fee <> 0 AND actual_fee IS NOT NULL
+        THEN ((actual_fee - expected_fee) / expected_fee) * 100
+        ELSE NULL
+    END
+"""
+
+# One row per active provider for the sidebar's provider list: the former
+# get_providers() aggregate, plus fees applied to the current year.
+# ytdYear records which year ytdFees covers, so readers can tell when the
+# rollup needs rebuilding after New Year.
+PROVIDER_ROLLUP_SOURCE_VIEW = """
+CREATE VIEW IF NOT EXISTS provider_rollup_source AS
+SELECT
+    p.provider_id AS id,
+    p.name,
+    COUNT(DISTINCT c.client_id) AS clientCount,
+    SUM(cm.last_recorded_assets) AS totalAssets,
+    SUM(ct.num_people) AS totalParticipants,
+    CAST(strftime('%Y', 'now') AS INTEGER) AS ytdYear,
+    TOTAL(ys.total_payments) AS ytdFees
+FROM
+    providers p
+LEFT JOIN
+    contracts ct ON p.provider_id = ct.provider_id AND ct.valid_to IS NULL
+LEFT JOIN
+    clients c ON ct.client_id = c.client_id AND c.valid_to IS NULL
+LEFT JOIN
+    client_metrics cm ON c.client_id = cm.client_id
+LEFT JOIN
+    yearly_summaries ys ON ys.client_id = c.client_id AND ys.year = CAST(strftime('%Y', 'now') AS INTEGER)
+WHERE
+    p.valid_to IS NULL
+GROUP BY
+    p.provider_id, p.name
+"""
+
+PROVIDER_ROLLUP_TABLE = """
+CREATE TABLE IF NOT EXISTS provider_rollup (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    clientCount INTEGER,
+    totalAssets REAL,
+    totalParticipants INTEGER,
+    ytdYear INTEGER,
+    ytdFees REAL
+)
+"""
+
+# Refresh the rollup rows of the providers selected by {providers}
+PROVIDER_ROLLUP_REFRESH = """
+        DELETE FROM provider_rollup WHERE id IN ({providers});
+        INSERT OR REPLACE INTO provider_rollup
+        SELECT * FROM provider_rollup_source WHERE id IN ({providers});"""
+
+CLIENT_PROVIDERS = "SELECT provider_id FROM contracts WHERE client_id = {client} AND valid_to IS NULL"
+
+# Contracts, clients and providers are edited outside the app; payment
+# writes refresh the rollup from the application write path (see
+# app.database.provider_rollup).
+PROVIDER_ROLLUP_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS provider_rollup_contract_insert
+    AFTER INSERT ON contracts
+    BEGIN{PROVIDER_ROLLUP_REFRESH.format(providers="NEW.provider_id")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS provider_rollup_contract_update
+    AFTER UPDATE ON contracts
+    BEGIN{PROVIDER_ROLLUP_REFRESH.format(providers="OLD.provider_id, NEW.provider_id")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS provider_rollup_client_insert
+    AFTER INSERT ON clients
+    BEGIN{PROVIDER_ROLLUP_REFRESH.format(providers=CLIENT_PROVIDERS.format(client="NEW.client_id"))}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS provider_rollup_client_update
+    AFTER UPDATE ON clients
+    BEGIN{PROVIDER_ROLLUP_REFRESH.format(providers=CLIENT_PROVIDERS.format(client="NEW.client_id"))}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS provider_rollup_provider_insert
+    AFTER INSERT ON providers
+    BEGIN{PROVIDER_ROLLUP_REFRESH.format(providers="NEW.provider_id")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS provider_rollup_provider_update
+    AFTER UPDATE ON providers
+    BEGIN{PROVIDER_ROLLUP_REFRESH.format(providers="OLD.provider_id, NEW.provider_id")}
+    END
+    """,
+]
+
+# Ordered list of (description, statements). The position in the list is the
+# schema version; never reorder or edit an entry once it has shipped.
+MIGRATIONS: list[tuple[str, list[str]]] = [
+    (
+        "Materialized client_summary table",
+        [
+            CLIENT_SUMMARY_SOURCE_VIEW,
+            CLIENT_SUMMARY_TABLE,
+            "CREATE INDEX IF NOT EXISTS idx_client_summary_provider ON client_summary(providerId)",
+            *CLIENT_SUMMARY_TRIGGERS,
+            "DELETE FROM client_summary",
+            "INSERT OR REPLACE INTO client_summary SELECT * FROM client_summary_source",
+        ],
+    ),
+    (
+        "Keyset-friendly payment history view",
+        [
+            PAYMENT_HISTORY_SOURCE_VIEW,
+        ],
+    ),
+    (
+        "Upload metadata on client_files",
+        [
+            # description was already written by store_document but missing from the table
+            "ALTER TABLE client_files ADD COLUMN description TEXT",
+            "ALTER TABLE client_files ADD COLUMN file_size INTEGER",
+            "ALTER TABLE client_files ADD COLUMN content_hash TEXT",
+        ],
+    ),
+    (
+        "Content-addressed document blobs",
+        [
+            DOCUMENT_BLOBS_TABLE,
+            "CREATE INDEX IF NOT EXISTS idx_client_files_content_hash ON client_files(content_hash)",
+        ],
+    ),
+    (
+        "Last paid period on client_summary",
+        [
+            "DROP VIEW IF EXISTS client_summary_source",
+            CLIENT_SUMMARY_SOURCE_VIEW_V2,
+            # Same order as the view's new trailing columns
+            "ALTER TABLE client_summary ADD COLUMN lastPaymentMonth INTEGER",
+            "ALTER TABLE client_summary ADD COLUMN lastPaymentQuarter INTEGER",
+            "ALTER TABLE client_summary ADD COLUMN lastPaymentYear INTEGER",
+            "DELETE FROM client_summary",
+            "INSERT OR REPLACE INTO client_summary SELECT * FROM client_summary_source",
+        ],
+    ),
+    (
+        "Application-maintained payment aggregates",
+        [
+            # Replaced by app.database.aggregates on the payment write path
+            "DROP TRIGGER IF EXISTS update_quarterly_after_payment",
+            "DROP TRIGGER IF EXISTS update_yearly_after_quarterly",
+            *SUMMARY_SUM_COLUMNS,
+            QUARTERLY_SUMMARIES_SOURCE_VIEW,
+            YEARLY_SUMMARIES_SOURCE_VIEW,
+            CLIENT_METRICS_SOURCE_VIEW,
+            *AGGREGATE_REBUILD,
+            # client_summary reads client_metrics
+            "DELETE FROM client_summary",
+            "INSERT OR REPLACE INTO client_summary SELECT * FROM client_summary_source",
+        ],
+    ),
+    (
+        "Variance written with payment rows",
+        [
+            "DROP TRIGGER IF EXISTS payments_update_variance_insert",
+            "DROP TRIGGER IF EXISTS payments_update_variance_update",
+            PAYMENT_VARIANCE_BACKFILL,
+            # client_summary copies the latest payment's variance
+            "DELETE FROM client_summary",
+            "INSERT OR REPLACE INTO client_summary SELECT * FROM client_summary_source",
+        ],
+    ),
+    (
+        "Materialized provider_rollup table",
+        [
+            "CREATE INDEX IF NOT EXISTS idx_contracts_provider_id ON contracts(provider_id, valid_to)",
+            PROVIDER_ROLLUP_SOURCE_VIEW,
+            PROVIDER_ROLLUP_TABLE,
+            *PROVIDER_ROLLUP_TRIGGERS,
+            "DELETE FROM provider_rollup",
+            "INSERT OR REPLACE INTO provider_rollup SELECT * FROM provider_rollup_source",
+        ],
+    ),
+]
+
+async def apply_migrations(conn: aiosqlite.Connection) -> int:
+    """
+    Apply any migrations newer than the database's user_version.
+
+    Args:
+        conn: Writer connection
+
+    Returns: Schema version after migrating
+    """
+    cursor = await conn.execute("PRAGMA user_version")
+    row = await cursor.fetchone()
+    current = row["user_version"] if row else 0
+
+    for version, (description, statements) in enumerate(MIGRATIONS, start=1):
+        if version <= current:
+            continue
+
+        logger.info(f"Applying schema migration {version}: {description}")
+        try:
+            await conn.execute("BEGIN")
+            for statement in statements:
+                await conn.execute(statement)
+            # PRAGMA does not accept bound parameters
+            await conn.execute(f"PRAGMA user_version = {version}")
+            await conn.commit()
+        except Exception:
+            await conn.rollback()
+            raise
+        current = version
+
+    return current
@@ -8,10 +8,30 @@ configures middleware, and defines startup/shutdown events.
 import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
-from app.core.config import ORIGINS, APP_NAME, APP_VERSION
-from app.database.database import init_db_pool, close_db_pool
-from app.api.endpoints import clients, providers, payments, documents
+from app.core.config import (
+    ORIGINS,
+    APP_NAME,
+    APP_VERSION,
+    RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_TTL,
+    PAYMENT_STATUS_CACHE_SIZE,
+    PAYMENT_STATUS_CACHE_TTL,
+    validate_settings
+)
+from app.database.database import init_db_pool, close_db_pool, get_db_pool
+from app.database.provider_rollup import rebuild_stale_provider_rollup
+from app.api.endpoints import clients, providers, payments, documents, fees
+from app.api.middleware import TimingMiddleware
+from app.utils.cache import response_cache
+from app.utils.metrics import request_metrics
+from app.utils.uploads import upload_stats
+from app.services.document_store import shutdown_io_executor
+from app.services.document_service import document_paths
+from app.services.preview_service import preview_stats, shutdown_preview_pool
+from app.services.fee_service import fee_structures
+from app.services.client_service import overdue_reports
 
 # Setup logging
 logging.basicConfig(
@@ -41,11 +61,22 @@ def create_app():
         allow_headers=["*"],
     )
     
+    # Per-request timing: Server-Timing headers and route histograms.
+    # Added last so it is outermost and times the whole stack.
+    app.add_middleware(TimingMiddleware)
+    
     # Include routers
     app.include_router(clients.router)
     app.include_router(providers.router)
     app.include_router(payments.router)
     app.include_router(documents.router)
+    app.include_router(fees.router)
+    
+    # Database pool health and wait-time metrics
+    app.add_api_route("/api/health", health_check, methods=["GET"], tags=["health"])
+    
+    # Per-route latency, SQL and serialization histograms for Prometheus
+    app.add_api_route("/api/_metrics", metrics, methods=["GET"], tags=["health"], response_class=PlainTextResponse)
     
     # Register event handlers
     app.add_event_handler("startup", startup_event)
@@ -57,15 +88,61 @@ async def startup_event():
     """Initialize application resources on startup."""
     logger.info("Starting up application...")
     
+    # Resolve the app mode and paths and check the database once
+    validate_settings()
+    
     # Initialize database connection pool
     await init_db_pool()
     
+    # Restart provider year-to-date fees after New Year; the read path
+    # reports last year's rows as 0 until this has run
+    try:
+        async with get_db_pool().writer() as conn:
+            if await rebuild_stale_provider_rollup(conn):
+                logger.info("Rebuilt provider_rollup for the new year")
+    except Exception as e:
+        logger.warning(f"Could not rebuild provider_rollup: {str(e)}")
+    
+    # Size the response cache for read endpoints
+    response_cache.configure(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+    overdue_reports.configure(maxsize=PAYMENT_STATUS_CACHE_SIZE, ttl=PAYMENT_STATUS_CACHE_TTL)
+    
     logger.info("Application startup complete")
 
+async def health_check():
+    """
+    GET /api/health
+    
+    Returns: Database pool health status and statistics
+    """
+    return {
+        "database": await get_db_pool().health_check(),
+        "responseCache": response_cache.stats(),
+        "uploads": upload_stats.stats(),
+        "documentPaths": document_paths.stats(),
+        "previews": preview_stats.stats(),
+        "feeStructures": fee_structures.stats(),
+        "overdueReports": overdue_reports.stats()
+    }
+
+async def metrics():
+    """
+    GET /api/_metrics
+    
+    Returns: Request metrics in the Prometheus text exposition format
+    """
+    return PlainTextResponse(request_metrics.render(), media_type="text/plain; version=0.0.4")
+
 async def shutdown_event():
     """Clean up resources on application shutdown."""
     logger.info("Shutting down application...")
     
+    # Let in-flight document writes finish
+    shutdown_io_executor()
+    
+    # Abandon queued preview renders; they are redone on demand
+    shutdown_preview_pool()
+    
     # Close database connections
     await close_db_pool()
     
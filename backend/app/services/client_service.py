@@ -6,52 +6,70 @@ Handles complex client-related operations:
 - Data aggregation from multiple tables
 - Formatting for frontend consumption
 - Missing payment detection
-- Status determination
+- Status determination, batched across clients with period indexes
+
+Status depends on the evaluation date only through its month (see
+as_of_period), so status results can be memoized per month and historic
+"as of" reports reuse the same code path as today's.
 """
-from typing import Any
-from datetime import datetime
+from typing import Any, Iterator, NamedTuple, Optional, Sequence
+from datetime import date
 import json
 import asyncio
 
-from app.utils.format import format_period, format_month_name
+from app.utils.cache import ResponseCache
+from app.utils.format import period_label
 from app.utils.enums import FeeType, PaymentSchedule
 
-async def get_frontend_client_data() -> dict[str, Any]:
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional speedup
+    np = None
+
+# Below this many clients the list arithmetic beats converting to arrays
+NUMPY_BATCH_MIN = 1024
+
+# (data version, as_of_period) -> overdue clients and total missing periods;
+# sized from config at startup
+overdue_reports = ResponseCache(maxsize=64, ttl=3600)
+
+async def get_frontend_client_data(as_of: Optional[date] = None) -> dict[str, Any]:
     """
     Build the complete frontend data structure for clients.
     Combines clients, providers, client details, and payment history.
     
+    Args:
+        as_of: Date to evaluate payment status against (default today)
+    
     Returns the complete JSON structure with clients, providers, clientDetails, 
     and paymentHistory objects.
     """
     from app.database.models import (
         get_all_clients, 
         get_providers, 
-        get_client_details,
-        get_client_payment_history
+        get_all_client_details,
+        get_all_client_payment_histories
     )
     
-    # Get primary data
-    clients = await get_all_clients()
-    providers = await get_providers()
+    # Load everything up front in a fixed number of queries,
+    # running them concurrently on separate pooled readers
+    clients, providers, all_details, all_history = await asyncio.gather(
+        get_all_clients(as_of),
+        get_providers(),
+        get_all_client_details(as_of),
+        get_all_client_payment_histories()
+    )
     
-    # Initialize containers for detailed data
+    # Assemble per-client structures in one pass
     client_details = {}
     payment_history = {}
     
-    # For each client, fetch detailed information
     for client in clients:
         client_id = client["id"]
         client_id_str = str(client_id)
         
-        # Use tasks for parallel execution
-        details_task = asyncio.create_task(get_client_details(client_id))
-        payment_history_task = asyncio.create_task(get_client_payment_history(client_id))
-        
-        # Await both tasks
-        client_details[client_id_str] = await details_task
-        payment_history_result = await payment_history_task
-        payment_history[client_id_str] = payment_history_result["payments"]
+        client_details[client_id_str] = all_details.get(client_id, {})
+        payment_history[client_id_str] = all_history.get(client_id, [])
     
     # Return the complete structure
     return {
@@ -61,67 +79,201 @@ async def get_frontend_client_data() -> dict[str, Any]:
         "paymentHistory": payment_history
     }
 
-def determine_payment_status(client_data: dict[str, Any]) -> str:
-    """Determine if client payments are current or due based on payment schedule."""
-    # Get today's date
-    today = datetime.now()
+class MissingRange(NamedTuple):
+    """
+    A run of consecutive unpaid periods, as period indexes (see period_index).
+    
+    Kept compact; the individual period labels are only produced on demand.
+    """
+    schedule: str
+    start: int
+    end: int
+
+    @property
+    def count(self) -> int:
+        """Number of missing periods."""
+        return self.end - self.start + 1
+
+    def periods(self) -> Iterator[str]:
+        """Yield the missing periods as display strings, oldest first."""
+        for index in range(self.start, self.end + 1):
+            yield period_label(index, self.schedule)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the range as first/last period labels and a count."""
+        return {
+            "from": period_label(self.start, self.schedule),
+            "to": period_label(self.end, self.schedule),
+            "count": self.count,
+        }
+
+def as_of_period(as_of: Optional[date] = None) -> int:
+    """
+    Get the monthly period index of a status evaluation date.
+    
+    Every day of a month yields the same due periods, and so the same
+    statuses; this index is the key status results are memoized under.
+    
+    Returns: Monthly period index of as_of (default today)
+    """
+    as_of = as_of or date.today()
+    return as_of.year * 12 + as_of.month - 1
+
+def due_period_indexes(as_of: Optional[date] = None) -> dict[str, int]:
+    """
+    Get the most recent period that should be paid by a date, per schedule.
+    
+    Fees are paid in arrears: on any day, the previous month (monthly) or
+    the previous quarter (quarterly) is the latest period due.
+    
+    Returns: Dictionary mapping schedule to the due period's index
+    """
+    month = as_of_period(as_of)
+    return {
+        PaymentSchedule.MONTHLY: month - 1,
+        PaymentSchedule.QUARTERLY: month // 3 - 1,
+    }
+
+def last_paid_index(client_data: dict[str, Any]) -> Optional[int]:
+    """
+    Get a client's last paid period as a period index.
     
-    # Extract payment schedule and last payment details
-    payment_schedule = client_data.get("paymentSchedule", "").lower()
+    Returns: Index in the client's schedule, or None if nothing has been paid
+    """
+    payment_schedule = (client_data.get("paymentSchedule") or "").lower()
+    year = client_data.get("lastPaymentYear")
     
-    # Calculate previous period (the period that should be paid by now)
     if payment_schedule == PaymentSchedule.MONTHLY:
-        # Calculate current period (previous month)
-        if today.month == 1:
-            current_period_month = 12
-            current_period_year = today.year - 1
-        else:
-            current_period_month = today.month - 1
-            current_period_year = today.year
-            
-        # Extract client's last payment month/year
-        last_payment_month = client_data.get("lastPaymentMonth")
-        last_payment_year = client_data.get("lastPaymentYear")
-        
-        # Compare periods
-        if last_payment_month is None or last_payment_year is None:
-            return "Due"  # No payments yet
-        
-        if (last_payment_year < current_period_year or 
-            (last_payment_year == current_period_year and 
-             last_payment_month < current_period_month)):
-            return "Due"  # Last payment is before current period
-        else:
-            return "Paid"  # Last payment is current or newer
-            
+        month = client_data.get("lastPaymentMonth")
+        if month is not None and year is not None:
+            return year * 12 + month - 1
     elif payment_schedule == PaymentSchedule.QUARTERLY:
-        # Calculate current quarter
-        current_period_quarter = ((today.month - 1) // 3) + 1
-        current_period_year = today.year
+        quarter = client_data.get("lastPaymentQuarter")
+        if quarter is not None and year is not None:
+            return year * 4 + quarter - 1
+    
+    return None
+
+def batch_payment_status(
+    schedules: Sequence[Optional[str]],
+    last_paid: Sequence[Optional[int]],
+    as_of: Optional[date] = None
+) -> tuple[list[str], list[Optional[MissingRange]]]:
+    """
+    Compute payment status and missing periods for many clients at once.
+    
+    Every client is compared against the same due periods for ``as_of``
+    with integer arithmetic on period indexes, so the cost per client is
+    constant however far behind it is. Large batches use NumPy when it is
+    installed.
+    
+    Args:
+        schedules: Payment schedule per client
+        last_paid: Last paid period index per client (None if never paid)
+        as_of: Date to evaluate against (default today)
+        
+    Returns: Tuple of (status per client, MissingRange or None per client).
+        Clients that have never paid, or have no known schedule, are "Due"
+        without a missing range.
+    """
+    due_indexes = due_period_indexes(as_of)
+    schedules = [(schedule or "").lower() for schedule in schedules]
+    due = [due_indexes.get(schedule) for schedule in schedules]
+    
+    if np is not None and len(schedules) >= NUMPY_BATCH_MIN:
+        due_array = np.array([-1 if index is None else index for index in due], dtype=np.int64)
+        last_array = np.array([-1 if index is None else index for index in last_paid], dtype=np.int64)
+        known = (due_array >= 0) & (last_array >= 0)
+        paid = (known & (last_array >= due_array)).tolist()
+        behind = (known & (last_array < due_array)).tolist()
+    else:
+        known = [d is not None and l is not None for d, l in zip(due, last_paid)]
+        paid = [k and l >= d for k, d, l in zip(known, due, last_paid)]
+        behind = [k and l < d for k, d, l in zip(known, due, last_paid)]
+    
+    statuses = ["Paid" if is_paid else "Due" for is_paid in paid]
+    missing = [
+        MissingRange(schedule, last + 1, due_index) if is_behind else None
+        for is_behind, schedule, last, due_index in zip(behind, schedules, last_paid, due)
+    ]
+    return statuses, missing
+
+def apply_payment_status(clients: list[dict[str, Any]], as_of: Optional[date] = None) -> None:
+    """
+    Set status, missingPayments and missingRange on client detail rows in one batch.
+    
+    Args:
+        clients: client_summary rows (modified in place)
+        as_of: Date to evaluate against (default today)
+    """
+    statuses, missing = batch_payment_status(
+        [client.get("paymentSchedule") for client in clients],
+        [last_paid_index(client) for client in clients],
+        as_of
+    )
+    for client, status, missing_range in zip(clients, statuses, missing):
+        client["status"] = status
+        client["missingPayments"] = list(missing_range.periods()) if missing_range else []
+        client["missingRange"] = missing_range.to_dict() if missing_range else None
+
+async def get_overdue_clients(as_of: Optional[date] = None) -> dict[str, Any]:
+    """
+    List clients with unpaid periods, most periods behind first.
+    
+    Reports are memoized per database data version and status month, so
+    repeated or historic requests skip the query until the next write.
+    
+    Args:
+        as_of: Date to evaluate against (default today)
         
-        # If we're in Q1, the previous quarter was Q4 of last year
-        if current_period_quarter == 1:
-            current_period_quarter = 4
-            current_period_year = today.year - 1
-        else:
-            current_period_quarter -= 1
-            
-        # Extract client's last payment quarter/year
-        last_payment_quarter = client_data.get("lastPaymentQuarter")
-        last_payment_year = client_data.get("lastPaymentYear")
+    Returns: Dictionary with the as-of date and one entry per overdue client,
+        each with its last paid period and missing range (None if the client
+        has never paid)
+    """
+    from app.database.database import get_data_version
+    from app.database.models import get_client_payment_periods
+    
+    as_of = as_of or date.today()
+    # Read the version before the data, so an entry is never older than its key
+    key = (await get_data_version(), as_of_period(as_of))
+    
+    hit, report = overdue_reports.get(key)
+    if not hit:
+        clients = await get_client_payment_periods()
+        last_paid = [last_paid_index(client) for client in clients]
+        statuses, missing = batch_payment_status([client["paymentSchedule"] for client in clients], last_paid, as_of)
         
-        # Compare periods
-        if last_payment_quarter is None or last_payment_year is None:
-            return "Due"  # No payments yet
+        overdue = [
+            {
+                "id": client["id"],
+                "name": client["name"],
+                "providerId": client["providerId"],
+                "providerName": client["providerName"],
+                "paymentSchedule": client["paymentSchedule"],
+                "lastPaidPeriod": period_label(last, client["paymentSchedule"]) if last is not None else None,
+                "missing": missing_range.to_dict() if missing_range else None,
+            }
+            for client, last, status, missing_range in zip(clients, last_paid, statuses, missing)
+            if status == "Due"
+        ]
+        overdue.sort(key=lambda client: -(client["missing"]["count"] if client["missing"] else 0))
         
-        if (last_payment_year < current_period_year or 
-            (last_payment_year == current_period_year and 
-             last_payment_quarter < current_period_quarter)):
-            return "Due"  # Last payment is before current period
-        else:
-            return "Paid"  # Last payment is current or newer
+        report = {
+            "clients": overdue,
+            "totalMissingPeriods": sum(client["missing"]["count"] for client in overdue if client["missing"]),
+        }
+        overdue_reports.set(key, report)
     
-    return "Due"  # Default to Due if payment schedule is unknown
+    return {"asOf": as_of.isoformat(), **report}
+
+def determine_payment_status(client_data: dict[str, Any], as_of: Optional[date] = None) -> str:
+    """Determine if client payments are current or due based on payment schedule."""
+    statuses, _ = batch_payment_status(
+        [client_data.get("paymentSchedule")],
+        [last_paid_index(client_data)],
+        as_of
+    )
+    return statuses[0]
 
 def calculate_expected_fee(client_data: dict[str, Any]) -> float:
     """
@@ -146,104 +298,16 @@ def calculate_expected_fee(client_data: dict[str, Any]) -> float:
     
     return None
 
-def calculate_missing_payments(client_data: dict[str, Any]) -> list[str]:
+def calculate_missing_payments(client_data: dict[str, Any], as_of: Optional[date] = None) -> list[str]:
     """
     Generate a list of missing payment periods for frontend status display.
     
     Returns: Array of formatted period strings representing missing payments,
     or empty array if client is current
     """
-    # If payment status is "Paid", return empty array (no missing payments)
-    if determine_payment_status(client_data) == "Paid":
-        return []
-    
-    # Get today's date
-    today = datetime.now()
-    
-    # Container for missing payment periods
-    missing_periods = []
-    
-    # Extract payment schedule
-    payment_schedule = client_data.get("paymentSchedule", "").lower()
-    
-    if payment_schedule == PaymentSchedule.MONTHLY:
-        # Extract client's last payment month/year
-        last_month = client_data.get("lastPaymentMonth", 0)
-        last_year = client_data.get("lastPaymentYear", 0)
-        
-        # Calculate the next period after the last payment
-        if last_month == 12:
-            next_month = 1
-            next_year = last_year + 1
-        else:
-            next_month = last_month + 1
-            next_year = last_year
-        
-        # Calculate current period (previous month)
-        if today.month == 1:
-            current_month = 12
-            current_year = today.year - 1
-        else:
-            current_month = today.month - 1
-            current_year = today.year
-        
-        # Generate all missing periods
-        current_month_iter = next_month
-        current_year_iter = next_year
-        
-        while (current_year_iter < current_year or 
-               (current_year_iter == current_year and current_month_iter <= current_month)):
-            # Format the period string
-            period_str = format_period("monthly", current_month_iter, current_year_iter)
-            missing_periods.append(period_str)
-            
-            # Move to next month
-            if current_month_iter == 12:
-                current_month_iter = 1
-                current_year_iter += 1
-            else:
-                current_month_iter += 1
-                
-    elif payment_schedule == PaymentSchedule.QUARTERLY:
-        # Extract client's last payment quarter/year
-        last_quarter = client_data.get("lastPaymentQuarter", 0)
-        last_year = client_data.get("lastPaymentYear", 0)
-        
-        # Calculate the next period after the last payment
-        if last_quarter == 4:
-            next_quarter = 1
-            next_year = last_year + 1
-        else:
-            next_quarter = last_quarter + 1
-            next_year = last_year
-        
-        # Calculate current period (current quarter)
-        current_quarter = ((today.month - 1) // 3) + 1
-        current_year = today.year
-        
-        # If we're in the first month of a quarter, the previous quarter is the one to check
-        if today.month % 3 == 1:
-            if current_quarter == 1:
-                current_quarter = 4
-                current_year -= 1
-            else:
-                current_quarter -= 1
-        
-        # Generate all missing periods
-        current_quarter_iter = next_quarter
-        current_year_iter = next_year
-        
-        while (current_year_iter < current_year or 
-               (current_year_iter == current_year and current_quarter_iter <= current_quarter)):
-            # Format the period string
-            period_str = format_period("quarterly", current_quarter_iter, current_year_iter)
-            missing_periods.append(period_str)
-            
-            # Move to next quarter
-            if current_quarter_iter == 4:
-                current_quarter_iter = 1
-                current_year_iter += 1
-            else:
-                current_quarter_iter += 1
-    
-    return missing_periods
\ No newline at end of file
+    _, missing = batch_payment_status(
+        [client_data.get("paymentSchedule")],
+        [last_paid_index(client_data)],
+        as_of
+    )
+    return list(missing[0].periods()) if missing[0] else []
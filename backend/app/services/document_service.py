@@ -6,57 +6,198 @@ Handles:
 - Reference and retrieval of documents from OneDrive or local storage
 - File metadata tracking in database
 - Association of documents with payments
+
+File contents live in the content-addressed store (see document_store);
+client_files rows link to it through content_hash.
 """
 import os
-import shutil
+import stat
+import asyncio
 from pathlib import Path
-from datetime import datetime
-from typing import Any, Optional, BinaryIO
+from datetime import datetime, timezone
+from typing import Any, Optional
 from fastapi import UploadFile
 
-from app.core.config import PATHS
-from app.database.database import execute_query, execute_write_query, get_db_connection
+from app.core.config import (
+    PATHS,
+    DOCUMENT_PATH_CACHE_SIZE,
+    DOCUMENT_PATH_CACHE_TTL,
+    DOCUMENT_MISSING_CACHE_TTL
+)
+from app.database.database import execute_query, submit_write
+from app.database.models import insert_payment, invalidate_payment_caches
+from app.utils.cache import ResponseCache, response_cache
+from app.utils.uploads import UploadTooLargeError
+from app.services.document_store import (
+    run_io,
+    blob_path,
+    resolve_stored_path,
+    store_upload,
+    release_blobs
+)
 
-async def get_document_path(document_id: int) -> Optional[Path]:
+DOCUMENT_FILES_QUERY = """
+SELECT cf.file_id, cf.client_id, cf.file_name, cf.onedrive_path, cf.content_hash, b.blob_path
+FROM client_files cf
+LEFT JOIN document_blobs b ON cf.content_hash = b.content_hash
+WHERE cf.file_id IN ({placeholders})
+"""
+
+# file_id -> resolved document (or None when missing), tagged "document:{id}"
+document_paths = ResponseCache(maxsize=DOCUMENT_PATH_CACHE_SIZE, ttl=DOCUMENT_PATH_CACHE_TTL)
+
+def invalidate_document_path(document_id: Optional[int] = None) -> None:
+    """Drop the cached resolution for one document, or for all documents."""
+    if document_id is None:
+        document_paths.clear()
+    else:
+        document_paths.invalidate(f"document:{document_id}")
+
+def _locate_document(document: dict[str, Any]) -> Optional[dict[str, Any]]:
+    """Find a document's file on disk (blocking; runs on the I/O pool)."""
+    candidates = []
+    
+    if document["blob_path"]:
+        candidates.append(blob_path(document["blob_path"]))
+    elif document["onedrive_path"]:
+        candidates.append(resolve_stored_path(document["onedrive_path"]))
+        
+        if PATHS["APP_MODE"] != "office":
+            # Older home-mode layout: documents/{document_id}/{file_name}
+            legacy_dir = Path(__file__).parent.parent.parent / "documents" / str(document["file_id"])
+            candidates.append(legacy_dir / document["file_name"])
+    
+    for path in candidates:
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            continue
+        if stat.S_ISREG(stat_result.st_mode):
+            return {
+                "file_id": document["file_id"],
+                "client_id": document["client_id"],
+                "file_name": document["file_name"],
+                "content_hash": document["content_hash"] if document["blob_path"] else None,
+                "path": path,
+                "stat": stat_result
+            }
+    
+    return None
+
+async def resolve_documents(document_ids: list[int]) -> dict[int, Optional[dict[str, Any]]]:
     """
-    Get the complete file system path for a document.
+    Resolve several documents to files on disk, using the path cache.
+    
+    Cache misses are looked up with a single query and stat'ed concurrently
+    on the document I/O pool. Found files are re-checked after
+    DOCUMENT_PATH_CACHE_TTL seconds (picking up a new mtime/size), missing
+    ones after DOCUMENT_MISSING_CACHE_TTL.
     
     Args:
-        document_id: Document ID in the database
+        document_ids: Document IDs
         
-    Returns: Full filesystem path to the document or None if not found
+    Returns: Dictionary mapping each ID to its resolved document (file_id,
+        client_id, file_name, content_hash, path, stat) or None
     """
-    query = """
-    SELECT file_name, onedrive_path
-    FROM client_files
-    WHERE file_id = ?
+    resolved = {}
+    misses = []
+    
+    for document_id in dict.fromkeys(document_ids):
+        hit, document = document_paths.get(document_id)
+        if hit:
+            resolved[document_id] = document
+        else:
+            misses.append(document_id)
+    
+    if not misses:
+        return resolved
+    
+    query = DOCUMENT_FILES_QUERY.format(placeholders=", ".join("?" for _ in misses))
+    rows = {row["file_id"]: row for row in await execute_query(query, tuple(misses))}
+    
+    async def locate(document_id: int) -> Optional[dict[str, Any]]:
+        row = rows.get(document_id)
+        return await run_io(_locate_document, row) if row else None
+    
+    # Each stat is a round trip on synced folders; run them side by side
+    found = await asyncio.gather(*(locate(document_id) for document_id in misses))
+    
+    for document_id, document in zip(misses, found):
+        resolved[document_id] = document
+        document_paths.set(
+            document_id,
+            document,
+            tags=[f"document:{document_id}"],
+            ttl=None if document else DOCUMENT_MISSING_CACHE_TTL
+        )
+    
+    return resolved
+
+async def get_document_file(document_id: int, verify: bool = False) -> Optional[dict[str, Any]]:
     """
-    results = await execute_query(query, (document_id,))
+    Look up a document's metadata and resolve its file on disk.
     
-    if not results:
-        return None
+    Args:
+        document_id: Document ID in the database
+        verify: Re-stat a cached file before returning it (for downloads,
+            which are about to open it anyway); a file that disappeared is
+            resolved again from the database
+        
+    Returns: Dictionary with file_id, client_id, file_name, content_hash,
+        path and stat, or None if the document or its file does not exist
+    """
+    document = (await resolve_documents([document_id]))[document_id]
     
-    document = results[0]
-    onedrive_path = document.get("onedrive_path")
+    if not verify or document is None:
+        return document
     
-    if not onedrive_path:
-        return None
+    try:
+        stat_result = await run_io(os.stat, document["path"])
+    except OSError:
+        # Moved or deleted since it was cached (e.g. by dedupe-documents)
+        invalidate_document_path(document_id)
+        return (await resolve_documents([document_id]))[document_id]
     
-    # Determine if we should use OneDrive path or local path
-    if PATHS["APP_MODE"] == "office":
-        # Use OneDrive path for office mode
-        full_path = Path(onedrive_path)
-    else:
-        # For home/dev mode, use local documents directory
-        base_path = Path(__file__).parent.parent.parent / "documents"
-        file_name = document.get("file_name", "unknown.pdf")
-        full_path = base_path / str(document_id) / file_name
+    return {**document, "stat": stat_result}
+
+async def get_documents_availability(document_ids: list[int]) -> dict[str, dict[str, Any]]:
+    """
+    Check which documents can be opened, in one call.
     
-    # Check if file exists
-    if not full_path.exists():
-        return None
+    Args:
+        document_ids: Document IDs (e.g. the attachmentIds on a history page)
+        
+    Returns: Dictionary keyed by document ID string with availability,
+        file name, size and last-modified time
+    """
+    resolved = await resolve_documents(document_ids)
     
-    return full_path
+    availability = {}
+    for document_id, document in resolved.items():
+        if document is None:
+            availability[str(document_id)] = {"available": False}
+            continue
+        
+        availability[str(document_id)] = {
+            "available": True,
+            "fileName": document["file_name"],
+            "size": document["stat"].st_size,
+            "lastModified": datetime.fromtimestamp(document["stat"].st_mtime, timezone.utc).isoformat()
+        }
+    
+    return availability
+
+async def get_document_path(document_id: int) -> Optional[Path]:
+    """
+    Get the complete file system path for a document.
+    
+    Args:
+        document_id: Document ID in the database
+        
+    Returns: Full filesystem path to the document or None if not found
+    """
+    document = await get_document_file(document_id)
+    return document["path"] if document else None
 
 async def store_document(
     file: UploadFile,
@@ -66,90 +207,101 @@ async def store_document(
     """
     Store a document and create metadata record.
     
+    The contents are kept once per SHA-256 in the document store, so the
+    same statement uploaded for several clients is stored a single time.
+    
     Args:
         file: Uploaded file object
         client_id: Client ID
         description: Optional document description
         
     Returns: Document ID of the newly created record or None on failure
+    
+    Raises: UploadTooLargeError if the file exceeds DOCUMENT_MAX_UPLOAD_MB
     """
-    # Generate file paths
     original_filename = file.filename or "unnamed_file"
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_filename = f"{timestamp}_{original_filename}"
-    
-    # Determine the appropriate storage location
-    if PATHS["APP_MODE"] == "office":
-        # Get OneDrive folder path from client record
-        client_query = """
-        SELECT onedrive_folder_path
-        FROM clients
-        WHERE client_id = ?
-        """
-        client_results = await execute_query(client_query, (client_id,))
-        
-        if not client_results or not client_results[0].get("onedrive_folder_path"):
-            # Fall back to a default path
-            onedrive_folder = PATHS["BASE_PATH"] / "client_documents" / str(client_id)
-        else:
-            onedrive_folder = Path(client_results[0]["onedrive_folder_path"])
-        
-        # Ensure directory exists
-        os.makedirs(onedrive_folder, exist_ok=True)
+    
+    # Create database record in the same transaction as the blob
+    query = """
+    INSERT INTO client_files (
+        client_id, file_name, onedrive_path, description, file_size, content_hash, uploaded_at
+    ) VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    """
+    
+    async def link(conn, relative_path, upload):
+        cursor = await conn.execute(query, (
+            client_id, original_filename, relative_path, description,
+            upload["size"], upload["sha256"]
+        ))
+        file_id = cursor.lastrowid
         
-        file_path = onedrive_folder / safe_filename
-        onedrive_path = str(file_path)
-    else:
-        # For home/dev mode, use local documents directory
-        doc_dir = Path(__file__).parent.parent.parent / "documents" / str(client_id)
-        os.makedirs(doc_dir, exist_ok=True)
+        # Remove payment associations
+        await conn.execute(
+            "DELETE FROM payment_files WHERE file_id = ?",
+            (file_id,)
+        )
         
-        file_path = doc_dir / safe_filename
-        onedrive_path = f"documents/{client_id}/{safe_filename}"
+        return file_id
     
-    # Save the file
     try:
-        with open(file_path, "wb") as buffer:
-            # Read the file in chunks to handle large files
-            contents = await file.read()
-            buffer.write(contents)
+        file_id, _ = await store_upload(file, original_filename, link)
+    except UploadTooLargeError:
+        raise
     except Exception as e:
-        print(f"Error saving file: {str(e)}")
+        print(f"Error storing document: {str(e)}")
         return None
     
-    # Create database record
+    # The ID may have been looked up (and cached as missing) before
+    invalidate_document_path(file_id)
+    response_cache.invalidate(f"client:{client_id}")
+    return file_id
+
+async def store_payment_document(
+    file: UploadFile,
+    payment_data: dict[str, Any]
+) -> tuple[int, int]:
+    """
+    Store a document and create the payment it belongs to.
+    
+    The upload is streamed and hashed before anything is written, then the
+    payment, the document record and their association are inserted in one
+    transaction. An oversized or failed upload leaves no payment behind, so
+    a retry cannot create a duplicate.
+    
+    Args:
+        file: Uploaded file object
+        payment_data: Prepared payment data (see prepare_payment_data)
+        
+    Returns: Tuple of (payment ID, document ID)
+    
+    Raises: UploadTooLargeError if the file exceeds DOCUMENT_MAX_UPLOAD_MB
+    """
+    client_id = payment_data["client_id"]
+    original_filename = file.filename or "unnamed_file"
+    
     query = """
     INSERT INTO client_files (
-        client_id, file_name, onedrive_path, description, uploaded_at
-    ) VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        client_id, file_name, onedrive_path, file_size, content_hash, uploaded_at
+    ) VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
     """
-    params = (client_id, original_filename, onedrive_path, description)
     
-    try:
-        async with get_db_connection() as conn:
-            async with conn.execute("BEGIN") as _:
-                try:
-                    # Insert the file record
-                    file_id = await execute_write_query(query, params)
-                    
-                    # Remove payment associations
-                    await conn.execute(
-                        "DELETE FROM payment_files WHERE file_id = ?",
-                        (file_id,)
-                    )
-                    
-                    await conn.commit()
-                    return file_id
-                except Exception as e:
-                    await conn.rollback()
-                    # If database insert fails, delete the file to prevent orphaned files
-                    if file_path.exists():
-                        os.remove(file_path)
-                    print(f"Error creating file record: {str(e)}")
-                    return None
-    except Exception as e:
-        print(f"Error accessing database: {str(e)}")
-        return None
+    async def link(conn, relative_path, upload):
+        payment_id = await insert_payment(conn, payment_data)
+        cursor = await conn.execute(query, (
+            client_id, original_filename, relative_path, upload["size"], upload["sha256"]
+        ))
+        file_id = cursor.lastrowid
+        await conn.execute(
+            "INSERT INTO payment_files (payment_id, file_id, linked_at) VALUES (?, ?, CURRENT_TIMESTAMP)",
+            (payment_id, file_id)
+        )
+        return payment_id, file_id
+    
+    (payment_id, file_id), _ = await store_upload(file, original_filename, link)
+    
+    invalidate_payment_caches(client_id)
+    invalidate_document_path(file_id)
+    return payment_id, file_id
 
 async def associate_document_with_payment(file_id: int, payment_id: int) -> bool:
     """
@@ -177,19 +329,22 @@ async def associate_document_with_payment(file_id: int, payment_id: int) -> bool
     VALUES (?, ?, CURRENT_TIMESTAMP)
     """
     
+    async def job(conn):
+        await conn.execute(query, (payment_id, file_id))
+        
+        cursor = await conn.execute(
+            "SELECT client_id FROM client_files WHERE file_id = ?",
+            (file_id,)
+        )
+        return await cursor.fetchone()
+    
     try:
-        async with get_db_connection() as conn:
-            async with conn.execute("BEGIN") as _:
-                try:
-                    await execute_write_query(query, (payment_id, file_id))
-                    await conn.commit()
-                    return True
-                except Exception as e:
-                    await conn.rollback()
-                    print(f"Error associating document: {str(e)}")
-                    return False
+        document = await submit_write(job)
+        if document:
+            response_cache.invalidate(f"client:{document['client_id']}")
+        return True
     except Exception as e:
-        print(f"Error accessing database: {str(e)}")
+        print(f"Error associating document: {str(e)}")
         return False
 
 async def get_payment_documents(payment_id: int) -> list[dict[str, Any]]:
@@ -231,33 +386,40 @@ async def delete_document(document_id: int) -> bool:
     Returns: Boolean indicating success
     """
     # First, get the document details
-    document_path = await get_document_path(document_id)
+    stored = await get_document_file(document_id)
     
-    if not document_path:
+    if not stored:
         return False  # Document not found
     
-    async with get_db_connection() as conn:
-        async with conn.execute("BEGIN") as _:
-            try:
-                # Remove payment associations
-                await conn.execute(
-                    "DELETE FROM payment_files WHERE file_id = ?",
-                    (document_id,)
-                )
-                
-                # Delete the database record
-                await conn.execute(
-                    "DELETE FROM client_files WHERE file_id = ?",
-                    (document_id,)
-                )
-                
-                # Delete the physical file
-                if document_path.exists():
-                    os.remove(document_path)
-                
-                await conn.commit()
-                return True
-            except Exception as e:
-                await conn.rollback()
-                print(f"Error deleting document: {str(e)}")
-                return False
\ No newline at end of file
+    async def job(conn):
+        # Remove payment associations
+        await conn.execute(
+            "DELETE FROM payment_files WHERE file_id = ?",
+            (document_id,)
+        )
+        
+        # Delete the database record
+        await conn.execute(
+            "DELETE FROM client_files WHERE file_id = ?",
+            (document_id,)
+        )
+    
+    try:
+        await submit_write(job)
+        invalidate_document_path(document_id)
+        response_cache.invalidate(f"client:{stored['client_id']}")
+    except Exception as e:
+        print(f"Error deleting document: {str(e)}")
+        return False
+    
+    # Delete the physical file only once the records are gone. Blobs may be
+    # shared with other documents, so they are removed only when unreferenced
+    try:
+        if stored["content_hash"]:
+            await release_blobs([stored["content_hash"]])
+        else:
+            await run_io(lambda: stored["path"].unlink(missing_ok=True))
+    except OSError as e:
+        print(f"Error deleting document file: {str(e)}")
+    
+    return True
@@ -0,0 +1,343 @@
+# backend/app/services/document_store.py
+"""
+Content-addressed document storage.
+
+Handles:
+- Keeping one stored file (blob) per distinct SHA-256 in DOCUMENT_STORE_PATH
+- Linking client_files rows to blobs through client_files.content_hash
+- Deduplicating documents stored before blobs existed
+- Garbage collection of unreferenced blobs
+"""
+import os
+import time
+import uuid
+import shutil
+import asyncio
+import hashlib
+from pathlib import Path, PureWindowsPath
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional
+from fastapi import UploadFile
+
+from app.core.config import (
+    PATHS,
+    DOCUMENT_MAX_UPLOAD_MB,
+    DOCUMENT_UPLOAD_CHUNK_SIZE,
+    DOCUMENT_IO_WORKERS,
+    DOCUMENT_GC_GRACE_SECONDS
+)
+from app.database.database import execute_query, submit_write
+from app.utils.uploads import save_upload
+
+# Blocking document file I/O (OneDrive folders can be slow) runs here,
+# off the event loop and without starving the default executor
+_io_executor: Optional[ThreadPoolExecutor] = None
+
+# Serializes blob placement + linking against garbage collection, so a blob
+# being reused by an upload cannot be collected between the two steps
+_blob_lock = asyncio.Lock()
+
+TEMP_DIR = "tmp"
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Get the thread pool used for document file I/O."""
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(max_workers=DOCUMENT_IO_WORKERS, thread_name_prefix="document-io")
+    return _io_executor
+
+def shutdown_io_executor() -> None:
+    """Wait for pending document I/O and stop the thread pool."""
+    global _io_executor
+    if _io_executor is not None:
+        _io_executor.shutdown(wait=True)
+        _io_executor = None
+
+async def run_io(fn, *args) -> Any:
+    """Run a blocking file operation on the document I/O thread pool."""
+    return await asyncio.get_running_loop().run_in_executor(get_io_executor(), fn, *args)
+
+def blob_relative_path(content_hash: str, file_name: str) -> str:
+    """
+    Build the store-relative path for a blob.
+
+    Returns: Path like "ab/abcdef....pdf", keeping the original extension
+    """
+    return f"{content_hash[:2]}/{content_hash}{Path(file_name).suffix.lower()}"
+
+def blob_path(relative_path: str) -> Path:
+    """Get the absolute path of a blob from its store-relative path."""
+    return PATHS["DOCUMENT_STORE_PATH"] / relative_path
+
+def resolve_stored_path(onedrive_path: str) -> Path:
+    """
+    Resolve a client_files.onedrive_path written before blobs existed.
+
+    Stored paths may use Windows separators and may be relative to
+    DOCUMENTS_ROOT.
+
+    Returns: Absolute filesystem path
+    """
+    path = Path(PureWindowsPath(onedrive_path).as_posix()) if "\\" in onedrive_path else Path(onedrive_path)
+    return path if path.is_absolute() else PATHS["DOCUMENTS_ROOT"] / path
+
+def _hash_file(path: Path, chunk_size: int = DOCUMENT_UPLOAD_CHUNK_SIZE) -> tuple[str, int]:
+    hasher = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            hasher.update(chunk)
+            size += len(chunk)
+    return hasher.hexdigest(), size
+
+def _place(source: Path, destination: Path, copy: bool = False) -> bool:
+    """Move (or copy) a file into the store unless the blob already exists."""
+    if destination.exists():
+        if not copy:
+            os.remove(source)
+        return False
+
+    os.makedirs(destination.parent, exist_ok=True)
+    if copy:
+        temp_path = destination.with_name(f".{destination.name}.{uuid.uuid4().hex[:8]}.part")
+        shutil.copyfile(source, temp_path)
+        os.replace(temp_path, destination)
+    else:
+        os.replace(source, destination)
+    return True
+
+def _unlink(path: Path) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+async def _link_blob(
+    source: Path,
+    content_hash: str,
+    size: int,
+    file_name: str,
+    link: Optional[Callable[[Any, str], Awaitable[Any]]],
+    copy: bool = False
+) -> tuple[Any, bool]:
+    """
+    Place a file as a blob and record it, together with ``link``, in one write.
+
+    Returns: Tuple of (link result, whether a new blob file was created)
+    """
+    relative_path = blob_relative_path(content_hash, file_name)
+
+    async with _blob_lock:
+        existing = await execute_query(
+            "SELECT blob_path FROM document_blobs WHERE content_hash = ?",
+            (content_hash,)
+        )
+        if existing:
+            relative_path = existing[0]["blob_path"]
+
+        created = await run_io(_place, source, blob_path(relative_path), copy)
+
+        async def job(conn):
+            await conn.execute(
+                "INSERT OR IGNORE INTO document_blobs (content_hash, blob_path, size) VALUES (?, ?, ?)",
+                (content_hash, relative_path, size)
+            )
+            return await link(conn, relative_path) if link else None
+
+        try:
+            result = await submit_write(job)
+        except Exception:
+            if created:
+                await run_io(_unlink, blob_path(relative_path))
+            raise
+
+    return result, created
+
+async def store_upload(
+    file: UploadFile,
+    file_name: str,
+    link: Callable[[Any, str, dict[str, Any]], Awaitable[Any]]
+) -> tuple[Any, dict[str, Any]]:
+    """
+    Stream an upload into the store and link it to database rows.
+
+    The upload is written and hashed under a temporary name first; identical
+    content already in the store is reused and the new copy discarded.
+
+    Args:
+        file: Uploaded file
+        file_name: Original file name (its extension is kept on the blob)
+        link: Write job receiving (conn, blob_path, upload metrics) that
+            inserts the rows referencing the blob; runs in the same
+            transaction as the blob row
+
+    Returns: Tuple of (link result, upload metrics including sha256 and size)
+
+    Raises: UploadTooLargeError if the file exceeds DOCUMENT_MAX_UPLOAD_MB
+    """
+    temp_dir = PATHS["DOCUMENT_STORE_PATH"] / TEMP_DIR
+    await run_io(lambda: os.makedirs(temp_dir, exist_ok=True))
+    temp_path = temp_dir / f"{uuid.uuid4().hex}.upload"
+
+    upload = await save_upload(
+        file,
+        temp_path,
+        max_bytes=DOCUMENT_MAX_UPLOAD_MB * 1024 * 1024,
+        chunk_size=DOCUMENT_UPLOAD_CHUNK_SIZE,
+        executor=get_io_executor()
+    )
+
+    try:
+        result, created = await _link_blob(
+            temp_path,
+            upload["sha256"],
+            upload["size"],
+            file_name,
+            lambda conn, relative_path: link(conn, relative_path, upload)
+        )
+    except Exception:
+        await run_io(_unlink, temp_path)
+        raise
+
+    upload["deduplicated"] = not created
+    return result, upload
+
+async def release_blobs(content_hashes: list[str]) -> int:
+    """
+    Delete the given blobs if no client_files row references them any more.
+
+    Returns: Number of blobs removed
+    """
+    if not content_hashes:
+        return 0
+
+    placeholders = ", ".join("?" for _ in content_hashes)
+
+    async def job(conn):
+        cursor = await conn.execute(f"""
+            SELECT content_hash, blob_path FROM document_blobs b
+            WHERE content_hash IN ({placeholders})
+            AND NOT EXISTS (SELECT 1 FROM client_files cf WHERE cf.content_hash = b.content_hash)
+        """, tuple(content_hashes))
+        unreferenced = await cursor.fetchall()
+
+        await conn.executemany(
+            "DELETE FROM document_blobs WHERE content_hash = ?",
+            [(row["content_hash"],) for row in unreferenced]
+        )
+        return [row["blob_path"] for row in unreferenced]
+
+    async with _blob_lock:
+        removed = await submit_write(job)
+        for relative_path in removed:
+            await run_io(_unlink, blob_path(relative_path))
+
+    return len(removed)
+
+def _untracked_files(root: Path, tracked: set[str], older_than: float) -> list[Path]:
+    stale = []
+    if not root.exists():
+        return stale
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = Path(dirpath) / name
+            relative_path = path.relative_to(root).as_posix()
+            if relative_path not in tracked and path.stat().st_mtime < older_than:
+                stale.append(path)
+    return stale
+
+async def collect_garbage(grace_seconds: int = DOCUMENT_GC_GRACE_SECONDS) -> dict[str, Any]:
+    """
+    Remove unreferenced blobs and stray files from the document store.
+
+    Stray files (interrupted uploads, blobs whose row was never committed)
+    are only removed once they are older than ``grace_seconds``.
+
+    Returns: Dictionary with the number of blobs and stray files removed
+    """
+    rows = await execute_query("""
+        SELECT content_hash FROM document_blobs b
+        WHERE NOT EXISTS (SELECT 1 FROM client_files cf WHERE cf.content_hash = b.content_hash)
+    """, raw=True)
+    # release_blobs re-checks references inside its own write
+    blobs_removed = await release_blobs([row[0] for row in rows])
+
+    async with _blob_lock:
+        rows = await execute_query("SELECT blob_path FROM document_blobs", raw=True)
+        tracked = {row[0] for row in rows}
+        stray = await run_io(
+            _untracked_files,
+            PATHS["DOCUMENT_STORE_PATH"],
+            tracked,
+            time.time() - grace_seconds
+        )
+        for path in stray:
+            await run_io(_unlink, path)
+
+    return {"blobsRemoved": blobs_removed, "strayFilesRemoved": len(stray)}
+
+async def dedupe_documents(prune: bool = False) -> dict[str, Any]:
+    """
+    Move documents stored before blobs existed into the content-addressed store.
+
+    Every client_files row without a blob is hashed from its onedrive_path,
+    copied into the store once per distinct hash and linked by content_hash.
+
+    Args:
+        prune: Also delete the original files once they are linked; their
+            rows' onedrive_path is rewritten to the blob path first
+
+    Returns: Dictionary report of rows linked, files missing and bytes saved
+    """
+    rows = await execute_query("""
+        SELECT cf.file_id, cf.file_name, cf.onedrive_path
+        FROM client_files cf
+        LEFT JOIN document_blobs b ON cf.content_hash = b.content_hash
+        WHERE b.content_hash IS NULL
+        ORDER BY cf.file_id
+    """)
+
+    report = {
+        "scanned": len(rows),
+        "linked": 0,
+        "blobsCreated": 0,
+        "missing": [],
+        "originalBytes": 0,
+        "storedBytes": 0,
+        "pruned": 0,
+    }
+    linked_sources = set()
+
+    for row in rows:
+        source = resolve_stored_path(row["onedrive_path"])
+        if not await run_io(source.is_file):
+            report["missing"].append(row["file_id"])
+            continue
+
+        content_hash, size = await run_io(_hash_file, source)
+
+        async def link(conn, relative_path, file_id=row["file_id"], content_hash=content_hash, size=size):
+            # When pruning, the original is about to go; point the row at the
+            # blob the way new uploads do
+            await conn.execute(
+                "UPDATE client_files SET content_hash = ?, file_size = ?, onedrive_path = COALESCE(?, onedrive_path) "
+                "WHERE file_id = ?",
+                (content_hash, size, relative_path if prune else None, file_id)
+            )
+
+        _, created = await _link_blob(source, content_hash, size, row["file_name"], link, copy=True)
+
+        report["linked"] += 1
+        report["originalBytes"] += size
+        linked_sources.add(source)
+        if created:
+            report["blobsCreated"] += 1
+            report["storedBytes"] += size
+
+    # Originals are removed only after every row sharing them is linked
+    if prune:
+        for source in linked_sources:
+            await run_io(_unlink, source)
+            report["pruned"] += 1
+
+    return report
@@ -0,0 +1,185 @@
+# backend/app/services/fee_service.py
+"""
+Expected fee estimates.
+
+Handles:
+- Caching each client's active contract_rate_display row in memory
+- Estimating the expected fee for an AUM and period range
+- Batch estimates over many clients with one query for cache misses
+
+The payment form asks for an estimate on every keystroke, so a warm
+estimate is pure arithmetic on cached rows with no database round trip.
+"""
+from typing import Any, Optional
+
+from app.core.config import FEE_STRUCTURE_CACHE_SIZE, FEE_STRUCTURE_CACHE_TTL
+from app.database.database import execute_query
+from app.services.payment_service import fee_for_periods
+from app.utils.cache import ResponseCache
+from app.utils.enums import FeeType, PaymentSchedule
+from app.utils.format import is_period, period_index
+
+# Active contract rate rows for a set of clients
+FEE_STRUCTURES_QUERY = """
+SELECT crd.*
+FROM contract_rate_display crd
+JOIN contracts c ON c.contract_id = crd.contract_id
+WHERE c.client_id IN ({placeholders}) AND c.valid_to IS NULL
+"""
+
+# ("client", client_id) -> active contract_id (None if the client has none)
+# ("contract", contract_id) -> contract_rate_display row
+#
+# Contracts are only edited outside the app, so no write path can invalidate
+# these entries: FEE_STRUCTURE_CACHE_TTL is the only bound on how long an
+# estimate can use a superseded rate. Checking the data version instead
+# would cost a query per estimate.
+fee_structures = ResponseCache(maxsize=FEE_STRUCTURE_CACHE_SIZE, ttl=FEE_STRUCTURE_CACHE_TTL)
+
+def _cached_structure(client_id: int) -> tuple[bool, Optional[dict[str, Any]]]:
+    hit, contract_id = fee_structures.get(("client", client_id))
+    if not hit:
+        return False, None
+    if contract_id is None:
+        return True, None
+    return fee_structures.get(("contract", contract_id))
+
+async def get_fee_structures(client_ids: list[int]) -> dict[int, Optional[dict[str, Any]]]:
+    """
+    Get the active contract rate rows for several clients.
+
+    Cached clients are answered from memory; the rest are loaded together in
+    one query and cached, including clients without an active contract.
+
+    Args:
+        client_ids: Client IDs
+
+    Returns: Dictionary mapping client ID to its contract_rate_display row, or None
+    """
+    structures = {}
+    missing = []
+    for client_id in dict.fromkeys(client_ids):
+        hit, structure = _cached_structure(client_id)
+        if hit:
+            structures[client_id] = structure
+        else:
+            missing.append(client_id)
+
+    if not missing:
+        return structures
+
+    query = FEE_STRUCTURES_QUERY.format(placeholders=", ".join("?" for _ in missing))
+    rows = await execute_query(query, tuple(missing))
+    loaded = {row["client_id"]: row for row in rows}
+
+    for client_id in missing:
+        row = loaded.get(client_id)
+        tags = [f"client:{client_id}"]
+        if row:
+            fee_structures.set(("contract", row["contract_id"]), row, tags)
+        fee_structures.set(("client", client_id), row["contract_id"] if row else None, tags)
+        structures[client_id] = row
+
+    return structures
+
+def estimate_fee(
+    structure: dict[str, Any],
+    total_assets: Optional[float] = None,
+    start_period: Optional[str] = None,
+    end_period: Optional[str] = None
+) -> dict[str, Any]:
+    """
+    Estimate the expected fee under a contract.
+
+    Args:
+        structure: contract_rate_display row
+        total_assets: AUM for the payment (required for percentage fees)
+        start_period: First period covered, e.g. "Jan 2024" or "Q1 2024"
+            (omit for a single period)
+        end_period: Last period covered (defaults to start_period)
+
+    Returns: Dictionary with the contract's fee structure, the number of
+        periods and expectedFee (None if a percentage fee has no AUM)
+
+    Raises: ValueError if a period is malformed or the range is reversed
+    """
+    payment_schedule = (structure.get("payment_schedule") or PaymentSchedule.MONTHLY).lower()
+    fee_type = structure.get("fee_type")
+    rate = structure.get("percent_rate") if fee_type == FeeType.PERCENTAGE else structure.get("flat_rate")
+
+    num_periods = 1
+    if start_period:
+        end_period = end_period or start_period
+        for period in (start_period, end_period):
+            if not is_period(period, payment_schedule):
+                expected = "Jan 2024" if payment_schedule == PaymentSchedule.MONTHLY else "Q1 2024"
+                raise ValueError(f"Invalid period \"{period}\" for a {payment_schedule} schedule (expected e.g. \"{expected}\")")
+        num_periods = period_index(end_period, payment_schedule) - period_index(start_period, payment_schedule) + 1
+        if num_periods < 1:
+            raise ValueError("end_period is before start_period")
+
+    if fee_type == FeeType.PERCENTAGE and total_assets is None:
+        expected_fee = None
+    else:
+        expected_fee = fee_for_periods({"feeType": fee_type, "rate": rate or 0.0}, total_assets, num_periods)
+
+    return {
+        "contractId": structure["contract_id"],
+        "feeType": fee_type,
+        "rate": rate,
+        "paymentSchedule": payment_schedule,
+        "periods": num_periods,
+        "expectedFee": expected_fee,
+    }
+
+async def get_expected_fee(
+    client_id: int,
+    total_assets: Optional[float] = None,
+    start_period: Optional[str] = None,
+    end_period: Optional[str] = None
+) -> Optional[dict[str, Any]]:
+    """
+    Estimate the expected fee for one client.
+
+    Returns: Estimate dictionary (see estimate_fee), or None if the client has
+        no active contract
+
+    Raises: ValueError if a period is malformed or the range is reversed
+    """
+    structure = (await get_fee_structures([client_id]))[client_id]
+    if structure is None:
+        return None
+    return {"clientId": client_id, **estimate_fee(structure, total_assets, start_period, end_period)}
+
+async def get_expected_fees(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Estimate expected fees for many (client, AUM, period range) items.
+
+    Args:
+        items: Dictionaries with client_id and optional total_assets,
+            start_period and end_period
+
+    Returns: One estimate per item, in order; items that cannot be estimated
+        carry an error instead
+    """
+    structures = await get_fee_structures([item["client_id"] for item in items])
+
+    results = []
+    for item in items:
+        client_id = item["client_id"]
+        structure = structures.get(client_id)
+        if structure is None:
+            results.append({"clientId": client_id, "error": "No active contract"})
+            continue
+        try:
+            estimate = estimate_fee(
+                structure,
+                item.get("total_assets"),
+                item.get("start_period"),
+                item.get("end_period")
+            )
+            results.append({"clientId": client_id, **estimate})
+        except ValueError as e:
+            results.append({"clientId": client_id, "error": str(e)})
+
+    return results
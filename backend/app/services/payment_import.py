@@ -0,0 +1,222 @@
+# backend/app/services/payment_import.py
+"""
+Bulk payment import.
+
+Handles:
+- Streaming payment rows from CSV or NDJSON uploads
+- Resolving each client's contract and schedule once per import
+- Validating and preparing every row before anything is written
+- Inserting all valid payments in a single transaction
+"""
+from typing import Any
+from fastapi import UploadFile
+
+from app.core.config import PAYMENT_IMPORT_MAX_ROWS, PAYMENT_IMPORT_BATCH_SIZE
+from app.database.database import execute_query
+from app.database.models import create_payments
+from app.services.payment_service import (
+    parse_frontend_period,
+    parse_multi_period,
+    count_periods,
+    fee_for_periods,
+    validate_payment_data
+)
+from app.utils.enums import PaymentSchedule
+from app.utils.format import is_period
+from app.utils.imports import iter_import_rows
+
+# Client fee structure and active contract, fetched once for every client in a file
+IMPORT_CLIENTS_QUERY = """
+SELECT
+    cs.id,
+    cs.feeType,
+    cs.rate,
+    cs.paymentSchedule,
+    c.contract_id
+FROM
+    client_summary cs
+LEFT JOIN
+    contracts c ON c.client_id = cs.id AND c.valid_to IS NULL
+WHERE cs.id IN ({placeholders})
+"""
+
+INTEGER_FIELDS = ("client_id", "contract_id")
+NUMERIC_FIELDS = ("total_assets", "expected_fee", "actual_fee")
+
+class ImportTooLargeError(ValueError):
+    """Raised when an import file has more rows than PAYMENT_IMPORT_MAX_ROWS."""
+
+def _coerce_row(row: dict[str, Any]) -> dict[str, Any]:
+    """
+    Convert CSV text fields to the types the payment service expects.
+
+    Values that cannot be converted are left as they are, so validation
+    reports them.
+
+    Returns: Payment data dictionary
+    """
+    payment = dict(row)
+
+    for field in INTEGER_FIELDS:
+        value = payment.get(field)
+        if isinstance(value, str):
+            try:
+                payment[field] = int(value)
+            except ValueError:
+                pass
+
+    for field in NUMERIC_FIELDS:
+        value = payment.get(field)
+        if isinstance(value, str):
+            try:
+                number = float(value.replace(",", "").lstrip("$"))
+                payment[field] = int(number) if field == "total_assets" and number.is_integer() else number
+            except ValueError:
+                pass
+
+    multi = payment.get("is_multi_period")
+    if isinstance(multi, str):
+        payment["is_multi_period"] = multi.strip().lower() in ("1", "true", "yes", "y")
+
+    return payment
+
+async def _load_clients(client_ids: set[int]) -> dict[int, dict[str, Any]]:
+    """
+    Get the fee structure and active contract for a set of clients in one query.
+
+    Returns: Dictionary mapping client ID to client row
+    """
+    if not client_ids:
+        return {}
+
+    query = IMPORT_CLIENTS_QUERY.format(placeholders=", ".join("?" for _ in client_ids))
+    clients = await execute_query(query, tuple(client_ids))
+    return {client["id"]: client for client in clients}
+
+async def _prepare_row(payment: dict[str, Any], client: dict[str, Any]) -> dict[str, Any]:
+    """
+    Resolve period fields and the expected fee for a validated row.
+
+    Mirrors prepare_payment_data, using the client row loaded for the import
+    instead of fetching client details per payment.
+
+    Returns: Payment data ready for create_payments
+
+    Raises: ValueError if the period is missing or malformed
+    """
+    payment_schedule = (client.get("paymentSchedule") or "monthly").lower()
+
+    if payment.get("is_multi_period"):
+        if not payment.get("start_period") or not payment.get("end_period"):
+            raise ValueError("start_period and end_period are required for multi-period payments")
+    elif not payment.get("period"):
+        raise ValueError("period is required for single-period payments")
+
+    periods = [payment["start_period"], payment["end_period"]] if payment.get("is_multi_period") else [payment["period"]]
+    if not all(is_period(period, payment_schedule) for period in periods):
+        expected = "Jan 2024" if payment_schedule == PaymentSchedule.MONTHLY else "Q1 2024"
+        raise ValueError(f"Invalid period for a {payment_schedule} schedule (expected e.g. \"{expected}\")")
+
+    if payment.get("is_multi_period"):
+        period_fields = await parse_multi_period(payment["start_period"], payment["end_period"], payment_schedule)
+    else:
+        period_fields = await parse_frontend_period(payment["period"], payment_schedule)
+
+    result = {**payment, **period_fields, "payment_schedule": payment_schedule}
+
+    # Calculate expected fee if not provided
+    if result.get("expected_fee") is None:
+        result["expected_fee"] = fee_for_periods(client, result.get("total_assets"), await count_periods(result))
+
+    return result
+
+async def import_payments(file: UploadFile, format: str, dry_run: bool = False) -> dict[str, Any]:
+    """
+    Import payments for many clients from a CSV or NDJSON file.
+
+    Each row carries the same fields as a single payment (client_id,
+    received_date, actual_fee, period or start_period/end_period, ...);
+    contract_id defaults to the client's active contract and expected_fee to
+    the fee calculated from the contract. Invalid rows are reported and
+    skipped, and all valid rows are inserted together.
+
+    Args:
+        file: Uploaded CSV or NDJSON file
+        format: "csv" or "ndjson"
+        dry_run: Validate only, without inserting anything
+
+    Returns: Import report with counts and a result for every row
+
+    Raises: ImportTooLargeError if the file exceeds PAYMENT_IMPORT_MAX_ROWS
+    """
+    # Pass 1: stream and type the rows
+    parsed = []
+    async for batch in iter_import_rows(file, format, PAYMENT_IMPORT_BATCH_SIZE):
+        parsed.extend(batch)
+        if len(parsed) > PAYMENT_IMPORT_MAX_ROWS:
+            raise ImportTooLargeError(f"Import files are limited to {PAYMENT_IMPORT_MAX_ROWS} rows")
+
+    results = []
+    payments = []
+    for line, row, error in parsed:
+        payment = _coerce_row(row) if row else None
+        results.append({
+            "line": line,
+            "status": "invalid" if error else "pending",
+            "clientId": payment.get("client_id") if payment else None,
+            "paymentId": None,
+            "error": error
+        })
+        payments.append(payment)
+
+    # Pass 2: resolve every referenced client once
+    clients = await _load_clients({
+        payment["client_id"] for payment in payments
+        if payment and isinstance(payment.get("client_id"), int)
+    })
+
+    # Pass 3: validate and prepare
+    prepared = []
+    prepared_results = []
+    for result, payment in zip(results, payments):
+        if payment is None:
+            continue
+
+        client = clients.get(payment.get("client_id"))
+        if client and payment.get("contract_id") is None:
+            payment["contract_id"] = client["contract_id"]
+
+        if client is None and isinstance(payment.get("client_id"), int):
+            is_valid, error_message = False, f"Client {payment['client_id']} not found"
+        else:
+            is_valid, error_message = await validate_payment_data(payment)
+
+        if is_valid:
+            try:
+                prepared.append(await _prepare_row(payment, client))
+                prepared_results.append(result)
+                result["status"] = "valid"
+                continue
+            except ValueError as e:
+                error_message = str(e)
+
+        result["status"] = "invalid"
+        result["error"] = error_message
+
+    # Pass 4: one transaction for every valid row
+    if prepared and not dry_run:
+        payment_ids = await create_payments(prepared)
+        for result, payment_id in zip(prepared_results, payment_ids):
+            result["status"] = "created"
+            result["paymentId"] = payment_id
+
+    invalid = sum(1 for result in results if result["status"] == "invalid")
+    return {
+        "format": format,
+        "dryRun": dry_run,
+        "total": len(results),
+        "valid": len(prepared),
+        "invalid": invalid,
+        "created": 0 if dry_run else len(prepared),
+        "rows": results
+    }
@@ -124,13 +124,26 @@ async def calculate_expected_fee(client_id: int, payment_data: dict[str, Any]) -
     if not client:
         return 0.0
     
+    # Count number of periods covered by this payment
+    num_periods = await count_periods(payment_data)
+    
+    return fee_for_periods(client, payment_data.get("total_assets", 0), num_periods)
+
+def fee_for_periods(client: dict[str, Any], total_assets: Optional[float], num_periods: int) -> float:
+    """
+    Calculate the expected fee from a client's fee structure.
+    
+    Args:
+        client: Client details with feeType and rate
+        total_assets: Assets under management for the payment
+        num_periods: Number of periods the payment covers
+        
+    Returns: Expected fee as a decimal value
+    """
     # Extract fee structure
     fee_type = client.get("feeType", "")
     rate = client.get("rate", 0.0)
-    total_assets = payment_data.get("total_assets", 0)
-    
-    # Count number of periods covered by this payment
-    num_periods = await count_periods(payment_data)
+    total_assets = total_assets or 0
     
     # Calculate expected fee based on fee type
     if fee_type == FeeType.PERCENTAGE:
@@ -144,6 +157,25 @@ async def calculate_expected_fee(client_id: int, payment_data: dict[str, Any]) -
     
     return round(expected_fee, 2)
 
+def payment_variance(expected_fee: Any, actual_fee: Any) -> tuple[Optional[float], Optional[float]]:
+    """
+    Calculate a payment's variance columns, written with the payment row.
+    
+    Matches the retired payments_update_variance_* triggers: the variance is
+    actual minus expected, and the percentage is relative to a nonzero
+    expected fee.
+    
+    Returns: Tuple of (variance, variance_percent), each None when it cannot
+        be calculated
+    """
+    if expected_fee is None or actual_fee is None:
+        return None, None
+    
+    variance = float(actual_fee) - float(expected_fee)
+    if float(expected_fee) == 0:
+        return variance, None
+    return variance, variance / float(expected_fee) * 100
+
 async def validate_payment_data(payment_data: dict[str, Any]) -> tuple[bool, Optional[str]]:
     """
     Validate payment data before creation/update.
@@ -0,0 +1,196 @@
+# backend/app/services/preview_service.py
+"""
+Document preview generation.
+
+Handles:
+- Rendering first-page PNG previews on a background process pool
+- Caching previews on disk, keyed by the document's content hash
+- Backfilling previews for documents stored before previews existed
+"""
+import time
+import asyncio
+import logging
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional
+
+from app.core.config import PREVIEW_CACHE_PATH, PREVIEW_WORKERS, PREVIEW_WIDTH
+from app.database.database import execute_query
+from app.services.document_service import get_document_file
+from app.utils.previews import can_render, render_preview
+
+logger = logging.getLogger("app.previews")
+
+# Rendering is CPU-bound, so it runs in separate processes; spawn avoids
+# forking a process that is running an event loop and worker threads
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+# Preview key -> render in progress, so concurrent requests share one render
+_in_flight: dict[str, asyncio.Future] = {}
+
+# Keeps fire-and-forget render tasks alive until they finish
+_background: set[asyncio.Task] = set()
+
+class PreviewStats:
+    """Preview render counts and timings."""
+
+    def __init__(self):
+        self.rendered = 0
+        self.failed = 0
+        self.total_seconds = 0.0
+
+    def stats(self) -> dict[str, Any]:
+        """Return render counts and the average render time."""
+        return {
+            "rendered": self.rendered,
+            "failed": self.failed,
+            "inFlight": len(_in_flight),
+            "avgRenderMs": round(self.total_seconds / self.rendered * 1000, 1) if self.rendered else 0.0,
+        }
+
+preview_stats = PreviewStats()
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Get the process pool used for preview rendering."""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=PREVIEW_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _process_pool
+
+def shutdown_preview_pool() -> None:
+    """Stop the preview process pool, abandoning queued renders."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+def preview_key(document: dict[str, Any]) -> str:
+    """
+    Build the cache key for a resolved document's preview.
+
+    Documents in the content-addressed store are keyed by their hash, so a
+    statement shared by several clients is rendered once. Older files are
+    keyed by id, modification time and size.
+
+    Returns: Cache key string
+    """
+    if document["content_hash"]:
+        return document["content_hash"]
+    stat_result = document["stat"]
+    return f"file-{document['file_id']}-{stat_result.st_mtime_ns}-{stat_result.st_size}"
+
+def preview_path(key: str) -> Path:
+    """Get the on-disk location of a cached preview."""
+    return PREVIEW_CACHE_PATH / key[:2] / f"{key}.png"
+
+async def _render(document: dict[str, Any], destination: Path) -> None:
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    try:
+        await loop.run_in_executor(
+            get_process_pool(),
+            render_preview,
+            str(document["path"]),
+            str(destination),
+            PREVIEW_WIDTH
+        )
+    except Exception as e:
+        preview_stats.failed += 1
+        logger.warning(f"Preview failed for document {document['file_id']}: {str(e)}")
+        raise
+    preview_stats.rendered += 1
+    preview_stats.total_seconds += time.perf_counter() - start
+
+async def ensure_preview(document: dict[str, Any]) -> Optional[Path]:
+    """
+    Get a document's preview, rendering it if it is not cached yet.
+
+    Args:
+        document: Resolved document (see document_service.get_document_file)
+
+    Returns: Path to the PNG preview, or None if the document type cannot be
+        previewed or rendering failed
+    """
+    if not can_render(document["file_name"]):
+        return None
+
+    key = preview_key(document)
+    destination = preview_path(key)
+    if await asyncio.to_thread(destination.is_file):
+        return destination
+
+    pending = _in_flight.get(key)
+    if pending is None:
+        pending = asyncio.ensure_future(_render(document, destination))
+        _in_flight[key] = pending
+        pending.add_done_callback(lambda _: _in_flight.pop(key, None))
+
+    try:
+        await asyncio.shield(pending)
+    except Exception:
+        return None
+    return destination
+
+def schedule_preview(document_id: int) -> None:
+    """Render a document's preview in the background (e.g. right after upload)."""
+    async def render() -> None:
+        document = await get_document_file(document_id)
+        if document:
+            await ensure_preview(document)
+
+    task = asyncio.create_task(render())
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+async def get_document_preview(document_id: int) -> Optional[Path]:
+    """
+    Get the preview image for a document.
+
+    Args:
+        document_id: Document ID
+
+    Returns: Path to the PNG preview, or None if the document does not exist
+        or cannot be previewed
+    """
+    document = await get_document_file(document_id)
+    if not document:
+        return None
+    return await ensure_preview(document)
+
+async def backfill_previews(concurrency: int = PREVIEW_WORKERS * 2) -> dict[str, int]:
+    """
+    Render previews for every stored document that does not have one yet.
+
+    Args:
+        concurrency: Documents processed at a time
+
+    Returns: Dictionary with counts of rendered, cached, unsupported,
+        missing and failed documents
+    """
+    rows = await execute_query("SELECT file_id FROM client_files ORDER BY file_id", raw=True)
+    report = {"documents": len(rows), "rendered": 0, "cached": 0, "unsupported": 0, "missing": 0, "failed": 0}
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def backfill(document_id: int) -> None:
+        async with semaphore:
+            document = await get_document_file(document_id)
+            if not document:
+                report["missing"] += 1
+                return
+            if not can_render(document["file_name"]):
+                report["unsupported"] += 1
+                return
+            if await asyncio.to_thread(preview_path(preview_key(document)).is_file):
+                report["cached"] += 1
+                return
+            if await ensure_preview(document):
+                report["rendered"] += 1
+            else:
+                report["failed"] += 1
+
+    await asyncio.gather(*(backfill(row[0]) for row in rows))
+    return report
@@ -0,0 +1,225 @@
+"""
+In-process response cache.
+
+Provides a TTL + LRU cache for read endpoints, keyed by endpoint and
+parameters, with tag-based invalidation fired from the write path:
+- "clients" / "providers": list and aggregate views
+- "client:{id}": everything derived from one client's data
+
+Also holds the If-None-Match check used for ETag revalidation.
+"""
+import time
+import asyncio
+import functools
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, Optional, Union
+
+from app.utils.unit_of_work import forget, forget_all
+
+TagSpec = Union[Iterable[str], Callable[..., Iterable[str]]]
+
+class ResponseCache:
+    """TTL + LRU cache with tag-based invalidation."""
+
+    def __init__(self, maxsize: int = 512, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+
+        # key -> (expires_at, value, tags)
+        self._entries: OrderedDict = OrderedDict()
+        self._tag_index: dict[str, set] = {}
+
+        # Bumped on every invalidation so in-flight loads can detect staleness
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, maxsize: Optional[int] = None, ttl: Optional[float] = None) -> None:
+        """Apply new size/TTL limits and drop existing entries."""
+        if maxsize is not None:
+            self.maxsize = maxsize
+        if ttl is not None:
+            self.ttl = ttl
+        self.clear()
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        """
+        Look up a key.
+
+        Returns: Tuple of (hit, value)
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+
+        expires_at, value, _ = entry
+        if expires_at <= self._clock():
+            self._remove(key)
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[str] = (), ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        ttl = self.ttl if ttl is None else ttl
+        if self.maxsize <= 0 or ttl <= 0:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        tags = frozenset(tags)
+        self._entries[key] = (self._clock() + ttl, value, tags)
+        for tag in tags:
+            self._tag_index.setdefault(tag, set()).add(key)
+
+        while len(self._entries) > self.maxsize:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def invalidate(self, *tags: str) -> int:
+        """
+        Drop every entry carrying any of the given tags.
+
+        Returns: Number of entries removed
+        """
+        self.generation += 1
+        removed = 0
+        for tag in tags:
+            for key in list(self._tag_index.get(tag, ())):
+                self._remove(key)
+                removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self.generation += 1
+        self._entries.clear()
+        self._tag_index.clear()
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def stats(self) -> dict[str, Any]:
+        """Return size and hit-rate statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+# Shared cache for API read endpoints (sized from config on startup)
+response_cache = ResponseCache()
+
+def cached(
+    namespace: str,
+    tags: TagSpec = (),
+    cache: Optional[ResponseCache] = None,
+    key: Optional[Callable[..., Hashable]] = None
+):
+    """
+    Cache an async endpoint's result by namespace and call arguments.
+
+    Concurrent misses for the same key share a single load. A result is not
+    stored if an invalidation happened while it was being computed.
+
+    Args:
+        namespace: Cache key prefix, usually the route path
+        tags: Invalidation tags, or a callable receiving the endpoint's
+            keyword arguments and returning tags
+        cache: Cache instance (defaults to the shared response_cache)
+        key: Callable receiving the endpoint's keyword arguments and
+            returning the part of the key that varies, for endpoints whose
+            result depends on their arguments only coarsely (defaults to
+            all arguments)
+    """
+    def decorator(fn):
+        in_flight: dict[Hashable, asyncio.Future] = {}
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            target = cache or response_cache
+            parts = key(**kwargs) if key else tuple(sorted(kwargs.items()))
+            entry_key = (namespace, args, parts)
+
+            hit, value = target.get(entry_key)
+            if hit:
+                return value
+
+            pending = in_flight.get(entry_key)
+            if pending is not None:
+                return await asyncio.shield(pending)
+
+            future = asyncio.get_running_loop().create_future()
+            in_flight[entry_key] = future
+            generation = target.generation
+            try:
+                value = await fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+                # Mark retrieved so an unawaited failure is not logged
+                future.exception()
+                raise
+            else:
+                future.set_result(value)
+            finally:
+                in_flight.pop(entry_key, None)
+
+            if target.generation == generation:
+                entry_tags = tags(**kwargs) if callable(tags) else tags
+                target.set(entry_key, value, entry_tags)
+            return value
+
+        return wrapper
+    return decorator
+
+def client_tags(client_id: int) -> list[str]:
+    """Tags affected by a change to one client's payments."""
+    return ["clients", "providers", f"client:{client_id}"]
+
+def client_lookup_keys(client_id: int) -> list[tuple[str, int]]:
+    """Unit-of-work keys for lookups of one client (see app.utils.unit_of_work)."""
+    return [("client", client_id), ("contract", client_id)]
+
+def invalidate_client(client_id: Optional[int]) -> None:
+    """Invalidate cached responses and request-scoped lookups derived from a client's data."""
+    if client_id is None:
+        response_cache.invalidate("clients", "providers")
+        forget_all()
+    else:
+        response_cache.invalidate(*client_tags(client_id))
+        forget(*client_lookup_keys(client_id))
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag using weak comparison.
+
+    Returns: True if any listed tag (or "*") matches
+    """
+    if not if_none_match:
+        return False
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    candidates = [opaque(tag) for tag in if_none_match.split(",")]
+    return "*" in candidates or opaque(etag) in candidates
@@ -105,6 +105,47 @@ def parse_period(period_str: str, payment_schedule: str) -> dict[str, Any]:
     
     return result
 
+def is_period(period_str: Any, payment_schedule: str) -> bool:
+    """
+    Check a period string matches the schedule before parsing it.
+    
+    parse_period is lenient (an unknown month falls back to January), which
+    suits the form's dropdowns but not hand-keyed input.
+    
+    Returns: True for "Jan 2024" style periods on monthly schedules and
+        "Q1 2024" style periods on quarterly schedules
+    """
+    parts = str(period_str).split()
+    if len(parts) != 2 or not parts[1].isdigit():
+        return False
+    if payment_schedule.lower() == PaymentSchedule.MONTHLY:
+        return parts[0] in MONTH_NUMBERS
+    return parts[0] in ("Q1", "Q2", "Q3", "Q4")
+
+def period_index(period_str: str, payment_schedule: str) -> int:
+    """
+    Convert a period string to a sequential integer (months or quarters since year 0).
+    
+    Consecutive periods differ by one, so the number of periods between two
+    is a subtraction. Validate with is_period first.
+    
+    Returns: Period index
+    """
+    label, year = period_str.split()
+    if payment_schedule.lower() == PaymentSchedule.MONTHLY:
+        return int(year) * 12 + MONTH_NUMBERS[label] - 1
+    return int(year) * 4 + int(label[1:]) - 1
+
+def period_label(index: int, payment_schedule: str) -> str:
+    """
+    Convert a period index back to its display form.
+    
+    Returns: Period string like "Jan 2024" or "Q1 2024"
+    """
+    if payment_schedule.lower() == PaymentSchedule.MONTHLY:
+        return format_period(payment_schedule, index % 12 + 1, index // 12)
+    return format_period(payment_schedule, index % 4 + 1, index // 4)
+
 def format_currency(value: Optional[Union[int, float]]) -> Optional[str]:
     """
     Format currency values consistently.
@@ -0,0 +1,89 @@
+# backend/app/utils/imports.py
+"""
+Streaming readers for bulk import files.
+
+Reads CSV or NDJSON uploads row by row from the spooled upload file instead
+of loading the whole body into memory. Parsing runs in batches on a worker
+thread so a large file does not block the event loop.
+"""
+import io
+import csv
+import json
+from pathlib import Path
+from itertools import islice
+from typing import Any, AsyncIterator, Iterator, Optional
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+CSV = "csv"
+NDJSON = "ndjson"
+
+# One parsed line: (line number, row fields or None, parse error or None)
+ImportRow = tuple[int, Optional[dict[str, Any]], Optional[str]]
+
+def detect_format(file_name: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    """
+    Work out whether an upload is CSV or NDJSON.
+
+    Returns: CSV, NDJSON or None if the format is not recognised
+    """
+    extension = Path(file_name or "").suffix.lower()
+    content_type = (content_type or "").split(";")[0].strip().lower()
+
+    if extension in (".ndjson", ".jsonl") or content_type in ("application/x-ndjson", "application/jsonl"):
+        return NDJSON
+    if extension == ".csv" or content_type in ("text/csv", "application/csv"):
+        return CSV
+    return None
+
+def _csv_rows(text: io.TextIOBase) -> Iterator[ImportRow]:
+    reader = csv.DictReader(text)
+    for row in reader:
+        # Blank cells become missing values; stray columns beyond the header are ignored
+        fields = {
+            key.strip(): value.strip() if value and value.strip() else None
+            for key, value in row.items()
+            if key is not None
+        }
+        if any(value is not None for value in fields.values()):
+            yield reader.line_num, fields, None
+
+def _ndjson_rows(text: io.TextIOBase) -> Iterator[ImportRow]:
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Each line must be a JSON object"
+            continue
+        yield line_number, row, None
+
+async def iter_import_rows(file: UploadFile, format: str, batch_size: int = 500) -> AsyncIterator[list[ImportRow]]:
+    """
+    Stream the rows of a CSV or NDJSON upload in batches.
+
+    CSV files need a header row; NDJSON files hold one JSON object per line.
+    Lines that cannot be parsed are yielded with an error instead of stopping
+    the import.
+
+    Args:
+        file: Uploaded file
+        format: CSV or NDJSON
+        batch_size: Rows parsed per worker-thread hop
+
+    Returns: Async iterator of row batches
+    """
+    await file.seek(0)
+    text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    rows = _csv_rows(text) if format == CSV else _ndjson_rows(text)
+
+    try:
+        while batch := await run_in_threadpool(lambda: list(islice(rows, batch_size))):
+            yield batch
+    finally:
+        # Leave the underlying upload open for FastAPI to close
+        text.detach()
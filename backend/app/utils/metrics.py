@@ -0,0 +1,197 @@
+# backend/app/utils/metrics.py
+"""
+Request timing and query instrumentation.
+
+TimingMiddleware (app.api.middleware) makes a RequestTimings current for
+every HTTP request through a context variable. Database connections add the
+time of each SQL statement and fetch and the rows they return, and
+FastJSONResponse adds its render time. When the request finishes the figures
+are reported in a Server-Timing header and observed into per-route
+histograms, which /api/_metrics renders in the Prometheus text format.
+"""
+import time
+import bisect
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+class RequestTimings:
+    """
+    Time and query figures collected while handling one request.
+
+    SQL time is summed per statement, so a request that runs queries
+    concurrently can report more SQL time than wall time.
+    """
+
+    __slots__ = ("started", "statements", "sql_seconds", "rows", "serialize_seconds")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.serialize_seconds = 0.0
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """
+        Format the figures collected so far for a Server-Timing header.
+
+        Returns: Header value with db, serialize and app (time until the
+            response started) entries in milliseconds
+        """
+        return (
+            f'db;dur={self.sql_seconds * 1000:.3f};desc="{self.statements} statements, {self.rows} rows", '
+            f"serialize;dur={self.serialize_seconds * 1000:.3f}, "
+            f"app;dur={self.elapsed() * 1000:.3f}"
+        )
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+def current_timings() -> Optional[RequestTimings]:
+    """
+    Get the timings of the request being handled.
+
+    Returns: RequestTimings, or None outside an instrumented request
+    """
+    return _current_timings.get()
+
+@contextmanager
+def timing_context(timings: Optional[RequestTimings]) -> Iterator[Optional[RequestTimings]]:
+    """
+    Make timings current for the duration of the block.
+
+    Used by the middleware for each request, and by the database writer to
+    charge a queued write job's statements to the request that submitted it.
+    """
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+def record_sql(seconds: float, statements: int = 0, rows: int = 0) -> None:
+    """Add SQL time, executed statements and fetched rows to the current request."""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.statements += statements
+        timings.sql_seconds += seconds
+        timings.rows += rows
+
+def record_serialization(seconds: float) -> None:
+    """Add response render time to the current request."""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.serialize_seconds += seconds
+
+class Histogram:
+    """Prometheus-style histogram with fixed upper bounds."""
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """
+        Returns: (le label, cumulative count) per bucket, ending with +Inf
+        """
+        result, total = [], 0
+        for bound, count in zip((*map(_number, self.buckets), "+Inf"), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+ROWS_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+
+# (metric name, help text, RequestTimings figure, buckets)
+HISTOGRAMS = (
+    ("http_request_duration_seconds", "Request wall time", "total", SECONDS_BUCKETS),
+    ("http_request_sql_seconds", "Time spent executing SQL and fetching rows", "sql_seconds", SECONDS_BUCKETS),
+    ("http_request_sql_statements", "SQL statements executed per request", "statements", COUNT_BUCKETS),
+    ("http_request_sql_rows", "Rows fetched per request", "rows", ROWS_BUCKETS),
+    ("http_request_serialization_seconds", "Time spent rendering JSON responses", "serialize_seconds", SECONDS_BUCKETS),
+)
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(**labels: object) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+class RequestMetrics:
+    """Per-route request histograms and response counters."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self._histograms: dict[tuple[str, str], dict[str, Histogram]] = {}
+        self._responses: dict[tuple[str, str, int], int] = {}
+
+    def observe(self, method: str, route: str, status: int, timings: RequestTimings, total: float) -> None:
+        """
+        Record a finished request.
+
+        Args:
+            method: HTTP method
+            route: Route path template (e.g. /api/clients/{client_id}), so
+                the number of series stays bounded
+            status: Response status code
+            timings: Figures collected during the request
+            total: Request wall time in seconds
+        """
+        histograms = self._histograms.get((method, route))
+        if histograms is None:
+            histograms = self._histograms[(method, route)] = {
+                name: Histogram(buckets) for name, _, _, buckets in HISTOGRAMS
+            }
+        for name, _, figure, _ in HISTOGRAMS:
+            histograms[name].observe(total if figure == "total" else getattr(timings, figure))
+
+        key = (method, route, status)
+        self._responses[key] = self._responses.get(key, 0) + 1
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns: Metrics text, one family per histogram plus http_requests_total
+        """
+        lines = [
+            "# HELP http_requests_total Responses by route and status",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self._responses.items()):
+            lines.append(f"http_requests_total{{{_labels(method=method, route=route, status=status)}}} {count}")
+
+        for name, help_text, _, _ in HISTOGRAMS:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (method, route), histograms in sorted(self._histograms.items()):
+                histogram = histograms[name]
+                labels = _labels(method=method, route=route)
+                for bound, count in histogram.cumulative():
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"{name}_sum{{{labels}}} {_number(histogram.sum)}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+# Shared metrics for all routes
+request_metrics = RequestMetrics()
@@ -0,0 +1,56 @@
+# backend/app/utils/previews.py
+"""
+First-page preview rendering.
+
+Runs inside preview worker processes, so this module must stay importable
+without the application config or database.
+"""
+import os
+import uuid
+from pathlib import Path
+
+try:
+    import pymupdf
+except ImportError:  # pragma: no cover - optional dependency
+    pymupdf = None
+
+# Extensions PyMuPDF can open and render a first page for
+PREVIEW_EXTENSIONS = {".pdf", ".png", ".jpg", ".jpeg"}
+
+def can_render(file_name: str) -> bool:
+    """Check whether a preview can be rendered for a file of this type."""
+    return pymupdf is not None and Path(file_name).suffix.lower() in PREVIEW_EXTENSIONS
+
+def render_preview(source: str, destination: str, width: int) -> int:
+    """
+    Render the first page of a document to a PNG of the given width.
+
+    The image is written under a temporary name and renamed into place, so
+    a preview file is never seen half-written.
+
+    Args:
+        source: Document path
+        destination: PNG path to create
+        width: Target width in pixels
+
+    Returns: Size of the written PNG in bytes
+    """
+    if pymupdf is None:
+        raise RuntimeError("PyMuPDF is not installed")
+
+    with pymupdf.open(source) as document:
+        page = document.load_page(0)
+        scale = width / page.rect.width if page.rect.width else 1.0
+        pixmap = page.get_pixmap(matrix=pymupdf.Matrix(scale, scale), alpha=False)
+
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = destination.with_name(f".{destination.name}.{uuid.uuid4().hex[:8]}.part")
+    try:
+        pixmap.save(str(temp_path), output="png")
+        os.replace(temp_path, destination)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    return destination.stat().st_size
@@ -0,0 +1,114 @@
+# backend/app/utils/unit_of_work.py
+"""
+Request-scoped memoization of database lookups.
+
+A unit of work lives in a context variable for the duration of one request
+(see app.api.dependencies.unit_of_work). While it is active, lookups wrapped
+with memoize() run once per key: the payment write path can ask for the same
+client's details from several service functions and the database is queried
+a single time. Outside a unit of work memoize() simply calls the loader.
+
+Writes drop the affected keys with forget(), so a request never reads back
+its own stale lookups.
+"""
+import asyncio
+import contextlib
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Hashable, Iterator, Optional
+
+class UnitOfWork:
+    """Memoized lookups for one request."""
+
+    def __init__(self):
+        # key -> future of the loaded value, so concurrent lookups share one load
+        self._values: dict[Hashable, asyncio.Future] = {}
+        self.loads = 0
+        self.hits = 0
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Get a memoized value, loading it on first use.
+
+        Returns: The loaded value
+        """
+        future = self._values.get(key)
+        if future is not None:
+            self.hits += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._values[key] = future
+        self.loads += 1
+        try:
+            value = await loader()
+        except BaseException as e:
+            # Failed loads are not memoized; waiters see the same error
+            self._values.pop(key, None)
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else is waiting
+            raise
+        future.set_result(value)
+        return value
+
+    def forget(self, *keys: Hashable) -> None:
+        """Drop memoized values so the next lookup reloads them."""
+        for key in keys:
+            self._values.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every memoized value."""
+        self._values.clear()
+
+_current: ContextVar[Optional[UnitOfWork]] = ContextVar("unit_of_work", default=None)
+
+def current_unit_of_work() -> Optional[UnitOfWork]:
+    """Get the active unit of work, if any."""
+    return _current.get()
+
+@contextlib.contextmanager
+def unit_of_work() -> Iterator[UnitOfWork]:
+    """
+    Activate a unit of work for the enclosed code.
+
+    Nested use reuses the outer unit of work.
+
+    Returns: Context manager yielding the active UnitOfWork
+    """
+    existing = _current.get()
+    if existing is not None:
+        yield existing
+        return
+
+    uow = UnitOfWork()
+    token = _current.set(uow)
+    try:
+        yield uow
+    finally:
+        _current.reset(token)
+
+async def memoize(key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run a lookup once per key within the active unit of work.
+
+    Args:
+        key: Lookup key, e.g. ("client", 12)
+        loader: Coroutine function performing the lookup
+
+    Returns: The (possibly memoized) lookup result
+    """
+    uow = _current.get()
+    if uow is None:
+        return await loader()
+    return await uow.get(key, loader)
+
+def forget(*keys: Hashable) -> None:
+    """Drop keys from the active unit of work (no-op outside one)."""
+    uow = _current.get()
+    if uow is not None:
+        uow.forget(*keys)
+
+def forget_all() -> None:
+    """Drop everything memoized by the active unit of work (no-op outside one)."""
+    uow = _current.get()
+    if uow is not None:
+        uow.clear()
@@ -0,0 +1,140 @@
+# backend/app/utils/uploads.py
+"""
+Streaming upload writer.
+
+Copies an UploadFile to disk in bounded chunks without blocking the event
+loop: every write (and the SHA-256 update for that chunk) runs on a thread
+pool, the file is written under a temporary name and atomically renamed
+into place once complete, and the size limit is enforced as bytes arrive.
+"""
+import os
+import time
+import uuid
+import asyncio
+import hashlib
+from pathlib import Path
+from concurrent.futures import Executor
+from typing import Any, BinaryIO, Optional
+from fastapi import UploadFile
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured maximum size."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"File exceeds the maximum upload size of {max_bytes // (1024 * 1024)} MB")
+        self.max_bytes = max_bytes
+
+class UploadStats:
+    """Upload counts and throughput metrics."""
+
+    def __init__(self):
+        self.uploads = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_bytes = 0
+        self.total_seconds = 0.0
+        self.last: Optional[dict[str, Any]] = None
+
+    def record(self, result: dict[str, Any]) -> None:
+        self.uploads += 1
+        self.total_bytes += result["size"]
+        self.total_seconds += result["seconds"]
+        self.last = result
+
+    def stats(self) -> dict[str, Any]:
+        """Return upload counts and average throughput."""
+        return {
+            "uploads": self.uploads,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "totalBytes": self.total_bytes,
+            "avgMBps": round(self.total_bytes / self.total_seconds / 1_000_000, 2) if self.total_seconds else 0.0,
+            "last": self.last,
+        }
+
+# Shared metrics for document uploads
+upload_stats = UploadStats()
+
+def _write_chunk(handle: BinaryIO, hasher, chunk: bytes) -> None:
+    hasher.update(chunk)
+    handle.write(chunk)
+
+def _finish(handle: BinaryIO, temp_path: Path, destination: Path) -> None:
+    handle.flush()
+    os.fsync(handle.fileno())
+    handle.close()
+    os.replace(temp_path, destination)
+
+def _discard(handle: Optional[BinaryIO], temp_path: Path) -> None:
+    if handle is not None and not handle.closed:
+        handle.close()
+    try:
+        os.remove(temp_path)
+    except FileNotFoundError:
+        pass
+
+async def save_upload(
+    file: UploadFile,
+    destination: Path,
+    max_bytes: int,
+    chunk_size: int = 1024 * 1024,
+    executor: Optional[Executor] = None
+) -> dict[str, Any]:
+    """
+    Stream an upload to ``destination``.
+
+    Args:
+        file: Uploaded file
+        destination: Final path; its directory must exist
+        max_bytes: Reject uploads larger than this
+        chunk_size: Bytes read and written per step
+        executor: Thread pool for blocking file I/O (default loop executor)
+
+    Returns: Dictionary with size, sha256, seconds and MBps
+
+    Raises: UploadTooLargeError if the upload exceeds max_bytes
+    """
+    loop = asyncio.get_running_loop()
+
+    # Reject early when the multipart parser already knows the size
+    if file.size is not None and file.size > max_bytes:
+        upload_stats.rejected += 1
+        raise UploadTooLargeError(max_bytes)
+
+    temp_path = destination.with_name(f".{destination.name}.{uuid.uuid4().hex[:8]}.part")
+    hasher = hashlib.sha256()
+    size = 0
+    handle = None
+    start = time.perf_counter()
+
+    try:
+        handle = await loop.run_in_executor(executor, open, temp_path, "wb")
+
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+
+            size += len(chunk)
+            if size > max_bytes:
+                upload_stats.rejected += 1
+                raise UploadTooLargeError(max_bytes)
+
+            await loop.run_in_executor(executor, _write_chunk, handle, hasher, chunk)
+
+        await loop.run_in_executor(executor, _finish, handle, temp_path, destination)
+    except BaseException as e:
+        if not isinstance(e, UploadTooLargeError):
+            upload_stats.failed += 1
+        await loop.run_in_executor(executor, _discard, handle, temp_path)
+        raise
+
+    seconds = time.perf_counter() - start
+    result = {
+        "size": size,
+        "sha256": hasher.hexdigest(),
+        "seconds": round(seconds, 4),
+        "MBps": round(size / seconds / 1_000_000, 2) if seconds else 0.0,
+    }
+    upload_stats.record(result)
+    return result
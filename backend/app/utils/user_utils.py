@@ -1,13 +1,27 @@
 # user_utils.py
 import os
+import getpass
 import sqlite3
+from functools import lru_cache
 from pathlib import Path
 
-_USERNAME = os.getlogin()
+@lru_cache(maxsize=None)
+def get_username():
+    """
+    Get the login name used for the OneDrive path.
+
+    Resolved on first use rather than at import: os.getlogin() needs a
+    controlling terminal and fails in services, workers and CI, so it falls
+    back to the USER/USERNAME environment variables.
+    """
+    try:
+        return os.getlogin()
+    except OSError:
+        return getpass.getuser()
 
 def get_user_base_path():
     # Updated path to match the actual location without the "401Ks/Current Plans/" part
-    base_path = Path(f"C:/Users/{_USERNAME}/Hohimer Wealth Management/Hohimer Company Portal - Company/Hohimer Team Shared 4-15-19")
+    base_path = Path(f"C:/Users/{get_username()}/Hohimer Wealth Management/Hohimer Company Portal - Company/Hohimer Team Shared 4-15-19")
     return base_path
 
 def validate_db_path(db_path):
@@ -0,0 +1,110 @@
+"""
+JSON response serialization benchmark.
+
+Renders a synthetic /api/clients/data payload, shaped like the real one,
+with FastAPI's default path (jsonable_encoder + JSONResponse) and with
+FastJSONResponse from app.api.responses, at 1x, 10x and 100x the current
+client count.
+
+Run from the backend directory:
+    python -m benchmarks.bench_json_response [clients]
+"""
+import sys
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api import responses
+from app.api.responses import FastJSONResponse
+
+CURRENT_CLIENTS = 29
+PROVIDERS = 12
+HISTORY_PER_CLIENT = 10
+MISSING_PER_CLIENT = 3
+
+def build_payload(clients: int) -> dict:
+    """Build a frontend data structure for the given number of clients."""
+    client_list = []
+    client_details = {}
+    payment_history = {}
+
+    for client_id in range(1, clients + 1):
+        provider_id = client_id % PROVIDERS + 1
+        client_list.append({
+            "id": client_id, "name": f"Client {client_id}", "providerId": provider_id,
+            "providerName": f"Provider {provider_id}", "contact": "Primary Contact",
+            "participants": 18, "clientSince": "2020-07-31", "status": "Due",
+        })
+        client_details[str(client_id)] = {
+            "id": client_id, "name": f"Client {client_id}", "providerId": provider_id,
+            "providerName": f"Provider {provider_id}", "participants": 18,
+            "clientSince": "2020-07-31", "feeType": "percentage", "rate": 0.0007,
+            "paymentSchedule": "monthly",
+            "percentRateBreakdown": {"monthly": 0.0007, "quarterly": 0.0021, "annual": 0.0084},
+            "flatRateBreakdown": {"monthly": None, "quarterly": None, "annual": None},
+            "lastPaymentDate": "2024-11-19", "lastPaymentAmount": 909.06,
+            "lastPaymentPeriod": "Oct 2024", "lastPaymentExpected": 905.0,
+            "lastPaymentActual": 909.06, "lastPaymentVariance": 4.06,
+            "lastRecordedAUM": 1368616.0, "currentPeriod": "Nov 2024",
+            "currentStatus": "Due",
+            "rateBreakdown": {"monthly": 0.0007, "quarterly": 0.0021, "annual": 0.0084},
+            "status": "Due",
+            "missingPayments": ["Nov 2024", "Dec 2024", "Jan 2025"][:MISSING_PER_CLIENT],
+        }
+        payment_history[str(client_id)] = [
+            {
+                "id": client_id * 100 + n, "clientId": client_id, "receivedDate": "2025-02-07",
+                "appliedPeriod": "Jan 2025", "aum": 1400805.79, "expectedFee": 980.56,
+                "actualFee": 930.44, "variance": -50.12, "variancePercent": -5.11,
+                "paymentType": "Check", "notes": "Provider payment",
+                "hasAttachment": n % 2, "attachmentId": n if n % 2 else None,
+            }
+            for n in range(HISTORY_PER_CLIENT)
+        ]
+
+    providers = [
+        {"id": p, "name": f"Provider {p}", "clientCount": clients // PROVIDERS,
+         "totalAssets": 25_000_000.0, "totalParticipants": 195}
+        for p in range(1, PROVIDERS + 1)
+    ]
+
+    return {
+        "clients": client_list,
+        "providers": providers,
+        "clientDetails": client_details,
+        "paymentHistory": payment_history,
+    }
+
+def render_default(payload: dict) -> bytes:
+    """What FastAPI does for a returned dict without a response model."""
+    return JSONResponse(jsonable_encoder(payload)).body
+
+def render_fast(payload: dict) -> bytes:
+    return FastJSONResponse(payload).body
+
+def measure(render, payload: dict, repeat: int = 5) -> tuple[float, int]:
+    """Return the best wall time over ``repeat`` renders and the body size."""
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(render(payload))
+        best = min(best, time.perf_counter() - start)
+    return best, size
+
+def main(clients: int = CURRENT_CLIENTS) -> None:
+    encoder = "orjson" if responses.orjson is not None else "json (orjson not installed)"
+    print(f"FastJSONResponse encoder: {encoder}")
+
+    for scale in (1, 10, 100):
+        payload = build_payload(clients * scale)
+        default, size = measure(render_default, payload)
+        fast, _ = measure(render_fast, payload)
+        print(
+            f"  {scale:>3}x ({clients * scale:>5,} clients, {size / 1024:8.1f} KiB)  "
+            f"default {default * 1000:8.2f} ms  fast {fast * 1000:7.2f} ms  {default / fast:5.1f}x"
+        )
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else CURRENT_CLIENTS)
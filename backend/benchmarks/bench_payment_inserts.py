@@ -0,0 +1,185 @@
+"""
+Payment write throughput benchmark.
+
+Compares inserting and superseding payments with the legacy variance
+triggers (payments_update_variance_insert / _update, which re-UPDATE the
+row they fired for) against writing variance with the row, as
+app.database.models now does. Each run uses a fresh file database seeded
+with synthetic payments, with the production payments indexes and the
+backend's WAL / synchronous=NORMAL settings.
+
+Run from the backend directory:
+    python -m benchmarks.bench_payment_inserts [seed_rows] [writes]
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+
+from app.services.payment_service import payment_variance
+
+PAYMENTS_TABLE = """
+CREATE TABLE payments (
+    payment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    contract_id INTEGER NOT NULL,
+    client_id INTEGER NOT NULL,
+    received_date TEXT,
+    total_assets INTEGER,
+    expected_fee REAL,
+    actual_fee REAL,
+    method TEXT,
+    notes TEXT,
+    valid_from DATETIME DEFAULT CURRENT_TIMESTAMP,
+    valid_to DATETIME,
+    applied_start_month INTEGER,
+    applied_start_month_year INTEGER,
+    applied_end_month INTEGER,
+    applied_end_month_year INTEGER,
+    applied_start_quarter INTEGER,
+    applied_start_quarter_year INTEGER,
+    applied_end_quarter INTEGER,
+    applied_end_quarter_year INTEGER,
+    variance REAL,
+    variance_percent REAL
+)
+"""
+
+PAYMENTS_INDEXES = [
+    "CREATE INDEX idx_payments_client_id ON payments(client_id)",
+    "CREATE INDEX idx_payments_contract_id ON payments(contract_id)",
+    "CREATE INDEX idx_payments_date ON payments(client_id, received_date DESC)",
+    """CREATE INDEX idx_payments_applied_months ON payments (
+        client_id, applied_start_month_year, applied_start_month,
+        applied_end_month_year, applied_end_month
+    )""",
+]
+
+# As shipped in data/schema.sql before the backend dropped them
+VARIANCE_SQL = """
+    variance = (actual_fee - expected_fee),
+    variance_percent = CASE
+        WHEN expected_fee IS NOT NULL AND expected_fee <> 0 AND actual_fee IS NOT NULL
+        THEN ((actual_fee - expected_fee) / expected_fee) * 100
+        ELSE NULL
+    END
+"""
+VARIANCE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER payments_update_variance_insert
+    AFTER INSERT ON payments FOR EACH ROW
+    BEGIN
+        UPDATE payments SET {VARIANCE_SQL} WHERE payment_id = NEW.payment_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER payments_update_variance_update
+    AFTER UPDATE ON payments FOR EACH ROW
+    BEGIN
+        UPDATE payments SET {VARIANCE_SQL} WHERE payment_id = NEW.payment_id;
+    END
+    """,
+]
+
+BASE_COLUMNS = (
+    "contract_id, client_id, received_date, total_assets, expected_fee, actual_fee, "
+    "method, notes, applied_start_month, applied_start_month_year, "
+    "applied_end_month, applied_end_month_year"
+)
+INSERT_WITHOUT_VARIANCE = f"INSERT INTO payments ({BASE_COLUMNS}) VALUES ({', '.join('?' * 12)})"
+INSERT_WITH_VARIANCE = (
+    f"INSERT INTO payments ({BASE_COLUMNS}, variance, variance_percent) VALUES ({', '.join('?' * 14)})"
+)
+SUPERSEDE = "UPDATE payments SET valid_to = CURRENT_TIMESTAMP WHERE payment_id = ? AND valid_to IS NULL"
+
+CLIENTS = 500
+
+def synthetic_payments(count: int, rng: random.Random) -> list[tuple]:
+    """Monthly percentage-fee payments spread over CLIENTS clients."""
+    rows = []
+    for i in range(count):
+        client_id = i % CLIENTS + 1
+        year, month = 2015 + (i // CLIENTS) // 12 % 12, (i // CLIENTS) % 12 + 1
+        assets = rng.randrange(100_000, 10_000_000)
+        expected = round(assets * 0.0007, 2)
+        actual = round(expected * rng.uniform(0.95, 1.05), 2) if i % 20 else expected
+        rows.append((
+            client_id, client_id, f"{year}-{month:02d}-15", assets, expected, actual,
+            "Check", None, month, year, month, year
+        ))
+    return rows
+
+def with_variance(row: tuple) -> tuple:
+    return (*row, *payment_variance(row[4], row[5]))
+
+def build_database(path: str, seed_rows: int, triggers: bool) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(PAYMENTS_TABLE)
+    for statement in PAYMENTS_INDEXES:
+        conn.execute(statement)
+
+    rows = synthetic_payments(seed_rows, random.Random(1))
+    conn.execute("BEGIN")
+    conn.executemany(INSERT_WITH_VARIANCE, (with_variance(row) for row in rows))
+    conn.execute("COMMIT")
+
+    if triggers:
+        for statement in VARIANCE_TRIGGERS:
+            conn.execute(statement)
+    return conn
+
+def run(seed_rows: int, writes: int, triggers: bool) -> dict[str, float]:
+    """Time single-payment transactions, a batched insert and supersedes."""
+    rows = synthetic_payments(writes * 2, random.Random(2))
+    insert = INSERT_WITHOUT_VARIANCE if triggers else INSERT_WITH_VARIANCE
+    prepare = (lambda row: row) if triggers else with_variance
+
+    with tempfile.TemporaryDirectory() as directory:
+        conn = build_database(os.path.join(directory, "bench.db"), seed_rows, triggers)
+        results = {}
+
+        # One transaction per payment, like create_payment
+        start = time.perf_counter()
+        for row in rows[:writes]:
+            conn.execute("BEGIN")
+            conn.execute(insert, prepare(row))
+            conn.execute("COMMIT")
+        results["single inserts"] = time.perf_counter() - start
+
+        # One executemany, like create_payments
+        start = time.perf_counter()
+        conn.execute("BEGIN")
+        conn.executemany(insert, (prepare(row) for row in rows[writes:]))
+        conn.execute("COMMIT")
+        results["batched insert"] = time.perf_counter() - start
+
+        # Soft-delete plus new version, like update_payment
+        targets = random.Random(3).sample(range(1, seed_rows + 1), writes)
+        start = time.perf_counter()
+        for payment_id, row in zip(targets, rows):
+            conn.execute("BEGIN")
+            conn.execute(SUPERSEDE, (payment_id,))
+            conn.execute(insert, prepare(row))
+            conn.execute("COMMIT")
+        results["supersedes"] = time.perf_counter() - start
+
+        conn.close()
+    return results
+
+def main(seed_rows: int = 100_000, writes: int = 5_000) -> None:
+    before = run(seed_rows, writes, triggers=True)
+    after = run(seed_rows, writes, triggers=False)
+
+    print(f"{writes:,} writes per phase on a {seed_rows:,}-payment database")
+    print(f"  {'phase':<16} {'triggers':>12} {'on insert':>12} {'speedup':>8}")
+    for phase in before:
+        print(
+            f"  {phase:<16} {writes / before[phase]:>8,.0f}/s {writes / after[phase]:>8,.0f}/s "
+            f"{before[phase] / after[phase]:>7.2f}x"
+        )
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,65 @@
+"""
+Row factory microbenchmark.
+
+Compares the original per-row dict_factory with the column-cached factory
+from app.database.rows and with raw tuples, on an in-memory table shaped
+like frontend_payment_history.
+
+Run from the backend directory:
+    python -m benchmarks.bench_row_factory [rows]
+"""
+import sys
+import sqlite3
+import time
+
+from app.database.rows import make_dict_factory
+
+COLUMNS = [
+    "id", "clientId", "receivedDate", "appliedPeriod", "aum", "expectedFee",
+    "actualFee", "variance", "variancePercent", "paymentType", "notes",
+    "hasAttachment", "attachmentId",
+]
+
+def legacy_dict_factory(cursor, row):
+    """The previous implementation: rebuilds the mapping from cursor.description per row."""
+    return {col[0]: row[idx] for idx, col in enumerate(cursor.description)}
+
+def build_database(rows: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.execute(f"CREATE TABLE history ({', '.join(COLUMNS)})")
+    conn.executemany(
+        f"INSERT INTO history VALUES ({', '.join('?' * len(COLUMNS))})",
+        (
+            (i, i % 50, "2024-01-15", "Jan 2024", 1_000_000.0, 625.0, 630.0,
+             5.0, 0.8, "Check", None, i % 2, i if i % 2 else None)
+            for i in range(rows)
+        )
+    )
+    return conn
+
+def measure(conn: sqlite3.Connection, factory, repeat: int = 5) -> float:
+    """Return the best wall time over ``repeat`` full fetches."""
+    conn.row_factory = factory
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute("SELECT * FROM history").fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(rows: int = 100_000) -> None:
+    conn = build_database(rows)
+
+    results = {
+        "legacy dict_factory": measure(conn, legacy_dict_factory),
+        "cached dict_factory": measure(conn, make_dict_factory()),
+        "raw tuples": measure(conn, None),
+    }
+
+    baseline = results["legacy dict_factory"]
+    print(f"Fetching {rows:,} rows x {len(COLUMNS)} columns (best of 5)")
+    for name, seconds in results.items():
+        print(f"  {name:<20} {seconds * 1000:8.1f} ms  {baseline / seconds:5.2f}x")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
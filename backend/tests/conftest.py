@@ -0,0 +1,28 @@
+# backend/tests/conftest.py
+"""
+Shared fixtures.
+
+db_pool opens the connection pool on a temporary copy of the sample
+database in data/, so tests can run real queries and writes.
+"""
+import shutil
+from pathlib import Path
+
+import pytest
+from app.core.config import PATHS
+from app.database.database import init_db_pool, close_db_pool
+
+SAMPLE_DB = Path(__file__).parent.parent / "data" / "401k_payments.db"
+
+@pytest.fixture
+async def db_pool(tmp_path, monkeypatch):
+    """Connection pool on a migrated copy of the sample database"""
+    db_path = tmp_path / "401k_payments.db"
+    shutil.copyfile(SAMPLE_DB, db_path)
+    monkeypatch.setitem(PATHS, "DB_PATH", db_path)
+
+    pool = await init_db_pool(size=2)
+    try:
+        yield pool
+    finally:
+        await close_db_pool()
@@ -0,0 +1,115 @@
+# backend/tests/test_aggregates.py
+"""
+Tests for the payment aggregate deltas.
+
+This test suite covers how payment rows are bucketed and folded into the
+quarterly and yearly deltas applied by the write path, and what the stored
+expected_total means.
+"""
+import pytest
+from app.database.database import execute_query
+from app.database.aggregates import (
+    payment_bucket,
+    summary_deltas,
+    TOTAL,
+    COUNT,
+    EXPECTED,
+    ASSETS_SUM,
+    ASSETS_COUNT
+)
+
+def monthly(client_id, month, year, actual_fee, total_assets=None, expected_fee=None):
+    return {
+        "client_id": client_id,
+        "applied_start_month": month,
+        "applied_start_month_year": year,
+        "applied_start_quarter": None,
+        "applied_start_quarter_year": None,
+        "actual_fee": actual_fee,
+        "expected_fee": expected_fee,
+        "total_assets": total_assets,
+    }
+
+class TestPaymentBucket:
+    """Tests for the payment_bucket function"""
+
+    def test_monthly_rolls_up_to_quarter(self):
+        """Test months map to their calendar quarter"""
+        assert payment_bucket(monthly(1, 1, 2024, 10)) == (2024, 1)
+        assert payment_bucket(monthly(1, 3, 2024, 10)) == (2024, 1)
+        assert payment_bucket(monthly(1, 4, 2024, 10)) == (2024, 2)
+        assert payment_bucket(monthly(1, 12, 2024, 10)) == (2024, 4)
+
+    def test_quarterly_and_missing_period(self):
+        """Test quarterly payments use their own quarter and unperiodized ones are skipped"""
+        assert payment_bucket({"applied_start_quarter": 3, "applied_start_quarter_year": 2023}) == (2023, 3)
+        assert payment_bucket({"applied_start_month": None, "applied_start_quarter": None}) is None
+
+class TestSummaryDeltas:
+    """Tests for the summary_deltas function"""
+
+    def test_adds_and_removes(self):
+        """Test inserts add, retired rows subtract, and AUM is only counted when present"""
+        quarterly, yearly = summary_deltas(
+            added=[monthly(1, 1, 2024, 100.0, 1000, 90.0), monthly(1, 2, 2024, 50.0), monthly(1, 5, 2024, 70.0, 3000)],
+            removed=[monthly(1, 1, 2024, 80.0, 2000, 90.0)]
+        )
+
+        q1 = quarterly[(1, 2024, 1)]
+        assert q1[TOTAL] == pytest.approx(70.0)
+        assert q1[COUNT] == 1
+        assert q1[EXPECTED] == pytest.approx(0.0)
+        assert q1[ASSETS_SUM] == pytest.approx(-1000.0)
+        assert q1[ASSETS_COUNT] == 0
+        assert quarterly[(1, 2024, 2)][COUNT] == 1
+
+        year = yearly[(1, 2024)]
+        assert year[TOTAL] == pytest.approx(140.0)
+        assert year[COUNT] == 2
+        assert year[ASSETS_COUNT] == 1
+
+    def test_supersede_in_another_quarter(self):
+        """Test moving a payment to another quarter empties the old bucket"""
+        quarterly, yearly = summary_deltas(
+            added=[monthly(2, 10, 2024, 500.0)],
+            removed=[monthly(2, 9, 2024, 500.0)]
+        )
+
+        assert quarterly[(2, 2024, 3)][COUNT] == -1
+        assert quarterly[(2, 2024, 4)][COUNT] == 1
+        assert yearly[(2, 2024)][COUNT] == 0
+        assert yearly[(2, 2024)][TOTAL] == pytest.approx(0.0)
+
+class TestExpectedTotal:
+    """Tests pinning quarterly expected_total as the sum of expected fees"""
+
+    def test_sums_expected_fees(self):
+        """Test a quarter's expected fees add up and a retired payment's is subtracted"""
+        quarterly, _ = summary_deltas(
+            added=[monthly(3, month, 2024, 95.0, expected_fee=100.0) for month in (1, 2, 3)],
+            removed=[monthly(3, 2, 2024, 95.0, expected_fee=100.0)]
+        )
+
+        assert quarterly[(3, 2024, 1)][EXPECTED] == pytest.approx(200.0)
+
+    @pytest.mark.asyncio
+    async def test_stored_totals_are_sums(self, db_pool):
+        """Test migrated summaries hold the sum, not the maximum, of each quarter's expected fees"""
+        rows = await execute_query("""
+            SELECT q.expected_total, s.expected_total AS source_total, s.max_expected
+            FROM quarterly_summaries q
+            JOIN (
+                SELECT client_id, year, quarter, expected_total,
+                       (SELECT MAX(expected_fee) FROM payments p
+                        WHERE p.client_id = v.client_id AND p.valid_to IS NULL
+                        AND COALESCE(p.applied_start_quarter_year, p.applied_start_month_year) = v.year
+                        AND COALESCE(p.applied_start_quarter, (p.applied_start_month + 2) / 3) = v.quarter) AS max_expected,
+                       payment_count
+                FROM quarterly_summaries_source v
+            ) s USING (client_id, year, quarter)
+            WHERE s.payment_count > 1
+        """)
+
+        assert rows
+        assert all(row["expected_total"] == pytest.approx(row["source_total"]) for row in rows)
+        assert any(row["max_expected"] is not None and row["expected_total"] > row["max_expected"] for row in rows)
@@ -0,0 +1,173 @@
+"""
+Tests for the response cache.
+
+This test suite covers the in-process cache used by the read endpoints:
+- TTL expiry and LRU eviction
+- Tag-based invalidation
+- The cached decorator
+"""
+import asyncio
+import pytest
+from app.utils.cache import ResponseCache, cached
+
+class FakeClock:
+    """Controllable monotonic clock"""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestResponseCache:
+    """Tests for the ResponseCache class"""
+
+    def test_hit_and_miss(self):
+        """Test storing and retrieving a value"""
+        cache = ResponseCache(maxsize=10, ttl=60)
+
+        assert cache.get("a") == (False, None)
+        cache.set("a", {"value": 1})
+        assert cache.get("a") == (True, {"value": 1})
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_ttl_expiry(self):
+        """Test entries expire after the TTL"""
+        clock = FakeClock()
+        cache = ResponseCache(maxsize=10, ttl=30, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 29
+        assert cache.get("a") == (True, 1)
+
+        clock.now = 30
+        assert cache.get("a") == (False, None)
+
+    def test_per_entry_ttl(self):
+        """Test an entry can be stored with a shorter TTL than the default"""
+        clock = FakeClock()
+        cache = ResponseCache(maxsize=10, ttl=60, clock=clock)
+        cache.set("found", 1)
+        cache.set("missing", None, ttl=10)
+
+        clock.now = 10
+        assert cache.get("missing") == (False, None)
+        assert cache.get("found") == (True, 1)
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted when full"""
+        cache = ResponseCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        # Touch "a" so "b" becomes least recently used
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == (True, 1)
+        assert cache.get("b") == (False, None)
+        assert cache.get("c") == (True, 3)
+
+    def test_tag_invalidation(self):
+        """Test invalidating a tag only drops entries carrying it"""
+        cache = ResponseCache(maxsize=10, ttl=60)
+        cache.set("client-1", 1, tags=["client:1", "clients"])
+        cache.set("client-2", 2, tags=["client:2", "clients"])
+        cache.set("providers", 3, tags=["providers"])
+
+        assert cache.invalidate("client:1") == 1
+        assert cache.get("client-1") == (False, None)
+        assert cache.get("client-2") == (True, 2)
+
+        cache.invalidate("clients")
+        assert cache.get("client-2") == (False, None)
+        assert cache.get("providers") == (True, 3)
+
+class TestCachedDecorator:
+    """Tests for the cached decorator"""
+
+    @pytest.mark.asyncio
+    async def test_caches_by_arguments(self):
+        """Test results are cached per keyword arguments"""
+        cache = ResponseCache(maxsize=10, ttl=60)
+        calls = []
+
+        @cached("/items/{item_id}", tags=lambda item_id: [f"item:{item_id}"], cache=cache)
+        async def get_item(item_id):
+            calls.append(item_id)
+            return {"id": item_id}
+
+        assert await get_item(item_id=1) == {"id": 1}
+        assert await get_item(item_id=1) == {"id": 1}
+        assert await get_item(item_id=2) == {"id": 2}
+        assert calls == [1, 2]
+
+        cache.invalidate("item:1")
+        await get_item(item_id=1)
+        assert calls == [1, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_custom_key(self):
+        """Test a key function lets coarsely equal arguments share an entry"""
+        cache = ResponseCache(maxsize=10, ttl=60)
+        calls = []
+
+        @cached("/by-month", cache=cache, key=lambda day: day[:7])
+        async def by_month(day):
+            calls.append(day)
+            return day[:7]
+
+        assert await by_month(day="2025-05-01") == "2025-05"
+        assert await by_month(day="2025-05-31") == "2025-05"
+        assert await by_month(day="2025-06-01") == "2025-06"
+        assert calls == ["2025-05-01", "2025-06-01"]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self):
+        """Test concurrent requests for the same key run the loader once"""
+        cache = ResponseCache(maxsize=10, ttl=60)
+        calls = []
+
+        @cached("/slow", cache=cache)
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "done"
+
+        results = await asyncio.gather(*[slow() for _ in range(5)])
+
+        assert results == ["done"] * 5
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidation_during_load_is_not_cached(self):
+        """Test a result computed across an invalidation is not stored"""
+        cache = ResponseCache(maxsize=10, ttl=60)
+        calls = []
+
+        @cached("/racy", tags=["clients"], cache=cache)
+        async def racy():
+            calls.append(1)
+            # A write lands while the read is in progress
+            cache.invalidate("clients")
+            return len(calls)
+
+        assert await racy() == 1
+        assert await racy() == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self):
+        """Test exceptions propagate and are not cached"""
+        cache = ResponseCache(maxsize=10, ttl=60)
+        calls = []
+
+        @cached("/failing", cache=cache)
+        async def failing():
+            calls.append(1)
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await failing()
+        with pytest.raises(ValueError):
+            await failing()
+        assert len(calls) == 2
@@ -6,15 +6,20 @@ This test suite focuses on the core business logic functions in the client servi
 - determine_payment_status
 - calculate_missing_payments
 - calculate_expected_fee
+- batch_payment_status
+- as_of_period
 """
 import pytest
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from app.services.client_service import (
     determine_payment_status,
     calculate_missing_payments,
-    calculate_expected_fee
+    calculate_expected_fee,
+    batch_payment_status,
+    as_of_period
 )
 from app.utils.enums import FeeType, PaymentSchedule
+from app.utils.format import period_index
 
 # Mock data for testing
 def create_test_client(payment_schedule, last_month=None, last_year=None, 
@@ -220,4 +225,65 @@ class TestCalculateMissingPayments:
         # Validate result
         assert len(missing) > 0
         # We expect approximately 1-2 missing quarters
-        assert 1 <= len(missing) <= 2
\ No newline at end of file
+        assert 1 <= len(missing) <= 2
+
+
+class TestBatchPaymentStatus:
+    """Tests for the batch_payment_status function"""
+    
+    AS_OF = date(2025, 5, 15)  # Due: Apr 2025 (monthly), Q1 2025 (quarterly)
+    
+    def test_status_and_missing_ranges(self):
+        """Test statuses and compact missing ranges against a fixed as-of date"""
+        schedules = ["monthly", "monthly", "quarterly", "quarterly", "monthly", "annual"]
+        last_paid = [
+            period_index("Apr 2025", "monthly"),
+            period_index("Nov 2024", "monthly"),
+            period_index("Q1 2025", "quarterly"),
+            period_index("Q2 2024", "quarterly"),
+            None,
+            period_index("Jan 2020", "monthly"),
+        ]
+        
+        statuses, missing = batch_payment_status(schedules, last_paid, self.AS_OF)
+        
+        assert statuses == ["Paid", "Due", "Paid", "Due", "Due", "Due"]
+        assert missing[0] is None and missing[2] is None
+        assert missing[1].to_dict() == {"from": "Dec 2024", "to": "Apr 2025", "count": 5}
+        assert list(missing[3].periods()) == ["Q3 2024", "Q4 2024", "Q1 2025"]
+        # Never paid or unknown schedule: due, but no range from year 0
+        assert missing[4] is None and missing[5] is None
+    
+    def test_year_boundary(self):
+        """Test January evaluates against December and Q4 of the previous year"""
+        statuses, missing = batch_payment_status(
+            ["monthly", "quarterly"],
+            [period_index("Nov 2024", "monthly"), period_index("Q3 2024", "quarterly")],
+            date(2025, 1, 3)
+        )
+        
+        assert statuses == ["Due", "Due"]
+        assert [m.to_dict()["from"] for m in missing] == ["Dec 2024", "Q4 2024"]
+        assert [m.count for m in missing] == [1, 1]
+    
+    def test_numpy_matches_python(self, monkeypatch):
+        """Test the NumPy path gives the same results as the list arithmetic"""
+        pytest.importorskip("numpy")
+        from app.services import client_service
+        
+        schedules = ["monthly", "quarterly", None] * 400
+        last_paid = [24290 + (i % 40) if i % 7 else None for i in range(1200)]
+        
+        expected = batch_payment_status(schedules, last_paid, self.AS_OF)
+        monkeypatch.setattr(client_service, "NUMPY_BATCH_MIN", 1)
+        assert batch_payment_status(schedules, last_paid, self.AS_OF) == expected
+    
+    def test_as_of_period_keys_whole_months(self):
+        """Test every day of a month shares one period key and one result"""
+        first, last = date(2025, 5, 1), date(2025, 5, 31)
+        schedules = ["monthly", "quarterly"]
+        last_paid = [period_index("Feb 2025", "monthly"), period_index("Q4 2024", "quarterly")]
+        
+        assert as_of_period(first) == as_of_period(last) == period_index("May 2025", "monthly")
+        assert as_of_period(date(2025, 6, 1)) == as_of_period(last) + 1
+        assert batch_payment_status(schedules, last_paid, first) == batch_payment_status(schedules, last_paid, last)
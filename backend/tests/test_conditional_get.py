@@ -0,0 +1,70 @@
+"""
+Tests for conditional GET handling.
+
+This test suite covers If-None-Match matching used by the
+ETag dependency on the read routers, and the ETag itself changing when
+payment statuses roll into a new month.
+"""
+from datetime import date
+import pytest
+from fastapi import HTTPException, Response
+from starlette.requests import Request
+import app.services.client_service as client_service
+from app.api.dependencies import conditional_get
+from app.utils.cache import etag_matches
+
+def frozen_date(today: date) -> type:
+    """date subclass whose today() returns a fixed day"""
+    class FrozenDate(date):
+        @classmethod
+        def today(cls):
+            return today
+    return FrozenDate
+
+def get_request(if_none_match: str = None) -> Request:
+    """Minimal GET request, optionally carrying If-None-Match"""
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/api/clients", "headers": headers, "query_string": b""})
+
+class TestEtagMatches:
+    """Tests for the etag_matches function"""
+
+    def test_exact_match(self):
+        """Test an identical weak tag matches"""
+        assert etag_matches('W/"abc-3-1"', 'W/"abc-3-1"') is True
+
+    def test_weak_comparison(self):
+        """Test strong and weak forms of the same tag match"""
+        assert etag_matches('"abc-3-1"', 'W/"abc-3-1"') is True
+
+    def test_list_and_wildcard(self):
+        """Test comma-separated lists and the * wildcard"""
+        assert etag_matches('W/"old", W/"abc-3-1"', 'W/"abc-3-1"') is True
+        assert etag_matches("*", 'W/"abc-3-1"') is True
+
+    def test_no_match(self):
+        """Test a stale or missing header does not match"""
+        assert etag_matches('W/"abc-2-1"', 'W/"abc-3-1"') is False
+        assert etag_matches(None, 'W/"abc-3-1"') is False
+        assert etag_matches("", 'W/"abc-3-1"') is False
+
+class TestConditionalGet:
+    """Tests for the conditional_get dependency"""
+
+    @pytest.mark.asyncio
+    async def test_new_month_changes_etag(self, db_pool, monkeypatch):
+        """Test a tag from last month no longer yields 304 once the month rolls over"""
+        monkeypatch.setattr(client_service, "date", frozen_date(date(2025, 5, 31)))
+        response = Response()
+        await conditional_get(get_request(), response, as_of=None)
+        etag = response.headers["etag"]
+
+        with pytest.raises(HTTPException) as not_modified:
+            await conditional_get(get_request(etag), Response(), as_of=None)
+        assert not_modified.value.status_code == 304
+
+        monkeypatch.setattr(client_service, "date", frozen_date(date(2025, 6, 1)))
+        response = Response()
+        await conditional_get(get_request(etag), response, as_of=None)
+
+        assert response.headers["etag"] != etag
@@ -0,0 +1,100 @@
+# backend/tests/test_config.py
+"""
+Tests for configuration loading.
+
+This test suite covers the lazily-resolved path settings:
+- Importing app modules has no side effects and works without a login
+- Import time of app.core.config, measured with python -X importtime
+- Settings resolved from the environment
+- Falling back to the local database on startup
+"""
+import os
+import sys
+import subprocess
+from pathlib import Path
+
+from app.core.config import LOCAL_DB_PATH, PATHS, get_settings, resolve_settings, use_settings, validate_settings
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Cumulative microseconds allowed for importing app.core.config, including
+# its stdlib imports; generous so slow CI machines pass
+CONFIG_IMPORT_BUDGET_US = 150_000
+
+# Makes os.getlogin() fail as it does without a terminal, and any database
+# open fail loudly, before the app is imported
+HEADLESS = (
+    "import os, sqlite3\n"
+    "def no_terminal(): raise OSError(6, 'No such device or address')\n"
+    "def no_connect(*args, **kwargs): raise AssertionError('database opened at import')\n"
+    "os.getlogin = no_terminal\n"
+    "sqlite3.connect = no_connect\n"
+)
+
+def run_python(code: str, *options: str) -> subprocess.CompletedProcess:
+    """Run code in a fresh interpreter from the backend directory"""
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        timeout=120
+    )
+
+def cumulative_import_us(stderr: str, module: str) -> int:
+    """Read a module's cumulative time from python -X importtime output"""
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and line.split("|")[-1].strip() == module:
+            return int(line.split("|")[1])
+    raise AssertionError(f"{module} not in importtime output")
+
+class TestConfigImport:
+    """Tests for importing configuration and the app"""
+
+    def test_config_import_is_cheap(self):
+        """Test importing config stays within the import-time budget and prints nothing"""
+        result = run_python(HEADLESS + "import app.core.config", "-X", "importtime")
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout == ""
+        assert cumulative_import_us(result.stderr, "app.core.config") < CONFIG_IMPORT_BUDGET_US
+
+    def test_app_imports_headless(self):
+        """Test the whole app imports without a login or a database"""
+        result = run_python(HEADLESS + "import app.main, app.database.maintenance")
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout == ""
+
+class TestSettings:
+    """Tests for get_settings"""
+
+    def test_settings_from_environment(self, monkeypatch, tmp_path):
+        """Test the mode and path overrides are read from the environment"""
+        monkeypatch.setenv("APP_MODE", "home")
+        monkeypatch.setenv("DB_PATH", str(tmp_path / "payments.db"))
+        monkeypatch.setenv("DOCUMENT_STORE_PATH", str(tmp_path / "store"))
+        use_settings(None)
+        try:
+            settings = get_settings()
+
+            assert settings.app_mode == "home"
+            assert settings.db_path == tmp_path / "payments.db"
+            assert settings.document_store_path == tmp_path / "store"
+            assert get_settings() is settings
+            assert PATHS["DB_PATH"] == settings.db_path
+        finally:
+            use_settings(None)
+
+    def test_falls_back_to_local_database(self, tmp_path):
+        """Test a database that cannot be opened is replaced by the local one in HOME mode"""
+        unreachable = resolve_settings("office")._replace(db_path=tmp_path / "missing.db")
+        use_settings(unreachable)
+        try:
+            assert validate_settings()
+
+            assert PATHS["DB_PATH"] == LOCAL_DB_PATH
+            assert PATHS["APP_MODE"] == "home"
+            assert get_settings().document_store_path == resolve_settings("home").document_store_path
+        finally:
+            use_settings(None)
@@ -0,0 +1,105 @@
+"""
+Tests for the group-commit database writer.
+
+This test suite queues jobs while the writer is leased so they run as one
+batch, and covers:
+- A failing job rolled back to its SAVEPOINT while its batch-mates commit
+- The whole batch failing and rolling back
+- Jobs committed in submission order
+- Cancelling the writer mid-batch
+"""
+import asyncio
+import pytest
+from app.database.database import execute_query
+
+async def create_log(pool):
+    async def job(conn):
+        await conn.execute("CREATE TABLE write_log (n INTEGER)")
+    await pool.submit(job)
+
+async def logged():
+    rows = await execute_query("SELECT n FROM write_log ORDER BY rowid")
+    return [row["n"] for row in rows]
+
+def insert(n, fail=None):
+    """Write job logging n, then raising fail if given"""
+    async def job(conn):
+        await conn.execute("INSERT INTO write_log (n) VALUES (?)", (n,))
+        if fail is not None:
+            raise fail
+        return n
+    return job
+
+async def submit_batch(pool, jobs):
+    """Queue jobs behind a writer lease so they are committed together"""
+    async with pool.writer():
+        tasks = [asyncio.create_task(pool.submit(job)) for job in jobs]
+        await asyncio.sleep(0)
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+class TestDatabaseWriter:
+    """Tests for DatabaseWriter batches"""
+
+    @pytest.mark.asyncio
+    async def test_failing_job_rolls_back_alone(self, db_pool):
+        """Test a failing job is rolled back to its savepoint and the rest of the batch commits"""
+        await create_log(db_pool)
+        commits = db_pool.stats()["writer"]["commits"]
+
+        results = await submit_batch(db_pool, [insert(0), insert(1), insert(2, ValueError("bad")), insert(3)])
+
+        assert results[:2] == [0, 1] and results[3] == 3
+        assert isinstance(results[2], ValueError)
+        assert await logged() == [0, 1, 3]
+        assert db_pool.stats()["writer"]["commits"] == commits + 1
+
+    @pytest.mark.asyncio
+    async def test_whole_batch_fails(self, db_pool):
+        """Test a job that breaks the shared transaction fails every job in the batch"""
+        await create_log(db_pool)
+
+        async def end_transaction(conn):
+            await conn.execute("ROLLBACK")
+
+        results = await submit_batch(db_pool, [insert(0), end_transaction, insert(2)])
+
+        assert all(isinstance(result, Exception) for result in results)
+        assert await logged() == []
+        assert await db_pool.submit(insert(3)) == 3
+        assert await logged() == [3]
+
+    @pytest.mark.asyncio
+    async def test_submission_order(self, db_pool):
+        """Test jobs run and commit in the order they were submitted"""
+        await create_log(db_pool)
+
+        results = await submit_batch(db_pool, [insert(n) for n in range(20)])
+
+        assert results == list(range(20))
+        assert await logged() == list(range(20))
+
+    @pytest.mark.asyncio
+    async def test_cancelled_mid_batch(self, db_pool):
+        """Test cancelling the writer rolls back the open transaction and cancels waiting jobs"""
+        await create_log(db_pool)
+        writer = db_pool._writer
+        started = asyncio.Event()
+
+        async def stall(conn):
+            await conn.execute("INSERT INTO write_log (n) VALUES (1)")
+            started.set()
+            await asyncio.Event().wait()
+
+        async with db_pool.writer():
+            tasks = [asyncio.create_task(db_pool.submit(job)) for job in (insert(0), stall, insert(2))]
+            await asyncio.sleep(0)
+        await started.wait()
+        queued = asyncio.create_task(db_pool.submit(insert(3)))
+        await asyncio.sleep(0)
+
+        writer._task.cancel()
+        results = await asyncio.gather(*tasks, queued, return_exceptions=True)
+
+        assert all(isinstance(result, asyncio.CancelledError) for result in results)
+        assert not writer.conn.in_transaction
+        assert await logged() == []
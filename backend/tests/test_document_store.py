@@ -0,0 +1,131 @@
+"""
+Tests for the content-addressed document store.
+
+This test suite runs against a temporary DOCUMENT_STORE_PATH and covers:
+- Identical uploads linked to a single blob
+- Blobs kept while any document still references them
+- Garbage collection of unreferenced blobs and stray files
+- Linking and pruning documents stored before blobs existed
+"""
+import io
+import os
+import time
+import pytest
+from fastapi import UploadFile
+from app.core.config import PATHS
+from app.database.database import execute_query, execute_write_query
+from app.services.document_service import store_document, delete_document, get_document_file, invalidate_document_path
+from app.services.document_store import blob_path, collect_garbage, dedupe_documents
+
+STATEMENT = b"%PDF-1.4 quarterly statement"
+
+def make_upload(data: bytes, filename: str = "statement.pdf") -> UploadFile:
+    """Build an UploadFile over in-memory bytes"""
+    return UploadFile(io.BytesIO(data), filename=filename)
+
+def age(path, seconds: int) -> None:
+    """Move a file's mtime into the past"""
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+@pytest.fixture
+def store(db_pool, tmp_path, monkeypatch):
+    """Empty document store and documents root next to the test database"""
+    monkeypatch.setitem(PATHS, "DOCUMENT_STORE_PATH", tmp_path / "store")
+    monkeypatch.setitem(PATHS, "DOCUMENTS_ROOT", tmp_path / "onedrive")
+    # Document IDs repeat across test databases
+    invalidate_document_path()
+    yield tmp_path / "store"
+    invalidate_document_path()
+
+async def blob_rows():
+    return await execute_query("SELECT content_hash, blob_path FROM document_blobs")
+
+class TestDocumentBlobs:
+    """Tests for uploading and deleting documents"""
+
+    @pytest.mark.asyncio
+    async def test_same_bytes_share_one_blob(self, store):
+        """Test uploading the same contents twice links both documents to one blob"""
+        first = await store_document(make_upload(STATEMENT), client_id=1)
+        second = await store_document(make_upload(STATEMENT, "copy.pdf"), client_id=2)
+
+        blobs = await blob_rows()
+        assert first != second
+        assert len(blobs) == 1
+        assert (await get_document_file(first))["path"] == (await get_document_file(second))["path"]
+        assert [path for path in store.rglob("*") if path.is_file()] == [blob_path(blobs[0]["blob_path"])]
+
+    @pytest.mark.asyncio
+    async def test_delete_keeps_shared_blob(self, store):
+        """Test deleting one reference keeps the blob until the last one goes"""
+        first = await store_document(make_upload(STATEMENT), client_id=1)
+        second = await store_document(make_upload(STATEMENT), client_id=2)
+        path = blob_path((await blob_rows())[0]["blob_path"])
+
+        assert await delete_document(first)
+        assert path.read_bytes() == STATEMENT
+        assert len(await blob_rows()) == 1
+
+        assert await delete_document(second)
+        assert not path.exists()
+        assert await blob_rows() == []
+
+class TestCollectGarbage:
+    """Tests for collect_garbage"""
+
+    @pytest.mark.asyncio
+    async def test_removes_only_unreferenced_and_old(self, store):
+        """Test referenced blobs and recent stray files survive collection"""
+        kept = await store_document(make_upload(STATEMENT), client_id=1)
+        kept_path = (await get_document_file(kept))["path"]
+        age(kept_path, 7 * 86400)
+
+        await execute_write_query(
+            "INSERT INTO document_blobs (content_hash, blob_path, size) VALUES ('ff00', 'ff/ff00.pdf', 4)"
+        )
+        orphan = blob_path("ff/ff00.pdf")
+        orphan.parent.mkdir(parents=True)
+        orphan.write_bytes(b"gone")
+
+        old_stray = store / "tmp" / "old.upload"
+        new_stray = store / "tmp" / "new.upload"
+        old_stray.write_bytes(b"interrupted")
+        new_stray.write_bytes(b"in progress")
+        age(old_stray, 120)
+
+        report = await collect_garbage(grace_seconds=60)
+
+        assert report == {"blobsRemoved": 1, "strayFilesRemoved": 1}
+        assert kept_path.exists() and new_stray.exists()
+        assert not orphan.exists() and not old_stray.exists()
+        assert [row["content_hash"] for row in await blob_rows()] == [(await get_document_file(kept))["content_hash"]]
+
+class TestDedupeDocuments:
+    """Tests for dedupe_documents"""
+
+    @pytest.mark.asyncio
+    async def test_prune_rewrites_paths(self, store, tmp_path):
+        """Test pruned documents point at their blob before the originals are removed"""
+        originals = tmp_path / "onedrive" / "Statements"
+        originals.mkdir(parents=True)
+        file_ids = []
+        for name in ("q1.pdf", "q1 copy.pdf"):
+            (originals / name).write_bytes(STATEMENT)
+            file_ids.append(await execute_write_query(
+                "INSERT INTO client_files (client_id, file_name, onedrive_path) VALUES (1, ?, ?)",
+                (name, f"Statements\\{name}")
+            ))
+
+        report = await dedupe_documents(prune=True)
+
+        assert report["linked"] == 2 and report["blobsCreated"] == 1 and report["pruned"] == 2
+        assert list(originals.iterdir()) == []
+
+        blob = (await blob_rows())[0]["blob_path"]
+        rows = await execute_query(
+            "SELECT onedrive_path FROM client_files WHERE file_id IN (?, ?)", tuple(file_ids)
+        )
+        assert [row["onedrive_path"] for row in rows] == [blob, blob]
+        for file_id in file_ids:
+            assert (await get_document_file(file_id))["path"].read_bytes() == STATEMENT
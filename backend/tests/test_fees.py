@@ -0,0 +1,99 @@
+"""
+Tests for the expected fee endpoints.
+
+This test suite calls the estimate and batch routes on a copy of the sample
+database and covers:
+- 404 for clients that are unknown or have no active contract
+- The EXPECTED_FEE_BATCH_MAX limit
+- Estimates matching payment_service.fee_for_periods
+"""
+import httpx
+import pytest
+import app.api.endpoints.fees as fees
+from app.database.database import execute_write_query
+from app.main import app
+from app.services.fee_service import fee_structures
+from app.services.payment_service import fee_for_periods
+
+@pytest.fixture
+async def client(db_pool):
+    """HTTP client for the app, with fee structures loaded from this test's database"""
+    fee_structures.clear()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        yield http
+    fee_structures.clear()
+
+class TestExpectedFee:
+    """Tests for GET /api/clients/{client_id}/expected-fee"""
+
+    @pytest.mark.asyncio
+    async def test_unknown_client_or_contract(self, client):
+        """Test clients that do not exist or whose contract ended get 404"""
+        await execute_write_query("UPDATE contracts SET valid_to = CURRENT_TIMESTAMP WHERE client_id = 2")
+
+        for client_id in (9999, 2):
+            response = await client.get(f"/api/clients/{client_id}/expected-fee")
+            assert response.status_code == 404
+            assert response.json()["detail"] == "Client has no active contract"
+
+    @pytest.mark.asyncio
+    async def test_matches_fee_for_periods(self, client):
+        """Test percentage, flat and quarterly estimates match fee_for_periods"""
+        cases = [
+            (1, {"feeType": "percentage", "rate": 0.0007}, 5_000_000, "Jan 2024", "Mar 2024", 3),
+            (3, {"feeType": "flat", "rate": 666.66}, None, "Jan 2024", None, 1),
+            (4, {"feeType": "percentage", "rate": 0.00125}, 2_000_000, "Q1 2024", "Q4 2024", 4),
+        ]
+        for client_id, structure, total_assets, start_period, end_period, periods in cases:
+            params = {"start_period": start_period}
+            if total_assets is not None:
+                params["total_assets"] = total_assets
+            if end_period:
+                params["end_period"] = end_period
+
+            response = await client.get(f"/api/clients/{client_id}/expected-fee", params=params)
+
+            assert response.status_code == 200
+            estimate = response.json()
+            assert estimate["periods"] == periods
+            assert estimate["expectedFee"] == pytest.approx(fee_for_periods(structure, total_assets, periods))
+
+    @pytest.mark.asyncio
+    async def test_bad_period_is_bad_request(self, client):
+        """Test a period that does not fit the schedule gets 400"""
+        response = await client.get("/api/clients/4/expected-fee", params={"start_period": "Jan 2024"})
+
+        assert response.status_code == 400
+
+class TestBatchExpectedFees:
+    """Tests for POST /api/clients/expected-fees"""
+
+    @pytest.mark.asyncio
+    async def test_batch_limit(self, client, monkeypatch):
+        """Test batches over EXPECTED_FEE_BATCH_MAX are rejected with 413"""
+        monkeypatch.setattr(fees, "EXPECTED_FEE_BATCH_MAX", 2)
+        items = [{"client_id": 1, "total_assets": 1000}] * 3
+
+        assert (await client.post("/api/clients/expected-fees", json={"items": items})).status_code == 413
+        assert (await client.post("/api/clients/expected-fees", json={"items": items[:2]})).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_results_in_order(self, client):
+        """Test each item gets its estimate or error, matching the single-client route"""
+        items = [
+            {"client_id": 1, "total_assets": 5_000_000, "start_period": "Jan 2024", "end_period": "Mar 2024"},
+            {"client_id": 9999},
+            {"client_id": 4, "start_period": "Jan 2024"},
+            {"client_id": 3},
+        ]
+
+        response = await client.post("/api/clients/expected-fees", json={"items": items})
+
+        results = response.json()["results"]
+        assert [result["clientId"] for result in results] == [1, 9999, 4, 3]
+        assert results[0]["expectedFee"] == pytest.approx(fee_for_periods({"feeType": "percentage", "rate": 0.0007}, 5_000_000, 3))
+        assert results[1]["error"] == "No active contract"
+        assert "error" in results[2]
+        assert results[3]["expectedFee"] == pytest.approx(666.66)
+        single = await client.get("/api/clients/1/expected-fee", params={"total_assets": 5_000_000, "start_period": "Jan 2024", "end_period": "Mar 2024"})
+        assert single.json()["expectedFee"] == results[0]["expectedFee"]
@@ -0,0 +1,30 @@
+"""
+Tests for period helpers in the format module.
+
+This test suite covers strict period checks and period indexes:
+- is_period
+- period_index
+"""
+from app.utils.format import is_period, period_index
+from app.utils.enums import PaymentSchedule
+
+class TestPeriods:
+    """Tests for is_period and period_index"""
+
+    def test_is_period_matches_schedule(self):
+        """Test periods must match the client's schedule"""
+        assert is_period("Jan 2024", PaymentSchedule.MONTHLY)
+        assert is_period("Q4 2024", PaymentSchedule.QUARTERLY)
+        assert not is_period("Q1 2024", PaymentSchedule.MONTHLY)
+        assert not is_period("Jan 2024", PaymentSchedule.QUARTERLY)
+        assert not is_period("Q5 2024", PaymentSchedule.QUARTERLY)
+        assert not is_period("January 2024", PaymentSchedule.MONTHLY)
+        assert not is_period("Jan", PaymentSchedule.MONTHLY)
+        assert not is_period(None, PaymentSchedule.MONTHLY)
+
+    def test_period_index_is_consecutive(self):
+        """Test consecutive periods differ by one across year boundaries"""
+        assert period_index("Jan 2025", PaymentSchedule.MONTHLY) - period_index("Dec 2024", PaymentSchedule.MONTHLY) == 1
+        assert period_index("Mar 2025", PaymentSchedule.MONTHLY) - period_index("Jan 2025", PaymentSchedule.MONTHLY) == 2
+        assert period_index("Q1 2025", PaymentSchedule.QUARTERLY) - period_index("Q4 2024", PaymentSchedule.QUARTERLY) == 1
+        assert period_index("Jan 2024", PaymentSchedule.MONTHLY) == 2024 * 12
@@ -0,0 +1,54 @@
+"""
+Tests for the bulk import file readers.
+
+This test suite covers streaming CSV and NDJSON parsing:
+- Format detection
+- Typed rows with line numbers
+- Per-line errors for unreadable rows
+"""
+import io
+import pytest
+from fastapi import UploadFile
+from app.utils.imports import detect_format, iter_import_rows, CSV, NDJSON
+
+async def read_all(data: bytes, format: str, batch_size: int = 2) -> list:
+    """Collect every row parsed from an in-memory upload"""
+    rows = []
+    async for batch in iter_import_rows(UploadFile(io.BytesIO(data), filename="import"), format, batch_size):
+        assert len(batch) <= batch_size
+        rows.extend(batch)
+    return rows
+
+class TestImportReaders:
+    """Tests for detect_format and iter_import_rows"""
+
+    def test_detect_format(self):
+        """Test formats are detected from the extension or content type"""
+        assert detect_format("remittances.CSV", None) == CSV
+        assert detect_format("remittances.jsonl", None) == NDJSON
+        assert detect_format("upload", "application/x-ndjson; charset=utf-8") == NDJSON
+        assert detect_format("notes.txt", "text/plain") is None
+
+    @pytest.mark.asyncio
+    async def test_csv_rows(self):
+        """Test CSV rows keep their line numbers and blank cells become None"""
+        data = b'\xef\xbb\xbfclient_id,actual_fee,notes\n1,"1,250.00",bulk\n\n2,300,\n3,40,"two\nlines"\n'
+
+        rows = await read_all(data, CSV)
+
+        assert rows[0] == (2, {"client_id": "1", "actual_fee": "1,250.00", "notes": "bulk"}, None)
+        assert rows[1] == (4, {"client_id": "2", "actual_fee": "300", "notes": None}, None)
+        assert rows[2][1]["notes"] == "two\nlines"
+        assert len(rows) == 3
+
+    @pytest.mark.asyncio
+    async def test_ndjson_errors_per_line(self):
+        """Test unreadable NDJSON lines are reported without stopping the import"""
+        data = b'{"client_id": 1}\n{bad\n\n[1, 2]\n{"client_id": 2}\n'
+
+        rows = await read_all(data, NDJSON)
+
+        assert [line for line, _, _ in rows] == [1, 2, 4, 5]
+        assert rows[0][1] == {"client_id": 1} and rows[3][1] == {"client_id": 2}
+        assert rows[1][1] is None and rows[1][2].startswith("Invalid JSON")
+        assert rows[2][2] == "Each line must be a JSON object"
@@ -0,0 +1,107 @@
+"""
+Tests for request timing and query instrumentation.
+
+This test suite covers:
+- Histogram buckets and the Prometheus text format
+- TimingMiddleware's Server-Timing header and per-route series
+- SQL statement, time and row counting on database connections and the pool
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.middleware import TimingMiddleware
+from app.api.responses import FastJSONResponse, fast_json
+from app.database.database import connect, execute_query, submit_write
+from app.utils.metrics import Histogram, RequestMetrics, RequestTimings, record_sql, timing_context
+
+class TestHistogram:
+    """Tests for Histogram and RequestMetrics.render"""
+
+    def test_buckets_are_cumulative(self):
+        """Test values land in the first bucket whose bound they do not exceed"""
+        histogram = Histogram((1, 5, 10))
+        for value in (0, 1, 2, 7, 50):
+            histogram.observe(value)
+
+        assert histogram.cumulative() == [("1", 2), ("5", 3), ("10", 4), ("+Inf", 5)]
+        assert histogram.count == 5 and histogram.sum == 60
+
+    def test_render(self):
+        """Test series are labelled by method and route and label values are escaped"""
+        metrics = RequestMetrics()
+        timings = RequestTimings()
+        timings.statements, timings.rows = 3, 120
+        metrics.observe("GET", '/api/"odd"', 200, timings, 0.004)
+
+        text = metrics.render()
+
+        assert 'http_requests_total{method="GET",route="/api/\\"odd\\"",status="200"} 1' in text
+        assert 'http_request_sql_statements_bucket{method="GET",route="/api/\\"odd\\"",le="5"} 1' in text
+        assert 'http_request_sql_rows_sum{method="GET",route="/api/\\"odd\\""} 120.0' in text
+        assert "# TYPE http_request_duration_seconds histogram" in text
+
+class TestTimingMiddleware:
+    """Tests for TimingMiddleware"""
+
+    def test_server_timing_and_route_series(self):
+        """Test responses carry Server-Timing and are recorded under their route template"""
+        metrics = RequestMetrics()
+        app = FastAPI()
+        app.add_middleware(TimingMiddleware, metrics=metrics)
+
+        @app.get("/items/{item_id}", response_class=FastJSONResponse)
+        @fast_json
+        async def get_item(item_id: int):
+            record_sql(0.002, statements=2, rows=5)
+            return {"id": item_id}
+
+        client = TestClient(app)
+        response = client.get("/items/7")
+        client.get("/items/8")
+        client.get("/missing")
+
+        timing = response.headers["server-timing"]
+        assert timing.startswith('db;dur=2.000;desc="2 statements, 5 rows", serialize;dur=')
+        assert "app;dur=" in timing
+
+        text = metrics.render()
+        assert 'http_requests_total{method="GET",route="/items/{item_id}",status="200"} 2' in text
+        assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in text
+        assert 'http_request_sql_statements_sum{method="GET",route="/items/{item_id}"} 4.0' in text
+
+class TestTimedConnection:
+    """Tests for SQL instrumentation on database connections"""
+
+    @pytest.mark.asyncio
+    async def test_counts_statements_and_rows(self):
+        """Test statements and fetched rows are charged to the current request only"""
+        conn = await connect(":memory:")
+        try:
+            await conn.execute("CREATE TABLE t (id INTEGER)")
+
+            with timing_context(RequestTimings()) as timings:
+                await conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(4)])
+                cursor = await conn.execute("SELECT id FROM t")
+                assert len(await cursor.fetchall()) == 4
+                cursor = await conn.execute("SELECT id FROM t WHERE id = 9")
+                assert await cursor.fetchone() is None
+
+            assert timings.statements == 3
+            assert timings.rows == 4
+            assert timings.sql_seconds > 0
+        finally:
+            await conn.close()
+
+    @pytest.mark.asyncio
+    async def test_pool_reads_and_writes_are_counted(self, db_pool):
+        """Test queries on pooled readers and queued write jobs reach the request's timings"""
+        async def job(conn):
+            await conn.execute("UPDATE providers SET name = name WHERE provider_id = 1")
+
+        with timing_context(RequestTimings()) as timings:
+            rows = await execute_query("SELECT provider_id FROM providers")
+            await submit_write(job)
+
+        assert timings.statements == 2
+        assert timings.rows == len(rows) > 0
+        assert timings.sql_seconds > 0
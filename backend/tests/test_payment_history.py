@@ -0,0 +1,110 @@
+"""
+Tests for payment history pagination.
+
+This test suite runs against a copy of the sample database and covers:
+- History cursors round-tripping and rejecting malformed input
+- Keyset pages continuing across cursors without gaps or repeats
+- Payments without a received date sorting last
+- Totals following writes made outside the app
+"""
+import json
+import base64
+import httpx
+import pytest
+from app.main import app
+from app.database.database import execute_query, execute_write_query
+from app.database.models import (
+    count_client_payments,
+    decode_history_cursor,
+    encode_history_cursor,
+    get_client_payment_history,
+    get_client_payment_history_keyset
+)
+
+CLIENT_ID = 1
+
+async def all_pages(client_id: int, page_size: int) -> list[dict]:
+    """Follow nextCursor from the first page to the last"""
+    payments, cursor = [], ""
+    while True:
+        page = await get_client_payment_history_keyset(client_id, cursor=cursor, page_size=page_size)
+        payments.extend(page["payments"])
+        cursor = page["pagination"]["nextCursor"]
+        if cursor is None:
+            assert not page["pagination"]["hasNextPage"]
+            return payments
+
+async def insert_undated_payments(client_id: int, count: int) -> list[int]:
+    """Add payments with no received date to one of the client's contracts"""
+    rows = await execute_query("SELECT contract_id FROM contracts WHERE client_id = ? LIMIT 1", (client_id,))
+    return [
+        await execute_write_query(
+            "INSERT INTO payments (contract_id, client_id, received_date, actual_fee) VALUES (?, ?, NULL, 100)",
+            (rows[0]["contract_id"], client_id)
+        )
+        for _ in range(count)
+    ]
+
+class TestHistoryCursor:
+    """Tests for encode_history_cursor and decode_history_cursor"""
+
+    def test_round_trip(self):
+        """Test dated and undated positions decode to what was encoded"""
+        for position in (("2024-03-15", 42), (None, 7)):
+            cursor = encode_history_cursor(*position)
+            assert "=" not in cursor
+            assert decode_history_cursor(cursor) == position
+
+    def test_rejects_malformed(self):
+        """Test garbage, wrong shapes and wrong types raise ValueError"""
+        wrong_types = base64.urlsafe_b64encode(json.dumps([20240315, "42"]).encode()).decode()
+        for cursor in ("not a cursor", "e30", wrong_types):
+            with pytest.raises(ValueError):
+                decode_history_cursor(cursor)
+
+class TestKeysetHistory:
+    """Tests for get_client_payment_history_keyset"""
+
+    @pytest.mark.asyncio
+    async def test_pages_are_continuous(self, db_pool):
+        """Test following cursors yields every payment once, in offset-mode order"""
+        offset = await get_client_payment_history(CLIENT_ID, page=1, page_size=1000)
+
+        keyset = await all_pages(CLIENT_ID, page_size=7)
+
+        assert len(keyset) == offset["pagination"]["totalItems"] > 7
+        assert [p["id"] for p in keyset] == [p["id"] for p in offset["payments"]]
+
+    @pytest.mark.asyncio
+    async def test_undated_payments_sort_last(self, db_pool):
+        """Test payments without a received date come last and are reached across cursors"""
+        undated = await insert_undated_payments(CLIENT_ID, 3)
+
+        # Client 1 has 72 dated payments: pages of two end exactly at the
+        # last dated one and then on an undated one, so both cursor kinds are used
+        payments = await all_pages(CLIENT_ID, page_size=2)
+
+        ids = [p["id"] for p in payments]
+        assert len(ids) == len(set(ids))
+        assert ids[-3:] == sorted(undated, reverse=True)
+        assert all(p["receivedDate"] is not None for p in payments[:-3])
+
+    @pytest.mark.asyncio
+    async def test_total_follows_external_writes(self, db_pool):
+        """Test the cached total changes when payments are written outside the app's write path"""
+        before = await get_client_payment_history_keyset(CLIENT_ID, cursor="", include_total=True)
+
+        await insert_undated_payments(CLIENT_ID, 2)
+
+        assert await count_client_payments(CLIENT_ID) == before["pagination"]["totalItems"] + 2
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor_is_bad_request(self, db_pool):
+        """Test the payments endpoint answers a malformed cursor with 400"""
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get(f"/api/clients/{CLIENT_ID}/payments", params={"cursor": "not a cursor"})
+            first_page = await client.get(f"/api/clients/{CLIENT_ID}/payments", params={"cursor": ""})
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
+        assert first_page.status_code == 200
@@ -9,6 +9,7 @@ This test suite focuses on the payment service functions:
 - calculate_expected_fee
 - validate_payment_data
 - prepare_payment_data
+- payment_variance
 """
 import pytest
 from datetime import datetime
@@ -17,7 +18,8 @@ from app.services.payment_service import (
     parse_frontend_period,
     parse_multi_period,
     count_periods,
-    validate_payment_data
+    validate_payment_data,
+    payment_variance
 )
 from app.utils.enums import PaymentSchedule, PaymentMethod
 
@@ -142,6 +144,21 @@ class TestCountPeriods:
         count = await count_periods(payment_data)
         assert count == 4  # Q3 2023, Q4 2023, Q1 2024, Q2 2024 = 4 quarters
 
+class TestPaymentVariance:
+    """Tests for the payment_variance function"""
+    
+    def test_variance_and_percent(self):
+        """Test variance is actual minus expected, as a percentage of expected"""
+        variance, percent = payment_variance(500.0, 550.0)
+        assert variance == pytest.approx(50.0)
+        assert percent == pytest.approx(10.0)
+    
+    def test_missing_or_zero_expected(self):
+        """Test missing fees give no variance and a zero expected fee gives no percentage"""
+        assert payment_variance(None, 550.0) == (None, None)
+        assert payment_variance(500.0, None) == (None, None)
+        assert payment_variance(0, 25.0) == (25.0, None)
+
 class TestValidatePaymentData:
     """Tests for payment data validation"""
     
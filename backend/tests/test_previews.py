@@ -0,0 +1,38 @@
+"""
+Tests for first-page preview rendering.
+
+This test suite covers the preview renderer used by the worker processes:
+- Supported file types
+- PNG output at the requested width
+- No partial files left next to the preview
+"""
+import pytest
+from app.utils.previews import can_render, render_preview
+
+pymupdf = pytest.importorskip("pymupdf")
+
+class TestRenderPreview:
+    """Tests for the render_preview function"""
+
+    def test_can_render(self):
+        """Test only document types PyMuPDF can open are rendered"""
+        assert can_render("Statement.PDF")
+        assert can_render("scan.jpg")
+        assert not can_render("notes.txt")
+        assert not can_render("no_extension")
+
+    def test_renders_first_page_png(self, tmp_path):
+        """Test the first page is written as a PNG of the requested width"""
+        document = pymupdf.open()
+        document.new_page(width=612, height=792)
+        document.new_page(width=612, height=792)
+        source = tmp_path / "statement.pdf"
+        document.save(str(source))
+
+        destination = tmp_path / "previews" / "ab" / "abcdef.png"
+        size = render_preview(str(source), str(destination), 306)
+
+        assert destination.stat().st_size == size
+        assert destination.read_bytes()[:8] == b"\x89PNG\r\n\x1a\n"
+        assert pymupdf.Pixmap(str(destination)).width == 306
+        assert [p.name for p in destination.parent.iterdir()] == ["abcdef.png"]
@@ -0,0 +1,116 @@
+"""
+Tests for the materialized provider rollup.
+
+This test suite runs against a copy of the sample database and covers:
+- The rollup matching provider_rollup_source after payment writes
+- The rollup matching after a client's provider assignment changes
+- Year-to-date fees from a past year (New Year) on the read path and startup
+"""
+from datetime import datetime, timezone
+import pytest
+from app.database.database import execute_query, execute_write_query
+from app.database.models import create_payment, delete_payment, get_providers, update_payment
+from app.database.provider_rollup import check_provider_rollup, rebuild_stale_provider_rollup
+from app.services.payment_service import prepare_payment_data
+
+CLIENT_ID = 1
+OLD_PROVIDER = 8
+NEW_PROVIDER = 1
+
+async def check(pool) -> dict:
+    async with pool.reader() as conn:
+        return await check_provider_rollup(conn)
+
+async def rollup(provider_id: int) -> dict:
+    rows = await execute_query("SELECT * FROM provider_rollup WHERE id = ?", (provider_id,))
+    return rows[0]
+
+async def payment(actual_fee: float) -> dict:
+    year = datetime.now(timezone.utc).year
+    return await prepare_payment_data({
+        "client_id": CLIENT_ID,
+        "received_date": f"{year}-02-01",
+        "actual_fee": actual_fee,
+        "total_assets": 5000000,
+        "period": f"Jan {year}"
+    })
+
+class TestProviderRollup:
+    """Tests for keeping provider_rollup consistent"""
+
+    @pytest.mark.asyncio
+    async def test_payment_writes(self, db_pool):
+        """Test creating, updating and deleting a payment keeps the rollup consistent"""
+        assert (await check(db_pool))["consistent"]
+        fees = (await rollup(OLD_PROVIDER))["ytdFees"]
+
+        payment_id = await create_payment(await payment(700))
+        assert (await check(db_pool))["consistent"]
+        assert (await rollup(OLD_PROVIDER))["ytdFees"] == pytest.approx(fees + 700)
+
+        payment_id = await update_payment(payment_id, await payment(900))
+        assert (await check(db_pool))["consistent"]
+        assert (await rollup(OLD_PROVIDER))["ytdFees"] == pytest.approx(fees + 900)
+
+        assert await delete_payment(payment_id)
+        assert (await check(db_pool))["consistent"]
+        assert (await rollup(OLD_PROVIDER))["ytdFees"] == pytest.approx(fees)
+
+    @pytest.mark.asyncio
+    async def test_provider_assignment(self, db_pool):
+        """Test ending, adding and moving a client's contract keeps the rollup consistent"""
+        old_count = (await rollup(OLD_PROVIDER))["clientCount"]
+        new_count = (await rollup(NEW_PROVIDER))["clientCount"]
+
+        # Contracts are soft-deleted, like payments
+        await execute_write_query(
+            "UPDATE contracts SET valid_to = CURRENT_TIMESTAMP WHERE client_id = ? AND valid_to IS NULL", (CLIENT_ID,)
+        )
+        assert (await check(db_pool))["consistent"]
+        assert (await rollup(OLD_PROVIDER))["clientCount"] == old_count - 1
+
+        contract_id = await execute_write_query(
+            "INSERT INTO contracts (client_id, provider_id, fee_type, percent_rate, payment_schedule, num_people) "
+            "VALUES (?, ?, 'percentage', 0.0007, 'monthly', 18)",
+            (CLIENT_ID, NEW_PROVIDER)
+        )
+        assert (await check(db_pool))["consistent"]
+        assert (await rollup(NEW_PROVIDER))["clientCount"] == new_count + 1
+
+        await execute_write_query("UPDATE contracts SET provider_id = ? WHERE contract_id = ?", (OLD_PROVIDER, contract_id))
+        assert (await check(db_pool))["consistent"]
+        assert (await rollup(NEW_PROVIDER))["clientCount"] == new_count
+        assert (await rollup(OLD_PROVIDER))["clientCount"] == old_count
+
+class TestNewYear:
+    """Tests for year-to-date fees left over from a past year"""
+
+    @pytest.mark.asyncio
+    async def test_stale_year_reads_as_zero(self, db_pool):
+        """Test get_providers reports no fees this year for rows still on last year"""
+        this_year = datetime.now(timezone.utc).year
+        update = "UPDATE provider_rollup SET ytdYear = ?, ytdFees = 1234 WHERE id = ?"
+        await execute_write_query(update, (this_year - 1, OLD_PROVIDER))
+        await execute_write_query(update, (this_year, NEW_PROVIDER))
+
+        providers = {provider["id"]: provider for provider in await get_providers()}
+
+        assert providers[OLD_PROVIDER]["ytdFees"] == 0.0
+        assert providers[NEW_PROVIDER]["ytdFees"] == 1234
+        assert "ytdYear" not in providers[OLD_PROVIDER]
+
+    @pytest.mark.asyncio
+    async def test_rebuild_stale(self, db_pool):
+        """Test the startup rebuild runs only when a row is from a past year"""
+        async with db_pool.writer() as conn:
+            assert not await rebuild_stale_provider_rollup(conn)
+
+        last_year = datetime.now(timezone.utc).year - 1
+        await execute_write_query("UPDATE provider_rollup SET ytdYear = ?, ytdFees = 1234", (last_year,))
+        assert not (await check(db_pool))["consistent"]
+
+        async with db_pool.writer() as conn:
+            assert await rebuild_stale_provider_rollup(conn)
+
+        assert (await check(db_pool))["consistent"]
+        assert (await rollup(OLD_PROVIDER))["ytdYear"] == last_year + 1
@@ -0,0 +1,77 @@
+"""
+Tests for API response rendering.
+
+This test suite covers the fast JSON path used by the heavy read endpoints
+and the file response used for document downloads.
+"""
+import os
+import json
+import asyncio
+from datetime import date
+from decimal import Decimal
+from app.api.responses import FastJSONResponse, DocumentResponse
+
+class TestFastJSONResponse:
+    """Tests for the FastJSONResponse class"""
+
+    def test_plain_rows(self):
+        """Test plain dict/list/primitive content round-trips unchanged"""
+        content = {
+            "clients": [{"id": 1, "name": "Café", "rate": 0.0007, "status": None, "hasAttachment": 1}],
+            "clientDetails": {"1": {"missingPayments": ["Jan 2025"]}}
+        }
+
+        assert json.loads(FastJSONResponse(content).body) == content
+
+    def test_non_string_keys(self):
+        """Test integer dictionary keys are serialized as strings"""
+        body = FastJSONResponse({1: [1, 2]}).body
+
+        assert json.loads(body) == {"1": [1, 2]}
+
+    def test_falls_back_to_jsonable_encoder(self):
+        """Test values outside plain JSON types use FastAPI's encoder"""
+        body = FastJSONResponse({"date": date(2024, 1, 15), "amount": Decimal("1.5")}).body
+
+        assert json.loads(body) == {"date": "2024-01-15", "amount": 1.5}
+
+def send_document(path, headers=(), extensions=None):
+    """Run a DocumentResponse for a GET request and collect the sent messages"""
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    scope = {"type": "http", "method": "GET", "headers": list(headers), "extensions": extensions or {}}
+    response = DocumentResponse(path, stat_result=os.stat(path), media_type="application/pdf")
+    asyncio.run(response(scope, receive, send))
+    return messages
+
+class TestDocumentResponse:
+    """Tests for the DocumentResponse class"""
+
+    def test_range_request(self, tmp_path):
+        """Test a Range request returns only the requested bytes"""
+        path = tmp_path / "statement.pdf"
+        path.write_bytes(bytes(range(256)) * 4)
+
+        messages = send_document(path, headers=[(b"range", b"bytes=10-19")])
+        start = messages[0]
+        body = b"".join(m.get("body", b"") for m in messages[1:])
+
+        assert start["status"] == 206
+        assert (b"content-range", b"bytes 10-19/1024") in start["headers"]
+        assert body == (bytes(range(256)) * 4)[10:20]
+
+    def test_pathsend_when_offered(self, tmp_path):
+        """Test whole-file responses are handed to the server when it supports pathsend"""
+        path = tmp_path / "statement.pdf"
+        path.write_bytes(b"%PDF-1.4")
+
+        messages = send_document(path, extensions={"http.response.pathsend": {}})
+
+        assert [m["type"] for m in messages] == ["http.response.start", "http.response.pathsend"]
+        assert messages[1]["path"] == str(path)
@@ -0,0 +1,123 @@
+"""
+Tests for request-scoped lookup memoization.
+
+This test suite counts the lookups reaching the database loader:
+- One query per key within a unit of work
+- Concurrent lookups sharing a single query
+- Reloading after a write invalidates a client
+- The SQL a single payment write issues against a real database
+"""
+import asyncio
+import pytest
+from app.database.models import create_payment
+from app.services.payment_service import prepare_payment_data
+from app.utils.cache import invalidate_client
+from app.utils.unit_of_work import unit_of_work, memoize, current_unit_of_work
+
+class CountingLoader:
+    """Stand-in for a client lookup that counts its queries"""
+    def __init__(self):
+        self.queries = 0
+
+    def __call__(self, client_id):
+        async def load():
+            self.queries += 1
+            await asyncio.sleep(0)
+            return {"id": client_id, "query": self.queries}
+        return load
+
+class TestUnitOfWork:
+    """Tests for memoize within and outside a unit of work"""
+
+    @pytest.mark.asyncio
+    async def test_one_query_per_client(self):
+        """Test repeated lookups of a client run one query"""
+        loader = CountingLoader()
+
+        with unit_of_work() as uow:
+            for _ in range(3):
+                await memoize(("client", 1), loader(1))
+            await memoize(("client", 2), loader(2))
+
+        assert loader.queries == 2
+        assert (uow.loads, uow.hits) == (2, 2)
+        assert current_unit_of_work() is None
+
+    @pytest.mark.asyncio
+    async def test_without_unit_of_work(self):
+        """Test every lookup queries when no unit of work is active"""
+        loader = CountingLoader()
+
+        await memoize(("client", 1), loader(1))
+        await memoize(("client", 1), loader(1))
+
+        assert loader.queries == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_query(self):
+        """Test lookups racing for the same key wait on one query"""
+        loader = CountingLoader()
+
+        with unit_of_work():
+            results = await asyncio.gather(*(memoize(("client", 1), loader(1)) for _ in range(5)))
+
+        assert loader.queries == 1
+        assert all(result is results[0] for result in results)
+
+    @pytest.mark.asyncio
+    async def test_invalidate_client_forgets_lookups(self):
+        """Test a write to a client makes the next lookup query again"""
+        loader = CountingLoader()
+
+        with unit_of_work():
+            await memoize(("client", 1), loader(1))
+            await memoize(("client", 2), loader(2))
+            invalidate_client(1)
+            reloaded = await memoize(("client", 1), loader(1))
+            await memoize(("client", 2), loader(2))
+
+        assert loader.queries == 3
+        assert reloaded["query"] == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_lookup_not_memoized(self):
+        """Test a failing query is retried on the next lookup"""
+        calls = []
+
+        async def failing():
+            calls.append(1)
+            raise RuntimeError("database is locked")
+
+        with unit_of_work():
+            for _ in range(2):
+                with pytest.raises(RuntimeError):
+                    await memoize(("client", 1), failing)
+
+        assert len(calls) == 2
+
+class TestPaymentWriteQueries:
+    """Tests for the lookups issued by the payment write path"""
+
+    @pytest.mark.asyncio
+    async def test_single_payment_looks_up_client_once(self, db_pool):
+        """Test preparing and creating a payment reads the client and its contract once each"""
+        statements = []
+        await db_pool.set_trace_callback(statements.append)
+        try:
+            with unit_of_work():
+                prepared = await prepare_payment_data({
+                    "client_id": 1,
+                    "received_date": "2026-10-01",
+                    "actual_fee": 700,
+                    "total_assets": 5000000,
+                    "period": "Sep 2026"
+                })
+                payment_id = await create_payment(prepared)
+        finally:
+            await db_pool.set_trace_callback(None)
+
+        reads = [" ".join(sql.split()) for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+        assert payment_id
+        assert len([sql for sql in reads if "FROM client_summary" in sql]) == 1
+        assert len([sql for sql in reads if "FROM contracts" in sql]) == 1
+        assert len(reads) == 2
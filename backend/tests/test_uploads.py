@@ -0,0 +1,53 @@
+"""
+Tests for the streaming upload writer.
+
+This test suite covers chunked document uploads:
+- Content and checksum of the written file
+- Size limit enforcement
+- Temporary file cleanup
+"""
+import io
+import hashlib
+import pytest
+from fastapi import UploadFile
+from app.utils.uploads import save_upload, UploadTooLargeError
+
+def make_upload(data: bytes, size=None) -> UploadFile:
+    """Build an UploadFile over in-memory bytes"""
+    return UploadFile(io.BytesIO(data), filename="statement.pdf", size=size)
+
+class TestSaveUpload:
+    """Tests for the save_upload function"""
+
+    @pytest.mark.asyncio
+    async def test_writes_file_in_chunks(self, tmp_path):
+        """Test the file is written completely with a matching checksum"""
+        data = bytes(range(256)) * 1000
+        destination = tmp_path / "statement.pdf"
+
+        result = await save_upload(make_upload(data), destination, max_bytes=1_000_000, chunk_size=4096)
+
+        assert destination.read_bytes() == data
+        assert result["size"] == len(data)
+        assert result["sha256"] == hashlib.sha256(data).hexdigest()
+        assert list(tmp_path.iterdir()) == [destination]
+
+    @pytest.mark.asyncio
+    async def test_rejects_oversized_stream(self, tmp_path):
+        """Test an upload growing past the limit is rejected and cleaned up"""
+        destination = tmp_path / "statement.pdf"
+
+        with pytest.raises(UploadTooLargeError):
+            await save_upload(make_upload(b"x" * 10_000), destination, max_bytes=5_000, chunk_size=1024)
+
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_rejects_known_size_up_front(self, tmp_path):
+        """Test a declared size over the limit is rejected before writing"""
+        destination = tmp_path / "statement.pdf"
+
+        with pytest.raises(UploadTooLargeError):
+            await save_upload(make_upload(b"x" * 10, size=10_000), destination, max_bytes=5_000)
+
+        assert list(tmp_path.iterdir()) == []